@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+
+from pyuc import constraint_adder as ca
+from pyuc import load_data as ld
+from pyuc import objective_function as of
+from pyuc import pyuc
+from pyuc import reduction as rd
+from pyuc import setup_problem as sp
+from pyuc import warm_start as ws
+
+terminal_events = ["finished", "cancelled", "failed"]
+
+
+class OptRun():
+    def __init__(self, name, loop):
+        """
+        Handle to an optimisation problem running on an event loop.  The handle can be awaited
+        for the solved problem, cancelled, and followed through its progress events: phase
+        changes, incumbents and the solve result, and finally finished, cancelled or failed.
+
+        :param name str: problem name
+        :param loop asyncio.AbstractEventLoop: event loop the run belongs to
+        """
+
+        self.name = name
+        self.loop = loop
+        self.phase = None
+        self.task = None
+        self.events = asyncio.Queue()
+        self.callbacks = list()
+        self.stop_event = threading.Event()
+
+    def __repr__(self):
+        return "OptRun(name=%s, phase=%s)" % (self.name, self.phase)
+
+    def __await__(self):
+        return self.task.__await__()
+
+    def add_callback(self, callback):
+        """
+        Call a function with each progress event, on the event loop's thread.
+
+        :param callback function: function taking an event dictionary
+        """
+
+        self.callbacks.append(callback)
+
+    def emit(self, event):
+        """
+        Pass an event to the queue and callbacks.  This is safe to call from the executor's
+        threads, e.g. from a solver callback.
+
+        :param event dict: progress event
+        """
+
+        self.loop.call_soon_threadsafe(self.dispatch, event)
+
+    def dispatch(self, event):
+        self.events.put_nowait(event)
+
+        for callback in self.callbacks:
+            callback(event)
+
+    def set_phase(self, phase):
+        self.phase = phase
+        self.dispatch({"event": "phase", "name": self.name, "phase": phase, "time": time.time()})
+
+    def cancel(self):
+        """
+        Cancel the run.  The solver is stopped where it can be (HiGHS is interrupted and the CBC
+        process terminated), otherwise the current phase runs to completion in the executor and
+        its result is discarded.
+        """
+
+        self.stop_event.set()
+
+        return self.task.cancel()
+
+    def cancelled(self):
+        return self.task.cancelled()
+
+    def done(self):
+        return self.task.done()
+
+    async def stream(self):
+        """Yield the progress events until the run finishes, fails or is cancelled. """
+
+        while True:
+            event = await self.events.get()
+            yield event
+
+            if event["event"] in terminal_events:
+                return
+
+
+def run_opt_problem_async(name, input_data_path, output_data_path, executor=None):
+    """
+    Start an optimisation problem on the running event loop, with the CPU-heavy phases run in an
+    executor, and return its OptRun handle.  The phases are the same as run_opt_problem.
+
+    :param name str: problem name
+    :param input_data_path str: path to data inputs
+    :param output_data_path str: path to save outputs
+    :param executor concurrent.futures.Executor: executor for the phases, or None for the
+        event loop's default executor
+    """
+
+    loop = asyncio.get_running_loop()
+    run = OptRun(name, loop)
+    phases = make_phases(run, name, input_data_path, output_data_path)
+    run.task = loop.create_task(run_phases(run, phases, executor))
+
+    return run
+
+
+def make_phases(run, name, input_data_path, output_data_path):
+    """
+    Return the (phase name, function) pairs of a run, where each function takes the problem
+    from the previous phase and returns it.
+
+    :param run OptRun: run handle
+    :param name str: problem name
+    :param input_data_path str: path to data inputs
+    :param output_data_path str: path to save outputs
+    """
+
+    def setup(problem):
+        problem = sp.setup_problem(name, input_data_path, output_data_path)
+        problem["progress_callback"] = run.emit
+        problem["stop_event"] = run.stop_event
+
+        return problem
+
+    def load(problem):
+        problem["data"] = ld.load_data(problem)
+        problem["sets"] = ld.create_sets(problem["data"], problem["settings"]["reserves"])
+        problem["var"] = pyuc.create_variables(problem["sets"])
+
+        return problem
+
+    def build(problem):
+        problem["problem"] = ca.add_constraints(problem)
+        problem["problem"] = of.make_objective_function(problem)
+        rd.apply_reduction_setting(problem)
+        ws.apply_warm_start_setting(problem)
+
+        return problem
+
+    def solve(problem):
+        problem["problem"] = pyuc.solve_problem(problem)
+
+        return problem
+
+    def save(problem):
+        pyuc.save_results(problem)
+
+        return problem
+
+    return [("setup", setup), ("load_data", load), ("build", build), ("solve", solve),
+            ("save_results", save)]
+
+
+async def run_phases(run, phases, executor):
+    """
+    Run each phase in the executor, reporting phase changes to the run.
+
+    :param run OptRun: run handle
+    :param phases list: (phase name, function) pairs, from make_phases
+    :param executor concurrent.futures.Executor: executor for the phases
+    """
+
+    loop = asyncio.get_running_loop()
+    problem = None
+
+    try:
+        for phase, function in phases:
+            run.set_phase(phase)
+            problem = await loop.run_in_executor(executor, function, problem)
+
+    except asyncio.CancelledError:
+        run.stop_event.set()
+        run.dispatch({"event": "cancelled", "name": run.name, "phase": run.phase})
+        raise
+
+    except Exception as error:
+        run.dispatch({"event": "failed", "name": run.name, "phase": run.phase, "error": error})
+        raise
+
+    run.dispatch({
+        "event": "finished",
+        "name": run.name,
+        "status": problem["problem"].status,
+        "objective": problem["problem"].objective.value(),
+    })
+
+    return problem
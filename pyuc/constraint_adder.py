@@ -1,60 +1,109 @@
+import numpy as np
 import pandas as pd
+import pulp as pp
 
 from pyuc import constraints as cnsts
+from pyuc import matrix_model as mm
+from pyuc import setup_problem as sp
+from pyuc import vectorised_constraints as vcnsts
 
 
-def make_constraint_index():
+constraint_builders = {
+    "Reference": cnsts,
+    "Vectorised": vcnsts,
+}
+
+model_backends = ["Pulp", "Matrix"]
+
+# Families that define the cumulative count variables of the minimum up and down time families,
+# included whenever those families are
+auxiliary_families = {
+    "MinimumUpTime": "CumulativeStartUps",
+    "MinimumDownTime": "CumulativeShutDowns",
+}
+
+# Families whose rows each bound a single variable, which the SingleVariableBounds setting sets
+# as column bounds instead of adding rows
+bound_families = [
+    "NumCommitted<=NumUnits",
+    "Power<=Capacity",
+    "StorageCharge<=Capacity",
+    "StoredEnergy<=EnergyCapacity",
+]
+
+
+def make_constraint_index(builder=sp.default_settings["ConstraintBuilder"]):
     """
     Builds a DataFrame of constraint functions against their name.
+
+    :param builder str: constraint builder to take the functions from (Reference or Vectorised)
     """
 
     def add_constraint(name, constraint):
-        constraint_index.loc[name, "Function"] = constraint
+        constraint_index.loc[name, "Function"] = getattr(constraint_module, constraint)
 
     def init_df():
         return pd.DataFrame(columns=["ID", "Function"]).set_index("ID")
 
+    if builder not in constraint_builders.keys():
+        print("\nConstraint builder %s is not one of %s\n"
+              % (builder, ", ".join(constraint_builders.keys())))
+        raise ValueError("Unknown constraint builder")
+
+    constraint_module = constraint_builders[builder]
     constraint_index = init_df()
 
-    add_constraint("Supply==Demand", cnsts.cnt_supply_eq_demand)
-    add_constraint("Power<=Capacity", cnsts.cnt_power_lt_capacity)
-    add_constraint("Power<=CommittedCapacity", cnsts.cnt_power_lt_committed_capacity)
-    add_constraint("Power>=MinimumGeneration", cnsts.cnt_power_gt_minimum_generation)
-    add_constraint("NumCommitted<=NumUnits", cnsts.cnt_num_committed_lt_num_units)
-    add_constraint("CommitmentContinuity", cnsts.cnt_commitment_continuity)
+    add_constraint("Supply==Demand", "cnt_supply_eq_demand")
+    add_constraint("Power<=Capacity", "cnt_power_lt_capacity")
+    add_constraint("Power<=CommittedCapacity", "cnt_power_lt_committed_capacity")
+    add_constraint("Power>=MinimumGeneration", "cnt_power_gt_minimum_generation")
+    add_constraint("NumCommitted<=NumUnits", "cnt_num_committed_lt_num_units")
+    add_constraint("CommitmentContinuity", "cnt_commitment_continuity")
     add_constraint("CommitmentContinuityInitialInterval",
-                   cnsts.cnt_commitment_continuity_initial_interval)
+                   "cnt_commitment_continuity_initial_interval")
 
     add_constraint("VariablePower<=ResourceAvailability",
-                   cnsts.cnt_variable_resource_availability)
+                   "cnt_variable_resource_availability")
+
+    add_constraint("MinimumUpTime", "cnt_minimum_up_time")
+    add_constraint("MinimumDownTime", "cnt_minimum_down_time")
+    add_constraint("CumulativeStartUps", "cnt_cumulative_starting_up")
+    add_constraint("CumulativeShutDowns", "cnt_cumulative_shutting_down")
 
-    add_constraint("MinimumUpTime", cnsts.cnt_minimum_up_time)
-    add_constraint("MinimumDownTime", cnsts.cnt_minimum_down_time)
+    add_constraint("RampRateUp", "cnt_ramp_rate_up")
+    add_constraint("RampRateDown", "cnt_ramp_rate_down")
 
-    add_constraint("RampRateUp", cnsts.cnt_ramp_rate_up)
-    add_constraint("RampRateDown", cnsts.cnt_ramp_rate_down)
+    # Tight formulation: limits the power of units starting up or about to shut down, and ramp
+    # limits that account for units starting up in the previous interval or shutting down in the
+    # next.  TightRampRateUp and TightRampRateDown replace RampRateUp and RampRateDown.
+    add_constraint("Power<=StartUpShutDownCapacity",
+                   "cnt_power_lt_start_up_shut_down_capacity")
+    add_constraint("Power<=ShutDownCapacity", "cnt_power_lt_shut_down_capacity")
+    add_constraint("TightRampRateUp", "cnt_tight_ramp_rate_up")
+    add_constraint("TightRampRateDown", "cnt_tight_ramp_rate_down")
 
     add_constraint("VariableResourceAvailability",
-                   cnsts.cnt_variable_resource_availability)
+                   "cnt_variable_resource_availability")
 
     add_constraint("StorageCharge<=Capacity",
-                   cnsts.cnt_charge_lt_rt_loss_adjusted_capacity)
+                   "cnt_charge_lt_rt_loss_adjusted_capacity")
     add_constraint("StorageEnergyContinuity",
-                   cnsts.cnt_storage_energy_continuity)
+                   "cnt_storage_energy_continuity")
     add_constraint("StorageEnergyContinuityInitialInterval",
-                   cnsts.cnt_storage_energy_continuity_initial_interval)
+                   "cnt_storage_energy_continuity_initial_interval")
     add_constraint("StoredEnergy<=EnergyCapacity",
-                   cnsts.cnt_stored_energy_lt_storage_capacity)
+                   "cnt_stored_energy_lt_storage_capacity")
 
     return constraint_index
 
 
-def constraint_selector(paths):
+def constraint_selector(paths, builder=sp.default_settings["ConstraintBuilder"]):
     """
     Reads the constraints to be included (constraint list), and the constraint index,
-    combining.
+    combining.  The auxiliary families of included families are included too.
 
     :param paths dict: problem paths
+    :param builder str: constraint builder to take the functions from
     """
 
     def read_constraint_list():
@@ -64,47 +113,251 @@ def constraint_selector(paths):
 
         return constraint_list
 
-    constraint_index = make_constraint_index()
+    constraint_index = make_constraint_index(builder)
     constraint_list = read_constraint_list()
+
+    for family_id, auxiliary_id in auxiliary_families.items():
+        included = constraint_list.ToInclude.get(family_id, False)
+
+        if included == True:
+            constraint_list.loc[auxiliary_id, "ToInclude"] = True
+
     constraint_list["Function"] = constraint_index.Function
 
     return constraint_list
 
 
-def add_all_constraints_to_pulp_problem(problem, constraints):
+def add_all_constraints_to_pulp_problem(problem, constraints, code=None):
     """
-    Adds the condition-label tuples in constraints to the pulp problem.
+    Adds the label-condition pairs in constraints to the pulp problem.  If a code is given, the
+    constraints are named code_0, code_1, ... instead of by their labels.
 
-    :param constraints list: list of condition-label tuples
     :param problem dict: all problem data
+    :param constraints dict or ConstraintBlock: a constraint family, yielding label-condition pairs
+    :param code str: compact name prefix for the family
     """
 
-    for label, condition in constraints.items():
-        problem["problem"] += condition, label
+    if code is None:
+        for label, condition in constraints.items():
+            problem["problem"] += condition, label
+    else:
+        for n, condition in enumerate(constraints.values()):
+            problem["problem"] += condition, f"{code}_{n}"
 
     return problem["problem"]
 
 
-def build_constraints(problem, constraints={}):
+def single_variable_terms(constraints):
+    """
+    Return the variable, coefficient, right hand side and sense of each row of a family whose
+    rows each hold a single variable.
+
+    :param constraints dict or ConstraintBlock: a constraint family
+    """
+
+    if isinstance(constraints, vcnsts.ConstraintBlock):
+        if len(constraints.terms) != 1 or constraints.expressions:
+            print("\nConstraint family %s does not have a single variable per row\n"
+                  % constraints.name)
+            raise ValueError("Constraint family can't be set as bounds")
+
+        variables, coefficients = constraints.terms[0]
+        senses = np.full(len(constraints), constraints.sense)
+
+        return variables, coefficients, constraints.rhs, senses
+
+    conditions = list(constraints.values())
+
+    if any(len(c) != 1 for c in conditions):
+        print("\nConstraint family does not have a single variable per row\n")
+        raise ValueError("Constraint family can't be set as bounds")
+
+    return (
+        [next(iter(c.keys())) for c in conditions],
+        np.array([next(iter(c.values())) for c in conditions], dtype=float),
+        np.array([-c.constant for c in conditions], dtype=float),
+        np.array([c.sense for c in conditions], dtype=int)
+    )
+
+
+def add_constraints_as_bounds(constraints):
+    """
+    Set the rows of a family whose rows each hold a single variable as bounds on the variables,
+    tightening any bounds they already have.  Returns the number of bounds set.
+
+    :param constraints dict or ConstraintBlock: a constraint family
+    """
+
+    variables, coefficients, rhs, senses = single_variable_terms(constraints)
+    has_variable = np.fromiter((v is not None for v in variables), dtype=bool, count=len(rhs))
+    bounds = np.divide(rhs, coefficients, out=np.zeros(len(rhs)), where=coefficients != 0)
+
+    sets_upper = (senses == pp.LpConstraintEQ) \
+        | ((senses == pp.LpConstraintLE) & (coefficients > 0)) \
+        | ((senses == pp.LpConstraintGE) & (coefficients < 0))
+    sets_lower = (senses == pp.LpConstraintEQ) \
+        | ((senses == pp.LpConstraintGE) & (coefficients > 0)) \
+        | ((senses == pp.LpConstraintLE) & (coefficients < 0))
+
+    for v, bound, upper, lower in zip(variables, bounds.tolist(), sets_upper, sets_lower):
+        if v is None:
+            continue
+
+        if upper:
+            v.upBound = bound if v.upBound is None else min(v.upBound, bound)
+
+        if lower:
+            v.lowBound = bound if v.lowBound is None else max(v.lowBound, bound)
+
+    return int(np.count_nonzero(has_variable & (sets_upper | sets_lower)))
+
+
+def constraint_keys(constraints):
+    """
+    Return the row keys of a constraint family: the index tuples of a ConstraintBlock, or the
+    labels of a dict of constraints.
+
+    :param constraints dict or ConstraintBlock: a constraint family
     """
-    Adds constraints that have been specified for inclusion to the constraint list.
+
+    if isinstance(constraints, vcnsts.ConstraintBlock):
+        return constraints.index
+    else:
+        return list(constraints.keys())
+
+
+def build_constraints(problem):
+    """
+    Builds each constraint family that has been specified for inclusion and adds it straight to
+    the pulp problem, so only one family is held at a time.  IDs that share a function (e.g.
+    VariablePower<=ResourceAvailability and VariableResourceAvailability) are built once.
+
+    Helpers shared by several families (e.g. the ramp of each unit) are memoised in
+    problem["helper_cache"] for the duration of the build, and dropped once it is complete.
+
+    With the Matrix ModelBackend setting, the families are added to problem["matrix_model"] as
+    coefficient arrays instead of to the pulp problem.
+
+    With the SingleVariableBounds setting, the families in bound_families set bounds on
+    their variables instead of adding rows, and problem["column_bounds"] holds the number of
+    bounds each set.
+
+    With the CompactConstraintNames setting, each family gets a code (c0, c1, ...) and its rows
+    are named code_row.  problem["constraint_names"] then maps each code to the family ID and
+    row keys, for use by lookup_constraint_name.
+
+    Returns the number of constraints added for each family ID.
 
     :param problem dict: main problem
     """
 
     constraint_index = problem["data"]["constraint_index"]
     filt_constraint_index = constraint_index[constraint_index.ToInclude == True]
+    compact_names = sp.get_setting(problem, "CompactConstraintNames")
+    single_variable_bounds = sp.get_setting(problem, "SingleVariableBounds")
+    matrix_backend = use_matrix_backend(problem)
+
+    family_sizes = dict()
+    built_functions = set()
+
+    if compact_names:
+        problem["constraint_names"] = dict()
+
+    if matrix_backend:
+        problem["matrix_model"] = mm.MatrixModel(problem["var"])
+
+    problem["helper_cache"] = dict()
+    problem["column_bounds"] = dict()
+
+    try:
+        for family_id, cnt_fn in filt_constraint_index["Function"].items():
+            if cnt_fn in built_functions:
+                family_sizes[family_id] = 0
+                continue
+
+            cnt_fn_constraints = cnt_fn(problem)
+
+            if single_variable_bounds and family_id in bound_families:
+                problem["column_bounds"][family_id] = \
+                    add_constraints_as_bounds(cnt_fn_constraints)
+                family_sizes[family_id] = 0
+                built_functions.add(cnt_fn)
+                continue
+
+            if compact_names:
+                code = "c%d" % len(problem["constraint_names"])
+                problem["constraint_names"][code] = \
+                    (family_id, constraint_keys(cnt_fn_constraints))
+            else:
+                code = None
+
+            if matrix_backend:
+                problem["matrix_model"].add_constraints(cnt_fn_constraints, family_id)
+            else:
+                problem["problem"] = \
+                    add_all_constraints_to_pulp_problem(problem, cnt_fn_constraints, code)
+
+            family_sizes[family_id] = len(cnt_fn_constraints)
+            built_functions.add(cnt_fn)
+    finally:
+        del problem["helper_cache"]
+
+    if matrix_backend and problem["column_bounds"]:
+        problem["matrix_model"].update_columns()
+
+    return family_sizes
+
+
+def use_matrix_backend(problem):
+    """
+    Return whether the problem is assembled with the matrix backend (ModelBackend setting).
+
+    :param problem dict: main problem
+    """
+
+    model_backend = sp.get_setting(problem, "ModelBackend")
+
+    if model_backend not in model_backends:
+        print("\nModel backend %s is not one of %s\n" % (model_backend, ", ".join(model_backends)))
+        raise ValueError("Unknown model backend")
+
+    return model_backend == "Matrix"
+
+
+def lookup_constraint_name(problem, name):
+    """
+    Return the family ID and row key (index tuple or label) of a compact constraint name.
+
+    :param problem dict: main problem
+    :param name str: compact constraint name, e.g. c3_17
+    """
+
+    code, row = name.rsplit("_", 1)
+    family_id, keys = problem["constraint_names"][code]
+
+    return family_id, keys[int(row)]
+
+
+def constraint_name_table(problem):
+    """
+    Return a DataFrame with the family ID and row key of each compact constraint name.
+
+    :param problem dict: main problem
+    """
 
-    for cnt_fn in filt_constraint_index["Function"]:
-        cnt_fn_constraints = cnt_fn(problem)
-        constraints = {**constraints, **cnt_fn_constraints}
+    rows = [
+        (f"{code}_{n}", family_id, key)
+        for code, (family_id, keys) in problem["constraint_names"].items()
+        for n, key in enumerate(keys)
+    ]
 
-    return constraints
+    return pd.DataFrame(rows, columns=["Name", "Family", "Key"]).set_index("Name")
 
 
 def add_constraints(problem):
-    problem["data"]["constraint_index"] = constraint_selector(problem["paths"])
-    constraints = build_constraints(problem)
-    problem["problem"] = add_all_constraints_to_pulp_problem(problem, constraints)
+    builder = sp.get_setting(problem, "ConstraintBuilder")
+    problem["data"]["constraint_index"] = constraint_selector(problem["paths"], builder)
+    family_sizes = build_constraints(problem)
+    problem["data"]["constraint_index"]["NumConstraints"] = pd.Series(family_sizes)
 
     return problem["problem"]
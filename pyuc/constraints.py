@@ -1,16 +1,54 @@
+import contextvars
+import functools
+
+import numpy as np
 import pulp as pp
 
+from pyuc.initial_state import initial_state_history
+from pyuc.unit_parameters import unit_parameters
+
+active_helper_cache = contextvars.ContextVar("active_helper_cache", default=None)
+
 
 def constraint_adder(constraint_func):
+    @functools.wraps(constraint_func)
     def extractor_wrapper(problem):
         sets, data, var = problem["sets"], problem["data"], problem["var"]
-        constraints = constraint_func(sets, data, var)
+        token = active_helper_cache.set(problem.get("helper_cache"))
+
+        try:
+            constraints = constraint_func(sets, data, var)
+        finally:
+            active_helper_cache.reset(token)
 
         return constraints
 
     return extractor_wrapper
 
 
+def cached_helper(helper_func):
+    """
+    Memoise a helper by name in the problem's helper cache, so families that share a derived
+    quantity (e.g. the ramp of each unit) build it once per problem.  Outside a constraint build
+    with a helper cache, the helper is simply called.  The helper's arguments must be fixed for a
+    given problem, as they are not part of the key.
+    """
+
+    @functools.wraps(helper_func)
+    def cache_wrapper(*args):
+        helper_cache = active_helper_cache.get()
+
+        if helper_cache is None:
+            return helper_func(*args)
+
+        if helper_func.__name__ not in helper_cache:
+            helper_cache[helper_func.__name__] = helper_func(*args)
+
+        return helper_cache[helper_func.__name__]
+
+    return cache_wrapper
+
+
 @constraint_adder
 def cnt_supply_eq_demand(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
@@ -63,6 +101,7 @@ def cnt_reserve_enabled_exceeds_reserve_requirement(sets, data, var, constraints
 @constraint_adder
 def cnt_power_lt_capacity(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
 
     for i in sets["intervals"].indices:
         for u in sets["units"].indices:
@@ -71,8 +110,7 @@ def cnt_power_lt_capacity(sets, data, var, constraints={}):
             condition = (
                 var["power_generated"].var[(i, u)]
                 <=
-                data["units"]["CapacityMW"][u]
-                * data["units"]["NumUnits"][u]
+                unit_params.value("TotalCapacityMW", u)
                 )
 
             constraints[label] = condition
@@ -83,23 +121,24 @@ def cnt_power_lt_capacity(sets, data, var, constraints={}):
 @constraint_adder
 def cnt_power_lt_committed_capacity(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
+    reserve_enabled = var["reserve_enabled"].var
 
     for i in sets["intervals"].indices:
         for u in sets["units_commit"].indices:
             label = f"power_lt_committed_capacity_(i={i}, u={u})"
 
-            if u in sets["units_reserve"].indices:
-                var_raise_reserves_enabled = \
-                    sum(var["reserve_enabled"].var[(i, u, r)] for r in sets["raise_reserves"].indices)
-            else:
-                var_raise_reserves_enabled = 0
+            var_raise_reserves_enabled = sum(
+                reserve_enabled[(i, u, r)] for r in sets["raise_reserves"].indices
+                if (i, u, r) in reserve_enabled
+            )
 
             condition = (
                 var["power_generated"].var[(i, u)]
                 + var_raise_reserves_enabled
                 <=
                 var["num_committed"].var[(i, u)]
-                * data["units"]["CapacityMW"][u]
+                * unit_params.value("CapacityMW", u)
                 )
 
             constraints[label] = condition
@@ -110,24 +149,24 @@ def cnt_power_lt_committed_capacity(sets, data, var, constraints={}):
 @constraint_adder
 def cnt_power_gt_minimum_generation(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
+    reserve_enabled = var["reserve_enabled"].var
 
     for i in sets["intervals"].indices:
         for u in sets["units_commit"].indices:
             label = f"power_gt_minimum_generation_(i={i}, u={u})"
 
-            if u in sets["units_reserve"].indices:
-                var_lower_reserves_enabled = \
-                    sum(var["reserve_enabled"].var[(i, u, r)] for r in sets["lower_reserves"].indices)
-            else:
-                var_lower_reserves_enabled = 0
+            var_lower_reserves_enabled = sum(
+                reserve_enabled[(i, u, r)] for r in sets["lower_reserves"].indices
+                if (i, u, r) in reserve_enabled
+            )
 
             condition = (
                 var["power_generated"].var[(i, u)]
                 - var_lower_reserves_enabled
                 >=
                 var["num_committed"].var[(i, u)]
-                * data["units"]["CapacityMW"][u]
-                * data["units"]["MinimumGenerationFrac"][u]
+                * unit_params.value("MinimumGenerationMW", u)
                 )
 
             constraints[label] = condition
@@ -138,6 +177,7 @@ def cnt_power_gt_minimum_generation(sets, data, var, constraints={}):
 @constraint_adder
 def cnt_num_committed_lt_num_units(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
 
     for i in sets["intervals"].indices:
         for u in sets["units_commit"].indices:
@@ -146,7 +186,7 @@ def cnt_num_committed_lt_num_units(sets, data, var, constraints={}):
             condition = (
                 var["num_committed"].var[(i, u)]
                 <=
-                data["units"]["NumUnits"][u]
+                unit_params.value("NumUnits", u)
                 )
 
             constraints[label] = condition
@@ -165,7 +205,7 @@ def cnt_commitment_continuity(sets, data, var, constraints={}):
             condition = (
                 var["num_committed"].var[(i, u)]
                 ==
-                var["num_committed"].var[(i-1, u)]
+                var["num_committed"].var[(sets["intervals"].previous(i), u)]
                 + var["num_starting_up"].var[(i, u)]
                 - var["num_shutting_down"].var[(i, u)]
                 )
@@ -224,6 +264,7 @@ def cnt_minimum_up_time(sets, data, var, constraints={}):
 @constraint_adder
 def cnt_minimum_down_time(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
 
     num_shut_downs_within_down_time = \
         num_shut_downs_within_down_time_calculator(sets, data, var)
@@ -234,7 +275,7 @@ def cnt_minimum_down_time(sets, data, var, constraints={}):
             label = f"minimum_down_time(i={i}, u={u})"
 
             condition = (
-                data["units"]["NumUnits"][u]
+                unit_params.value("NumUnits", u)
                 - var["num_committed"].var[(i, u)]
                 >=
                 num_shut_downs_within_down_time[(i, u)]
@@ -245,6 +286,50 @@ def cnt_minimum_down_time(sets, data, var, constraints={}):
     return constraints
 
 
+@constraint_adder
+def cnt_cumulative_starting_up(sets, data, var, constraints={}):
+    return cumulative_count_constraints(sets, var, "cumulative_starting_up", "num_starting_up")
+
+
+@constraint_adder
+def cnt_cumulative_shutting_down(sets, data, var, constraints={}):
+    return cumulative_count_constraints(
+        sets, var, "cumulative_shutting_down", "num_shutting_down"
+    )
+
+
+def cumulative_count_constraints(sets, var, name, events):
+    """
+    Return the constraints that make a cumulative count variable the running total of its events
+    from the first interval, for each unit and interval.
+
+    :param sets dict: sets dictionary
+    :param var dict: var dictionary
+    :param name str: cumulative count variable, e.g. cumulative_starting_up
+    :param events str: variable counted, e.g. num_starting_up
+    """
+
+    constraints = {}
+    intervals = list(sets["intervals"].indices)
+
+    for n, i in enumerate(intervals):
+
+        for u in sets["units_commit"].indices:
+            label = f"{name}(i={i}, u={u})"
+            previous = var[name].var[(intervals[n - 1], u)] if n > 0 else 0
+
+            condition = (
+                var[name].var[(i, u)]
+                ==
+                previous
+                + var[events].var[(i, u)]
+                )
+
+            constraints[label] = condition
+
+    return constraints
+
+
 @constraint_adder
 def cnt_ramp_rate_up(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
@@ -300,22 +385,151 @@ def cnt_ramp_rate_down(sets, data, var, constraints={}):
 
 
 @constraint_adder
-def cnt_variable_resource_availability(sets, data, var, constraints={}):
+def cnt_power_lt_start_up_shut_down_capacity(sets, data, var, constraints={}):
+    constraints = {}  # No idea why this is needed
+    tight = tight_formulation_parameters(data, sets["units_commit"].indices)
+
+    for i in sets["intervals"].indices:
+        next_i = sets["intervals"].next(i)
+
+        for u in sets["units_commit"].indices:
+            label = f"power_lt_start_up_shut_down_capacity_(i={i}, u={u})"
+
+            capacity = tight["capacity"][u]
+            shutting_down_next = 0
+
+            if next_i is not None and tight["long_up_time"][u]:
+                shutting_down_next = var["num_shutting_down"].var[(next_i, u)]
+
+            condition = \
+                var["power_generated"].var[(i, u)] \
+                <= \
+                var["num_committed"].var[(i, u)] * capacity \
+                - var["num_starting_up"].var[(i, u)] * (capacity - tight["start_up"][u]) \
+                - shutting_down_next * (capacity - tight["shut_down"][u])
+
+            constraints[label] = condition
+
+    return constraints
+
+
+@constraint_adder
+def cnt_power_lt_shut_down_capacity(sets, data, var, constraints={}):
+    constraints = {}  # No idea why this is needed
+    tight = tight_formulation_parameters(data, sets["units_commit"].indices)
+
+    for i in sets["intervals"].indices[:-1]:
+        next_i = sets["intervals"].next(i)
+
+        for u in sets["units_commit"].indices:
+            if tight["long_up_time"][u]:
+                continue
+
+            label = f"power_lt_shut_down_capacity_(i={i}, u={u})"
+
+            condition = \
+                var["power_generated"].var[(i, u)] \
+                <= \
+                var["num_committed"].var[(i, u)] * tight["capacity"][u] \
+                - var["num_shutting_down"].var[(next_i, u)] \
+                * (tight["capacity"][u] - tight["shut_down"][u])
+
+            constraints[label] = condition
+
+    return constraints
+
+
+@constraint_adder
+def cnt_tight_ramp_rate_up(sets, data, var, constraints={}):
+    constraints = {}  # No idea why this is needed
+
+    rampMW = ramp_calculator(sets, data, var)
+    tight = tight_formulation_parameters(data, sets["units_commit"].indices)
+
+    for i in sets["intervals"].indices:
+        next_i = sets["intervals"].next(i)
+
+        for u in sets["units_commit"].indices:
+            label = f"tight_ramp_rate_up_(i={i}, u={u})"
+
+            online_ramp = tight["online_ramp"][u]
+            shutting_down_next = 0
+
+            if next_i is not None and tight["long_up_time"][u]:
+                shutting_down_next = var["num_shutting_down"].var[(next_i, u)]
+
+            condition = \
+                rampMW[(i, u)] \
+                <= \
+                (var["num_committed"].var[(i, u)] - var["num_starting_up"].var[(i, u)]) \
+                * online_ramp \
+                + var["num_starting_up"].var[(i, u)] * tight["start_up"][u] \
+                - var["num_shutting_down"].var[(i, u)] * tight["minimum_generation"][u] \
+                - shutting_down_next * max(
+                    online_ramp - tight["shut_down"][u] + tight["minimum_generation"][u], 0
+                )
+
+            constraints[label] = condition
+
+    return constraints
+
+
+@constraint_adder
+def cnt_tight_ramp_rate_down(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
 
-    technology_type = data["units"]["Technology"].to_dict()
+    rampMW = ramp_calculator(sets, data, var)
+    tight = tight_formulation_parameters(data, sets["units_commit"].indices)
+    initial_start_ups = dict(zip(
+        sets["units_commit"].indices,
+        initial_state_history(data).get("num_starting_up", sets["units_commit"].indices)
+    ))
+
+    for i in sets["intervals"].indices:
+        previous_i = sets["intervals"].previous(i)
+
+        for u in sets["units_commit"].indices:
+            label = f"tight_ramp_rate_down_(i={i}, u={u})"
+
+            online_ramp = tight["online_ramp"][u]
+            started_up_previously = 0
+
+            if tight["long_up_time"][u]:
+                started_up_previously = initial_start_ups[u] if previous_i is None \
+                    else var["num_starting_up"].var[(previous_i, u)]
+
+            condition = \
+                -1 * rampMW[(i, u)] \
+                <= \
+                (var["num_committed"].var[(i, u)] - var["num_starting_up"].var[(i, u)]) \
+                * online_ramp \
+                + var["num_shutting_down"].var[(i, u)] * tight["shut_down"][u] \
+                - var["num_starting_up"].var[(i, u)] * tight["minimum_generation"][u] \
+                - started_up_previously * max(
+                    online_ramp - tight["start_up"][u] + tight["minimum_generation"][u], 0
+                )
+
+            constraints[label] = condition
+
+    return constraints
+
+
+@constraint_adder
+def cnt_variable_resource_availability(sets, data, var, constraints={}):
+    constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
 
     for i in sets["intervals"].indices:
 
         for u in sets["units_variable"].indices:
             label = f"variable_resource_availability(i={i}, u={u})"
+            technology = unit_params.text("Technology", [u])[0]
 
             condition = \
                 var["power_generated"].var[(i, u)] \
                 <= \
-                data["variable_traces"][technology_type[u]][i] \
-                * data["units"]["NumUnits"][u] \
-                * data["units"]["CapacityMW"][u]
+                data["variable_traces"][technology][i] \
+                * unit_params.value("TotalCapacityMW", u)
 
             constraints[label] = condition
 
@@ -325,6 +539,7 @@ def cnt_variable_resource_availability(sets, data, var, constraints={}):
 @constraint_adder
 def cnt_charge_lt_rt_loss_adjusted_capacity(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
 
     for i in sets["intervals"].indices:
 
@@ -334,9 +549,7 @@ def cnt_charge_lt_rt_loss_adjusted_capacity(sets, data, var, constraints={}):
             condition = \
                 var["power_charged"].var[(i, u)] \
                 <= \
-                data["units"]["NumUnits"][u] \
-                * data["units"]["CapacityMW"][u] \
-                * data["units"]["RoundTripEfficiencyFrac"][u]
+                unit_params.value("ChargeCapacityMW", u)
 
             constraints[label] = condition
 
@@ -353,7 +566,7 @@ def cnt_storage_energy_continuity(sets, data, var, constraints={}):
             label = f"storage_energy_continuity(i={i}, u={u})"
 
             condition = \
-                var["stored_energy"].var[(i-1, u)] \
+                var["stored_energy"].var[(sets["intervals"].previous(i), u)] \
                 - var["stored_energy"].var[(i, u)] \
                 + data["IntervalDurationHrs"] * (
                     + var["power_charged"].var[(i, u)]
@@ -372,16 +585,12 @@ def cnt_storage_energy_continuity_initial_interval(sets, data, var, constraints=
     constraints = {}  # No idea why this is needed
 
     i = sets["intervals"].indices[0]
+    units_storage = sets["units_storage"].indices
+    initial_stored_energy = initial_state_history(data).get("stored_energy", units_storage)
 
-    for u in sets["units_storage"].indices:
+    for u, initial_energy in zip(units_storage, initial_stored_energy):
         label = f"storage_energy_continuity(i={i}, u={u})"
 
-        if data["initial_state"] is not None:
-            if ("stored_energy", -1) in data["initial_state"].columns:
-                initial_energy = data["initial_state"][("stored_energy", -1)][u]
-        else:
-            initial_energy = 0
-
         condition = \
             initial_energy \
             - var["stored_energy"].var[(i, u)] \
@@ -400,6 +609,7 @@ def cnt_storage_energy_continuity_initial_interval(sets, data, var, constraints=
 @constraint_adder
 def cnt_stored_energy_lt_storage_capacity(sets, data, var, constraints={}):
     constraints = {}  # No idea why this is needed
+    unit_params = unit_parameters(data)
 
     for i in sets["intervals"].indices:
 
@@ -409,9 +619,7 @@ def cnt_stored_energy_lt_storage_capacity(sets, data, var, constraints={}):
             condition = \
                 var["stored_energy"].var[(i, u)] \
                 <= \
-                data["units"]["NumUnits"][u] \
-                * data["units"]["CapacityMW"][u] \
-                * data["units"]["StorageHrs"][u] \
+                unit_params.value("EnergyCapacityMWh", u) \
                 * data["IntervalDurationHrs"]
 
             constraints[label] = condition
@@ -419,51 +627,77 @@ def cnt_stored_energy_lt_storage_capacity(sets, data, var, constraints={}):
     return constraints
 
 
-def num_start_ups_within_up_time_calculator(sets, data, var):
+def window_start_intervals(intervals, window):
     """
-    Return a dictionary that sums the start up events within a units minimum up time (counting
-    backwards), for each unit and interval.
+    Return the first interval of each unit's backward window ending at each interval, as an
+    (intervals, units) array.  Intervals are counted by position from the first interval (so
+    the initial state intervals are -1, -2, ...), rather than assuming consecutive indices.
 
-    :param sets dict: sets dictionary
-    :param data dict: data dictionary
-    :param var dict: var dictionary
+    :param intervals list: interval indices
+    :param window array: window length (in intervals) for each unit
     """
 
-    def get_var_starts(i, i_low_var, u):
-        var_starts = \
-            pp.lpSum([
-                var["num_starting_up"].var[(i2, u)] for i2 in range(i_low_var, i+1)
-            ])
+    positions = np.arange(len(intervals))
 
-        return var_starts
+    return positions[:, None] - np.asarray(window, dtype=int)[None, :] + 1
 
-    def get_initial_state_starts(initial_state, i, i_low, u):
-        if initial_state is not None:
-            initial_state_filt = initial_state.xs("num_starting_up", level=0, axis=1)
-            sum_cols = [i2 for i2 in range(i_low, i+1) if i2 in initial_state_filt.columns]
-            initial_state_starts = initial_state_filt.loc[u, sum_cols].sum()
-        else:
-            initial_state_starts = 0
 
-        return initial_state_starts
+def window_counts(cumulative, intervals, units, window, initial_counts):
+    """
+    Return a dictionary of the number of events within each unit's window of intervals ending at
+    each interval (counting backwards), for each interval and unit.  Each is the cumulative count
+    at the interval less that window intervals before it, plus the events of the initial state
+    within the window, so it has at most two terms whatever the window length.
+
+    :param cumulative Var: cumulative count of the events, e.g. cumulative_starting_up
+    :param intervals list: interval indices
+    :param units list: unit indices
+    :param window array: window length (in intervals) for each unit
+    :param initial_counts array: initial state events within each window, (intervals, units)
+    """
 
-    i0 = min(sets["intervals"].indices)
-    num_start_ups_within_up_time = {}
+    window = np.asarray(window, dtype=int)
+    counts = {}
 
-    for i in sets["intervals"].indices:
+    for n, i in enumerate(intervals):
 
-        for u in sets["units_commit"].indices:
-            up_time = data["units"]["MinimumUpTimeHrs"][u]
-            i_low = i - up_time + 1
-            i_low_var = max(i0, i_low)
+        for m, u in enumerate(units):
+            terms = {}
+
+            if window[m] > 0:
+                terms[cumulative.var[(i, u)]] = 1
+
+                if n >= window[m]:
+                    terms[cumulative.var[(intervals[n - window[m]], u)]] = -1
 
-            var_starts = get_var_starts(i, i_low_var, u)
-            initial_state_starts = get_initial_state_starts(data["initial_state"], i, i_low, u)
-            num_start_ups_within_up_time[(i, u)] = var_starts + initial_state_starts
+            counts[(i, u)] = pp.LpAffineExpression(terms, constant=initial_counts[n, m])
 
-    return num_start_ups_within_up_time
+    return counts
 
 
+@cached_helper
+def num_start_ups_within_up_time_calculator(sets, data, var):
+    """
+    Return a dictionary that sums the start up events within a units minimum up time (counting
+    backwards), for each unit and interval.
+
+    :param sets dict: sets dictionary
+    :param data dict: data dictionary
+    :param var dict: var dictionary
+    """
+
+    intervals, units_commit = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    up_time = unit_parameters(data).get("MinimumUpTimeHrs", units_commit)
+    initial_state_starts = initial_state_history(data).window_sum(
+        "num_starting_up", units_commit, window_start_intervals(intervals, up_time)
+    )
+
+    return window_counts(
+        var["cumulative_starting_up"], intervals, units_commit, up_time, initial_state_starts
+    )
+
+
+@cached_helper
 def num_shut_downs_within_down_time_calculator(sets, data, var):
     """
     Return a dictionary that sums the shut down events within a units minimum down time (counting
@@ -474,40 +708,49 @@ def num_shut_downs_within_down_time_calculator(sets, data, var):
     :param var dict: var dictionary
     """
 
-    def get_var_stops(i, i_low_var, u):
-        var_stops = \
-            pp.lpSum([
-                var["num_shutting_down"].var[(i2, u)] for i2 in range(i_low_var, i+1)
-            ])
+    intervals, units_commit = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    down_time = unit_parameters(data).get("MinimumDownTimeHrs", units_commit)
+    initial_state_stops = initial_state_history(data).window_sum(
+        "num_shutting_down", units_commit, window_start_intervals(intervals, down_time)
+    )
 
-        return var_stops
+    return window_counts(
+        var["cumulative_shutting_down"], intervals, units_commit, down_time, initial_state_stops
+    )
 
-    def get_initial_state_stops(initial_state, i, i_low, u):
-        if initial_state is not None:
-            initial_state_filt = initial_state.xs("num_shutting_down", level=0, axis=1)
-            sum_cols = [i2 for i2 in range(i_low, i+1) if i2 in initial_state_filt.columns]
-            initial_state_stops = initial_state_filt.loc[u, sum_cols].sum()
-        else:
-            initial_state_stops = 0
 
-        return initial_state_stops
+def tight_formulation_parameters(data, units, as_arrays=False):
+    """
+    Return the unit parameters of the tight formulation families, as dictionaries keyed by unit
+    (or arrays aligned to the units).  The start up and shut down capacities are the most power
+    a unit can produce in the interval it starts up, and in the interval before it shuts down,
+    limited to its capacity.  Units with a minimum up time of at least two intervals can't start
+    up and shut down in consecutive intervals, so their start up and shut down limits combine.
+
+    :param data dict: data dictionary
+    :param units list: unit indices
+    :param as_arrays bool: return arrays instead of dictionaries
+    """
 
-    i0 = min(sets["intervals"].indices)
-    num_shut_downs_within_down_time = {}
+    unit_params = unit_parameters(data)
+    capacity = unit_params.get("CapacityMW", units)
 
-    for i in sets["intervals"].indices:
-        for u in sets["units_commit"].indices:
-            down_time = data["units"]["MinimumDownTimeHrs"][u]
-            i_low = i - down_time + 1
-            i_low_var = max(i0, i_low)
+    parameters = {
+        "capacity": capacity,
+        "start_up": np.minimum(unit_params.get("StartUpRampMW", units), capacity),
+        "shut_down": np.minimum(unit_params.get("ShutDownRampMW", units), capacity),
+        "online_ramp": unit_params.get("OnlineRampMW", units),
+        "minimum_generation": unit_params.get("MinimumGenerationMW", units),
+        "long_up_time": unit_params.get("MinimumUpTimeHrs", units) >= 2,
+    }
 
-            var_stops = get_var_stops(i, i_low_var, u)
-            initial_state_stops = get_initial_state_stops(data["initial_state"], i, i_low, u)
-            num_shut_downs_within_down_time[(i, u)] = var_stops + initial_state_stops
+    if as_arrays:
+        return parameters
 
-    return num_shut_downs_within_down_time
+    return {name: dict(zip(units, values.tolist())) for name, values in parameters.items()}
 
 
+@cached_helper
 def get_initial_units_committed(sets, data):
     """
     Get dictionary of number of units committed in initial interval.
@@ -516,16 +759,13 @@ def get_initial_units_committed(sets, data):
     :param data dict: data dictionary
     """
 
-    init_state_df = data["initial_state"]
-    init_commit_col = ("num_committed", -1)
     units_commit = sets["units_commit"].indices
+    initial_units_committed = initial_state_history(data).get("num_committed", units_commit)
 
-    if init_state_df is not None:
-        return init_state_df.loc[units_commit, init_commit_col].to_dict()
-    else:
-        return {u: 0 for u in units_commit}
+    return dict(zip(units_commit, initial_units_committed))
 
 
+@cached_helper
 def total_power_generated_in_interval(sets, power_generated):
     """
     Produce a dictionary with intervals for keys, and values that are the sum of the poewr output
@@ -542,6 +782,7 @@ def total_power_generated_in_interval(sets, power_generated):
     return {i: pp.lpSum([power_generated[(i, u)] for u in units]) for i in intervals}
 
 
+@cached_helper
 def total_reserve_enabled_in_interval(sets, reserve_enabled):
     """
     Produce a dictionary with intervals and reserve tuples for keys, and values that are the sum of the reserve
@@ -556,15 +797,18 @@ def total_reserve_enabled_in_interval(sets, reserve_enabled):
     units_reserve = sets["units_reserve"].indices
     reserve_enabled = reserve_enabled.var
 
-    return {(i, r): pp.lpSum([reserve_enabled[(i, u, r)] for u in units_reserve])
+    return {(i, r): pp.lpSum([reserve_enabled[(i, u, r)] for u in units_reserve
+                              if (i, u, r) in reserve_enabled])
             for i in intervals for r in reserves}
 
 
+@cached_helper
 def total_power_charged_in_interval(sets, data, power_charged):
     """
     Produce a dictionary with intervals for keys, and values that are the sum of the
     poewr charged including losses
-    variables from each unit.
+    variables from each unit. Storage without a round trip efficiency cannot charge, so is left
+    out.
 
     :param sets dict: sets dictionary
     :param power_generated pulp.LpVariable: power generated variable
@@ -573,17 +817,20 @@ def total_power_charged_in_interval(sets, data, power_charged):
     intervals = sets["intervals"].indices
     units_storage = sets["units_storage"].indices
     power_charged = power_charged.var
+    round_trip_efficiency = \
+        dict(zip(units_storage, unit_parameters(data).get("RoundTripEfficiencyFrac", units_storage)))
 
     charge_dict = {
         i: pp.lpSum([
-            (1 / data["units"]["RoundTripEfficiencyFrac"][u])
+            (1 / round_trip_efficiency[u])
             * power_charged[(i, u)]
-            for u in units_storage]) for i in intervals
+            for u in units_storage if round_trip_efficiency[u] != 0]) for i in intervals
     }
 
     return charge_dict
 
 
+@cached_helper
 def ramp_calculator(sets, data, var):
     """
     Return a dictionary of the ramp (difference in power output) for each unit and
@@ -597,27 +844,22 @@ def ramp_calculator(sets, data, var):
 
     rampMW = dict()
     first_interval = sets["intervals"].indices[0]
+    units = sets["units"].indices
+    initial_power = initial_state_history(data).get("power_generated", units)
 
-    for u in sets["units"].indices:
-        try:
-            units_initial_power = \
-                float(data["initial_state"][("power_generated", -1)][u])
-        except KeyError:
-            units_initial_power = 0
-        except TypeError:
-            units_initial_power = 0
-
+    for u, units_initial_power in zip(units, initial_power):
         rampMW[(first_interval, u)] = \
             var["power_generated"].var[(first_interval, u)] - units_initial_power
 
         for i in sets["intervals"].indices[1:]:
             rampMW[(i, u)] = \
                 var["power_generated"].var[(i, u)] \
-                - var["power_generated"].var[(i-1, u)]
+                - var["power_generated"].var[(sets["intervals"].previous(i), u)]
 
     return rampMW
 
 
+@cached_helper
 def start_up_ramp_capacity_calculator(sets, data):
     """
     Return a dictionary of the start up ramp rate in MW per unit that has just started up.
@@ -627,19 +869,13 @@ def start_up_ramp_capacity_calculator(sets, data):
     :param sets dict: sets dictionary
     :param data dict: data dictionary
     """
-    start_up_ramp_capacityMW = dict()
 
-    for u in sets["units_commit"].indices:
-        start_up_ramp_capacityMW[u] = \
-            max(
-                data["units"]["RampRate_pctCapphr"][u],
-                data["units"]["MinimumGenerationFrac"][u]
-            ) \
-            * data["units"]["CapacityMW"][u]
+    units_commit = sets["units_commit"].indices
 
-    return start_up_ramp_capacityMW
+    return dict(zip(units_commit, unit_parameters(data).get("StartUpRampMW", units_commit)))
 
 
+@cached_helper
 def shut_down_ramp_capacity_calculator(sets, data):
     """
     Return a dictionary of the shut down ramp rate in MW per unit that has just started up.
@@ -650,19 +886,12 @@ def shut_down_ramp_capacity_calculator(sets, data):
     :param data dict: data dictionary
     """
 
-    shut_down_ramp_capacityMW = dict()
-
-    for u in sets["units_commit"].indices:
-        shut_down_ramp_capacityMW[u] = \
-            max(
-                data["units"]["RampRate_pctCapphr"][u],
-                data["units"]["MinimumGenerationFrac"][u]
-            ) \
-            * data["units"]["CapacityMW"][u]
+    units_commit = sets["units_commit"].indices
 
-    return shut_down_ramp_capacityMW
+    return dict(zip(units_commit, unit_parameters(data).get("ShutDownRampMW", units_commit)))
 
 
+@cached_helper
 def online_ramp_capacity_calculator(sets, data):
     """
     Return a dictionary of the ramp rate in MW per unit that is online.  Calcuclated as the
@@ -672,16 +901,12 @@ def online_ramp_capacity_calculator(sets, data):
     :param data dict: data dictionary
     """
 
-    online_ramp_capacityMW = dict()
-
-    for u in sets["units"].indices:
-        online_ramp_capacityMW[u] = \
-            data["units"]["RampRate_pctCapphr"][u] \
-            * data["units"]["CapacityMW"][u]
+    units = sets["units"].indices
 
-    return online_ramp_capacityMW
+    return dict(zip(units, unit_parameters(data).get("OnlineRampMW", units)))
 
 
+@cached_helper
 def minimum_generation_calculator(sets, data):
     """
     Return a dictionary of the minimum generation in MW.  Calcuclated as the product of the
@@ -691,7 +916,6 @@ def minimum_generation_calculator(sets, data):
     :param data dict: data dictionary
     """
 
-    return {
-        u: data["units"]["MinimumGenerationFrac"][u] * data["units"]["CapacityMW"][u]
-        for u in sets["units"].indices
-    }
+    units = sets["units"].indices
+
+    return dict(zip(units, unit_parameters(data).get("MinimumGenerationMW", units)))
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+
+class InitialStateHistory():
+    def __init__(self, initial_state):
+        """
+        Hold each initial state variable as a per-unit history array, where column k is interval
+        -(k+1), plus its cumulative sum counting back from interval -1.  The carry-in of any
+        backward window is then a single lookup, regardless of the window or horizon length.
+
+        :param initial_state DataFrame: initial state, indexed by unit, with (variable, interval)
+            columns, or None if there is no initial state
+        """
+
+        self.initial_state = initial_state
+        self.history = dict()
+        self.cumulative = dict()
+
+        if initial_state is None:
+            self.units = list()
+        else:
+            self.units = initial_state.index.to_list()
+
+        self.positions = {u: n for n, u in enumerate(self.units)}
+
+        if initial_state is None:
+            return
+
+        past_columns = [(v, c) for (v, c) in initial_state.columns if int(c) < 0]
+
+        for variable in dict.fromkeys(v for (v, c) in past_columns):
+            columns = [(v, c) for (v, c) in past_columns if v == variable]
+            history = np.zeros((len(self.units), max(-int(c) for (v, c) in columns)))
+
+            for column in columns:
+                values = pd.to_numeric(initial_state[column], errors="coerce").fillna(0)
+                history[:, -int(column[1]) - 1] += values.to_numpy(dtype=float)
+
+            cumulative = np.zeros((len(self.units), history.shape[1] + 1))
+            cumulative[:, 1:] = np.cumsum(history, axis=1)
+
+            self.history[variable] = history
+            self.cumulative[variable] = cumulative
+
+    def __repr__(self):
+        return "InitialStateHistory(units=%d, variables=%s)" % (len(self.units), list(self.history))
+
+    def __contains__(self, variable):
+        return variable in self.history
+
+    def unit_positions(self, units):
+        """
+        Return the positions of the units in the history arrays, and a mask of those with an
+        initial state.
+
+        :param units list: unit names
+        """
+
+        positions = np.array([self.positions.get(u, -1) for u in units], dtype=np.intp)
+
+        return positions, positions >= 0
+
+    def get(self, variable, units, interval=-1):
+        """
+        Return a variable's value in an initial state interval, as a float array aligned to the
+        units.  Units or intervals without an initial state are zero.
+
+        :param variable str: initial state variable, e.g. "num_committed"
+        :param units list: unit names
+        :param interval int: initial state interval
+        """
+
+        values = np.zeros(len(units))
+
+        if variable not in self.history or not -self.history[variable].shape[1] <= interval < 0:
+            return values
+
+        positions, defined = self.unit_positions(units)
+        values[defined] = self.history[variable][positions[defined], -interval - 1]
+
+        return values
+
+    def value(self, variable, u, interval=-1):
+        """
+        Return a variable's value in an initial state interval for a single unit.
+
+        :param variable str: initial state variable, e.g. "num_committed"
+        :param u str: unit name
+        :param interval int: initial state interval
+        """
+
+        return self.get(variable, [u], interval)[0]
+
+    def window_sum(self, variable, units, interval_low):
+        """
+        Return the sum of a variable over the initial state intervals from interval_low to -1, as
+        a float array aligned to the units.  This is the carry-in of a backward window starting at
+        interval_low, and is zero for windows that start at interval 0 or later.
+
+        :param variable str: initial state variable, e.g. "num_starting_up"
+        :param units list: unit names
+        :param interval_low array: first interval of each unit's window, which may also be a
+            (intervals, units) array
+        """
+
+        interval_low = np.asarray(interval_low)
+        window_sum = np.zeros(np.broadcast_shapes(interval_low.shape, (len(units),)))
+
+        if variable not in self.cumulative:
+            return window_sum
+
+        cumulative = self.cumulative[variable]
+        positions, defined = self.unit_positions(units)
+        depth = np.clip(-interval_low.astype(np.intp), 0, cumulative.shape[1] - 1)
+        depth = np.broadcast_to(depth, window_sum.shape)
+
+        window_sum[..., defined] = cumulative[positions[defined], depth[..., defined]]
+
+        return window_sum
+
+
+def initial_state_history(data):
+    """
+    Return the initial state history from the data dictionary, building it from the initial
+    state the first time it is needed (or if the initial state has since been replaced).
+
+    :param data dict: data dictionary
+    """
+
+    initial_state = data.get("initial_state")
+    history = data.get("initial_state_history")
+
+    if history is None or history.initial_state is not initial_state:
+        history = InitialStateHistory(initial_state)
+        data["initial_state_history"] = history
+
+    return history
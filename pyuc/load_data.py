@@ -1,6 +1,8 @@
 import pandas as pd
 
 from pyuc import pyuc, utils
+from pyuc.initial_state import InitialStateHistory
+from pyuc.unit_parameters import UnitParameterTable
 
 
 def load_data(problem):
@@ -10,11 +12,16 @@ def load_data(problem):
     :param paths dict: paths dictionary
     """
 
+    units = load_unit_data(problem["paths"]["unit_data"])
+    initial_state = load_initial_state(problem["paths"]["initial_state"])
+
     return {
         "demand": load_demand_data(problem["paths"]["demand"]),
-        "units": load_unit_data(problem["paths"]["unit_data"]),
+        "units": units,
+        "unit_parameters": UnitParameterTable(units),
         "variable_traces": load_variable_data(problem["paths"]["variable_traces"]),
-        "initial_state": load_initial_state(problem["paths"]["initial_state"]),
+        "initial_state": initial_state,
+        "initial_state_history": InitialStateHistory(initial_state),
         "ValueOfLostLoad$/MWh": load_voll(problem["settings"]),
         "IntervalDurationHrs": load_interval_duration(problem["settings"])
     }
@@ -189,9 +196,16 @@ def create_subsets(sets, data, reserve_opt=None):
 
 def create_combination_sets(sets):
     """
-    Combine existing sets for convience.
+    Combine existing sets for convience.  units_reserve_x_reserves holds the (unit, reserve)
+    pairs that units can provide, which is the domain of the reserve enabled variable.
 
     :param sets dict: problem sets
     """
 
+    if "units_reserve" in sets.keys() and "reserves" in sets.keys():
+        sets["units_reserve_x_reserves"] = pyuc.Set(
+            "units_reserve_x_reserves",
+            [(u, r) for u in sets["units_reserve"].indices for r in sets["reserves"].indices]
+        )
+
     return sets
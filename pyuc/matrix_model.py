@@ -0,0 +1,354 @@
+import numpy as np
+import pulp as pp
+
+from pyuc.vectorised_constraints import ConstraintBlock
+
+row_types = {pp.LpConstraintLE: "L", pp.LpConstraintGE: "G", pp.LpConstraintEQ: "E"}
+
+
+class MatrixModel():
+    def __init__(self, var):
+        """
+        A linear model held as NumPy arrays: one column per pulp variable of the problem's Vars,
+        and constraint rows accumulated as COO (row, column, value) triplets with a sense and
+        right hand side per row.  Constraint families are added without building pulp
+        expressions, and the model is written straight to a free-format MPS file.
+
+        :param var dict: var dictionary
+        """
+
+        variables = [v for x in var.values() for v in x.var.values()]
+
+        self.variables = variables
+        self.columns = {v: n for n, v in enumerate(variables)}
+        self.update_columns()
+        self.objective = np.zeros(len(variables))
+        self.objective_constant = 0
+
+        self.entry_rows, self.entry_columns, self.entry_values = list(), list(), list()
+        self.row_senses, self.row_rhs = list(), list()
+        self.families = dict()
+        self.num_rows = 0
+
+    def __repr__(self):
+        return "MatrixModel(rows=%d, columns=%d)" % (self.num_rows, len(self.variables))
+
+    def update_columns(self):
+        """Read the bounds and type of each column from its pulp variable, e.g. after fixing. """
+
+        self.column_lower = np.array(
+            [-np.inf if v.lowBound is None else v.lowBound for v in self.variables], dtype=float
+        )
+        self.column_upper = np.array(
+            [np.inf if v.upBound is None else v.upBound for v in self.variables], dtype=float
+        )
+        self.column_integer = \
+            np.array([v.cat == pp.LpInteger for v in self.variables], dtype=bool)
+
+    def add_entries(self, rows, variables, values):
+        """
+        Add coefficient entries, skipping those without a variable.
+
+        :param rows array: row of each entry
+        :param variables list: pulp variable of each entry, or None
+        :param values array: coefficient of each entry
+        """
+
+        has_variable = np.fromiter((v is not None for v in variables), dtype=bool)
+        columns = np.fromiter(
+            (self.columns[v] for v in variables if v is not None), dtype=np.intp
+        )
+
+        self.entry_rows.append(np.asarray(rows, dtype=np.intp)[has_variable])
+        self.entry_columns.append(columns)
+        self.entry_values.append(np.asarray(values, dtype=float)[has_variable])
+
+    def add_rows(self, senses, rhs):
+        """Add rows with the given senses and right hand sides, returning their row numbers. """
+
+        rows = np.arange(self.num_rows, self.num_rows + len(rhs))
+        self.row_senses.append(np.asarray(senses, dtype=int))
+        self.row_rhs.append(np.asarray(rhs, dtype=float))
+        self.num_rows += len(rhs)
+
+        return rows
+
+    def add_block(self, block):
+        """
+        Add the rows of a ConstraintBlock directly from its coefficient arrays.
+
+        :param block ConstraintBlock: constraint family
+        """
+
+        rows = self.add_rows(np.full(len(block), block.sense), block.rhs)
+
+        for variables, coefficients in block.terms:
+            self.add_entries(rows, variables, coefficients)
+
+        for expressions in block.expressions:
+            expression_rows = [r for r, e in zip(rows, expressions) for _ in range(len(e))]
+            self.add_entries(
+                expression_rows,
+                [v for e in expressions for v in e.keys()],
+                [x for e in expressions for x in e.values()]
+            )
+
+        return rows
+
+    def add_conditions(self, constraints):
+        """
+        Add the rows of a dictionary of pulp constraints, e.g. from the reference builder.
+
+        :param constraints dict: label-condition pairs
+        """
+
+        conditions = list(constraints.values())
+        rows = self.add_rows(
+            [c.sense for c in conditions], [-c.constant for c in conditions]
+        )
+
+        self.add_entries(
+            [r for r, c in zip(rows, conditions) for _ in range(len(c))],
+            [v for c in conditions for v in c.keys()],
+            [x for c in conditions for x in c.values()]
+        )
+
+        return rows
+
+    def add_constraints(self, constraints, family_id):
+        """
+        Add a constraint family, recording the range of rows it occupies.
+
+        :param constraints dict or ConstraintBlock: a constraint family
+        :param family_id str: constraint family ID
+        """
+
+        if isinstance(constraints, ConstraintBlock):
+            rows = self.add_block(constraints)
+        else:
+            rows = self.add_conditions(constraints)
+
+        self.families[family_id] = (self.num_rows - len(rows), self.num_rows)
+
+    def drop_rows(self, drop):
+        """
+        Remove rows from the model, renumbering the rows that remain and each family's range.
+
+        :param drop array: boolean mask of the rows to remove
+        """
+
+        keep = ~np.asarray(drop, dtype=bool)
+        new_rows = np.cumsum(keep) - 1
+        kept_before = np.concatenate([[0], np.cumsum(keep)])
+
+        if self.entry_rows:
+            rows = np.concatenate(self.entry_rows)
+            kept_entries = keep[rows]
+            self.entry_rows = [new_rows[rows[kept_entries]]]
+            self.entry_columns = [np.concatenate(self.entry_columns)[kept_entries]]
+            self.entry_values = [np.concatenate(self.entry_values)[kept_entries]]
+
+        self.row_senses = [self.senses()[keep]]
+        self.row_rhs = [self.rhs()[keep]]
+        self.families = {
+            family_id: (int(kept_before[start]), int(kept_before[end]))
+            for family_id, (start, end) in self.families.items()
+        }
+        self.num_rows = int(keep.sum())
+
+    def substitute_columns(self, fixed, values):
+        """
+        Remove the entries of fixed columns from the rows, moving their contribution to the
+        right hand sides.  Returns the number of entries removed.
+
+        :param fixed array: boolean mask of the fixed columns
+        :param values array: value of each column, used for the fixed columns
+        """
+
+        if not self.entry_rows:
+            return 0
+
+        rows = np.concatenate(self.entry_rows)
+        columns = np.concatenate(self.entry_columns)
+        values_in_rows = np.concatenate(self.entry_values)
+        substituted = fixed[columns]
+
+        contribution = values_in_rows[substituted] * values[columns[substituted]]
+        rhs = self.rhs() - np.bincount(
+            rows[substituted], weights=contribution, minlength=self.num_rows
+        )
+
+        self.entry_rows = [rows[~substituted]]
+        self.entry_columns = [columns[~substituted]]
+        self.entry_values = [values_in_rows[~substituted]]
+        self.row_senses = [self.senses()]
+        self.row_rhs = [rhs]
+
+        return int(np.count_nonzero(substituted))
+
+    def set_objective(self, objective, sense=pp.LpMinimize):
+        """
+        Set the objective coefficients from a pulp expression.  The model is always minimised, so
+        a maximisation objective is negated.
+
+        :param objective pulp.LpAffineExpression: objective function
+        :param sense int: pulp objective sense
+        """
+
+        self.objective = np.zeros(len(self.variables))
+
+        for v, x in objective.items():
+            self.objective[self.columns[v]] += sense * x
+
+        self.objective_constant = sense * objective.constant
+
+    def senses(self):
+        return np.concatenate(self.row_senses) if self.row_senses else np.zeros(0, dtype=int)
+
+    def rhs(self):
+        return np.concatenate(self.row_rhs) if self.row_rhs else np.zeros(0)
+
+    def row_bounds(self):
+        """Return the lower and upper bound of each row, from its sense and right hand side. """
+
+        senses, rhs = self.senses(), self.rhs()
+        row_lower = np.where(senses == pp.LpConstraintLE, -np.inf, rhs)
+        row_upper = np.where(senses == pp.LpConstraintGE, np.inf, rhs)
+
+        return row_lower, row_upper
+
+    def coo(self):
+        """
+        Return the constraint matrix as COO (rows, columns, values) arrays, with repeated entries
+        summed and zero entries removed.
+        """
+
+        if not self.entry_rows:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros(0)
+
+        rows = np.concatenate(self.entry_rows)
+        columns = np.concatenate(self.entry_columns)
+        values = np.concatenate(self.entry_values)
+
+        keys, inverse = np.unique(rows * len(self.variables) + columns, return_inverse=True)
+        values = np.bincount(inverse.ravel(), weights=values, minlength=len(keys))
+        non_zero = values != 0
+
+        return (keys // len(self.variables))[non_zero], \
+            (keys % len(self.variables))[non_zero], values[non_zero]
+
+    def csr(self):
+        """Return the constraint matrix in CSR form, as (indptr, columns, values) arrays. """
+
+        rows, columns, values = self.coo()
+        indptr = np.zeros(self.num_rows + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=self.num_rows), out=indptr[1:])
+
+        return indptr, columns, values
+
+    def write_mps(self, path, name="pyuc"):
+        """
+        Write the model to a free-format MPS file, with rows named R0, R1, ... and columns named
+        C0, C1, ... in model order.
+
+        :param path str: path of the MPS file
+        :param name str: model name
+        """
+
+        rows, columns, values = self.coo()
+
+        # Objective entries take row -1, which names the OBJ row.  Every column gets one, even if
+        # it is zero, so that columns without constraint entries are still declared.
+        has_entries = np.bincount(columns, minlength=len(self.variables)) > 0
+        objective_columns = np.flatnonzero((self.objective != 0) | ~has_entries)
+        rows = np.concatenate([np.full(len(objective_columns), -1), rows])
+        columns = np.concatenate([objective_columns, columns])
+        values = np.concatenate([self.objective[objective_columns], values])
+
+        order = np.lexsort((rows, columns))
+        rows, columns, values = rows[order].tolist(), columns[order], values[order].tolist()
+        row_names = ["R%d" % r for r in range(self.num_rows)] + ["OBJ"]
+
+        column_lines = [
+            " C%d %s %.17g\n" % (c, row_names[r], x)
+            for c, r, x in zip(columns.tolist(), rows, values)
+        ]
+
+        # Integer columns are wrapped in markers, inserted where the column type changes
+        changes = np.flatnonzero(np.diff(np.concatenate([[0], self.column_integer, [0]])))
+        marker_lines = np.searchsorted(columns, changes)
+
+        for n, line in reversed(list(enumerate(marker_lines))):
+            marker = "INTORG" if n % 2 == 0 else "INTEND"
+            column_lines.insert(line, " MARKER 'MARKER' '%s'\n" % marker)
+
+        with open(path, "w") as f:
+            # FREE tells COIN-OR readers not to fall back to fixed-format fields
+            f.write("NAME %s FREE\n" % name)
+            f.write("ROWS\n N OBJ\n")
+            f.writelines(" %s %s\n" % (row_types[s], row_names[r])
+                         for r, s in enumerate(self.senses().tolist()))
+
+            f.write("COLUMNS\n")
+            f.writelines(column_lines)
+
+            f.write("RHS\n")
+            f.writelines(" RHS %s %.17g\n" % (row_names[r], x)
+                         for r, x in enumerate(self.rhs().tolist()) if x != 0)
+
+            f.write("BOUNDS\n")
+            f.writelines(self.bound_lines())
+            f.write("ENDATA\n")
+
+    def bound_lines(self):
+        """Yield the MPS bound lines of each column that doesn't have the default bounds. """
+
+        for c, (lower, upper, integer) in enumerate(
+                zip(self.column_lower, self.column_upper, self.column_integer)):
+            if lower == upper:
+                yield " FX BND C%d %.17g\n" % (c, lower)
+                continue
+
+            # Integer columns without bounds are read as binary by some solvers
+            if lower == -np.inf:
+                yield " MI BND C%d\n" % c
+            elif lower != 0 or (integer and upper == np.inf):
+                yield " LO BND C%d %.17g\n" % (c, lower)
+
+            if upper != np.inf:
+                yield " UP BND C%d %.17g\n" % (c, upper)
+
+    def initial_values(self):
+        """
+        Return the columns whose pulp variable has a value set, e.g. a warm start from
+        setInitialValue, and their values.
+        """
+
+        columns = [c for c, v in enumerate(self.variables) if v.varValue is not None]
+        values = [self.variables[c].varValue for c in columns]
+
+        return np.array(columns, dtype=np.intp), np.array(values, dtype=float)
+
+    def set_solution(self, values):
+        """
+        Pass column values back to the pulp variables, and so to the Vars they belong to.
+
+        :param values array: value of each column
+        """
+
+        for v, x in zip(self.variables, values.tolist()):
+            v.varValue = x
+
+
+def matrix_model_from_pulp_problem(problem):
+    """
+    Return a MatrixModel holding the constraints of the problem's pulp problem, for solvers that
+    take the model as arrays when the Pulp model backend is used.
+
+    :param problem dict: main problem
+    """
+
+    model = MatrixModel(problem["var"])
+    model.add_constraints(problem["problem"].constraints, "Pulp")
+
+    return model
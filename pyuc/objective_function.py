@@ -1,5 +1,7 @@
 import pulp as pp
 
+from pyuc.unit_parameters import unit_parameters
+
 
 def objective_adder(objective_term_func):
     def extractor_wrapper(problem):
@@ -13,21 +15,36 @@ def objective_adder(objective_term_func):
 
 @objective_adder
 def fuel_cost_term(sets, data, var):
+    units_commit = sets["units_commit"].indices
+    unit_params = unit_parameters(data)
+    thermal_efficiency = unit_params.get("ThermalEfficiencyFrac", units_commit)
+
+    if any(thermal_efficiency == 0):
+        no_efficiency = [u for u, e in zip(units_commit, thermal_efficiency) if e == 0]
+        print("\nUnits %s have no ThermalEfficiencyFrac, so their fuel cost can't be calculated\n"
+              % ", ".join(no_efficiency))
+        raise ValueError("Committed unit without a thermal efficiency")
+
+    fuel_cost = dict(zip(units_commit, unit_params.get("FuelCost$/MWh", units_commit)))
+
     return pp.lpSum([
         data["IntervalDurationHrs"]
         * var["power_generated"].var[(i, u)]
-        * fuel_cost_per_mwh_calculator(data["units"], u)
-        for u in sets["units_commit"].indices for i in sets["intervals"].indices
+        * fuel_cost[u]
+        for u in units_commit for i in sets["intervals"].indices
     ])
 
 
 @objective_adder
 def vom_cost_term(sets, data, var):
+    units = sets["units"].indices
+    vom_cost = dict(zip(units, unit_parameters(data).get("VOM$/MWh", units)))
+
     return pp.lpSum([
         data["IntervalDurationHrs"]
         * var["power_generated"].var[(i, u)]
-        * data["units"]["VOM$/MWh"][u]
-        for u in sets["units"].indices for i in sets["intervals"].indices
+        * vom_cost[u]
+        for u in units for i in sets["intervals"].indices
     ])
 
 
@@ -51,13 +68,3 @@ def make_objective_function(problem):
 
     return problem["problem"]
 
-
-def fuel_cost_per_mwh_calculator(unit_data, u):
-    """
-    Calculate fuel cost in $/MWh
-
-    :param unit_data DataFrame: unit_data df
-    :param u str: unit name
-    """
-
-    return 3.6 * unit_data["FuelCost$/GJ"][u] / unit_data["ThermalEfficiencyFrac"][u]
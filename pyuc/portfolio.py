@@ -0,0 +1,462 @@
+import contextlib
+import copy
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+import numpy as np
+import pandas as pd
+import pulp as pp
+
+from pyuc import constraint_adder as ca
+from pyuc import matrix_model as mm
+from pyuc import relax_and_fix as rf
+from pyuc import relax_and_repair as rr
+from pyuc import setup_problem as sp
+from pyuc import solvers
+
+# Configurations raced when the problem has none and there is no portfolio.csv.  Each is a
+# name and the settings it overrides.
+default_portfolio = [
+    {"Name": "CBC", "Solver": "CBC"},
+    {"Name": "CBCSeed", "Solver": "CBC", "SolverRandomSeed": 7},
+    {"Name": "HiGHS", "Solver": "HiGHS"},
+    {"Name": "RelaxAndRepair", "SolveMode": "RelaxAndRepair"},
+]
+
+# Solve modes a configuration can use
+portfolio_solve_modes = {
+    "MIP": solvers.solve,
+    "RelaxAndRepair": rr.solve_relax_and_repair,
+    "RelaxAndFix": rf.solve_relax_and_fix,
+}
+
+# Seconds allowed beyond the solver time limit for configurations to return their solution
+portfolio_grace_secs = 30
+
+
+def solve_portfolio(problem):
+    """
+    Race several solver configurations on the same model, each in its own process.  The first
+    configuration to reach the target gap wins and the rest are killed: a MIP solve that
+    finishes optimal (to its SolverRelativeGap), or a relax-and-repair solve whose gap to the LP
+    bound is within SolverRelativeGap.  If none does by the SolverTimeLimitSecs setting (plus a
+    grace period), or all finish without reaching it, the best solution found wins.  Each
+    configuration's solver also has the SolverTimeLimitSecs limit, unless it sets its own.
+
+    The winner's solution is passed back to the Vars, and the outcome of each configuration is
+    stored in problem["portfolio"].
+
+    :param problem dict: main problem
+    """
+
+    configurations = portfolio_configurations(problem)
+    context = fork_context()
+    results = context.Queue()
+    processes = dict()
+
+    for configuration in configurations:
+        process = context.Process(
+            target=run_configuration, args=(problem, configuration, results), daemon=True
+        )
+        process.start()
+        processes[configuration["Name"]] = process
+
+    try:
+        outcomes = collect_results(problem, configurations, processes, results)
+    finally:
+        for process in processes.values():
+            kill_process(process)
+
+    winner = choose_winner(outcomes)
+    problem["portfolio"] = portfolio_report(configurations, outcomes, winner)
+    print_portfolio(problem["portfolio"])
+
+    if winner is None:
+        print("\nNo portfolio configuration found a solution\n")
+        raise ValueError("Portfolio found no solution")
+
+    set_portfolio_solution(problem, outcomes[winner])
+    solvers.report_progress(
+        problem,
+        "portfolio_winner",
+        configuration=winner,
+        status=problem["problem"].status,
+        objective=problem["problem"].objective.value()
+    )
+
+    return problem["problem"]
+
+
+def fork_context(user="The Portfolio solve mode"):
+    """
+    Return the fork multiprocessing context, so each configuration's process starts with a copy
+    of the model already built.
+
+    :param user str: what needs the processes, for the message if forking isn't supported
+    """
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        print("\n%s needs processes to be started by forking, which this platform doesn't "
+              "support\n" % user)
+        raise ValueError("%s is not supported" % user)
+
+    return multiprocessing.get_context("fork")
+
+
+def portfolio_configurations(problem):
+    """
+    Return the configurations to race: problem["portfolio_configurations"] if set, otherwise
+    the rows of portfolio.csv in the input data, otherwise default_portfolio.  Each
+    configuration is checked against the known settings.
+
+    :param problem dict: main problem
+    """
+
+    configurations = problem.get("portfolio_configurations")
+
+    if configurations is None:
+        path = (problem.get("paths") or {}).get("portfolio")
+
+        if path is not None and os.path.exists(path):
+            configurations = load_portfolio(path)
+        else:
+            configurations = default_portfolio
+
+    for configuration in configurations:
+        validate_configuration(problem, configuration)
+
+    return configurations
+
+
+def load_portfolio(path):
+    """
+    Read portfolio.csv, which has a Name column and a column for each setting overridden by
+    any configuration (blank where a configuration keeps the problem's setting).
+
+    :param path str: path to portfolio.csv
+    """
+
+    portfolio = pd.read_csv(path, dtype=str)
+    configurations = list()
+
+    for _, row in portfolio.iterrows():
+        configuration = {"Name": row["Name"]}
+
+        for name, value in row.drop("Name").dropna().items():
+            configuration[name] = portfolio_setting_value(name, value)
+
+        configurations.append(configuration)
+
+    return configurations
+
+
+def portfolio_setting_value(name, value):
+    """
+    Convert a portfolio.csv value to the type of its setting.
+
+    :param name str: setting name
+    :param value str: value as read from the file
+    """
+
+    setting_type = sp.solver_option_types.get(name, type(sp.default_settings.get(name)))
+
+    if setting_type is bool:
+        return sp.collect_setting_type_boolean(value)
+    elif setting_type is int:
+        return sp.collect_setting_type_integer(value)
+    elif setting_type is float:
+        return sp.collect_setting_type_float(value)
+
+    return value
+
+
+def validate_configuration(problem, configuration):
+    """
+    Check a configuration's settings: each must be a known setting, its solve mode must be one
+    configurations can use, and its solver options must be valid.  A configuration can switch
+    from the Pulp model backend to the Matrix one, but not back, as the Matrix model backend
+    doesn't add the constraints to the pulp problem.
+
+    :param problem dict: main problem
+    :param configuration dict: configuration name and settings
+    """
+
+    name = configuration.get("Name")
+    unknown = [k for k in configuration.keys() if k != "Name" and k not in sp.default_settings]
+
+    if name is None or unknown:
+        print("\nPortfolio configuration %s has no name or unknown settings: %s\n"
+              % (name, ", ".join(unknown)))
+        raise ValueError("Invalid portfolio configuration")
+
+    solve_mode = configuration.get("SolveMode", "MIP")
+
+    if solve_mode not in portfolio_solve_modes.keys():
+        print("\nPortfolio configuration %s solve mode %s is not one of %s\n"
+              % (name, solve_mode, ", ".join(portfolio_solve_modes.keys())))
+        raise ValueError("Invalid portfolio configuration")
+
+    if ca.use_matrix_backend(problem) and configuration.get("ModelBackend") == "Pulp":
+        print("\nPortfolio configuration %s can't use the Pulp model backend for a problem "
+              "built with the Matrix model backend\n" % name)
+        raise ValueError("Invalid portfolio configuration")
+
+    sp.validate_solver_options(configuration)
+
+
+def configured_problem(problem, configuration):
+    """
+    Return a copy of the problem dictionary with the configuration's settings, sharing the
+    model.  This is only used in a configuration's own process.
+
+    :param problem dict: main problem
+    :param configuration dict: configuration name and settings
+    """
+
+    settings = dict(problem.get("settings") or {})
+    settings.update({k: v for k, v in configuration.items() if k != "Name"})
+    settings["SolveMode"] = configuration.get("SolveMode", "MIP")
+
+    configured = dict(problem, settings=settings, progress_callback=None, stop_event=None)
+
+    if ca.use_matrix_backend(configured) and "matrix_model" not in configured.keys():
+        configured["matrix_model"] = mm.matrix_model_from_pulp_problem(problem)
+
+    return configured
+
+
+def portfolio_variables(problem):
+    """Return every pulp variable of the Vars, in a fixed order. """
+
+    return [v for var in problem["var"].values() for v in var.var.values()]
+
+
+def run_configuration(problem, configuration, results):
+    """
+    Solve the problem with a configuration and put the outcome on the results queue.  The
+    process starts a new session, so the solver processes it starts are killed with it.
+
+    :param problem dict: main problem (the process's own copy)
+    :param configuration dict: configuration name and settings
+    :param results multiprocessing.Queue: queue for the outcome
+    """
+
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+    outcome = {"name": configuration["Name"]}
+    start_time = time.time()
+
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            configured = configured_problem(problem, configuration)
+            solve_mode = sp.get_setting(configured, "SolveMode")
+            solved = portfolio_solve_modes[solve_mode](configured)
+
+        values = [v.varValue for v in portfolio_variables(problem)]
+        outcome.update(
+            status=solved.status,
+            sol_status=solved.sol_status,
+            objective=solved.objective.value(),
+            solve_time=solved.solutionTime,
+            wall_time=time.time() - start_time,
+            values=np.array([np.nan if x is None else x for x in values], dtype=float),
+            reached_target=reached_target(
+                configured, solve_mode, solved.status, solved.sol_status
+            ),
+            relax_and_repair=copy.deepcopy(configured.get("relax_and_repair")),
+            solver_options=configured.get("solver_options"),
+        )
+
+    except Exception as error:
+        outcome.update(error="%s: %s" % (type(error).__name__, error))
+
+    results.put(outcome)
+
+
+def reached_target(problem, solve_mode, status, sol_status):
+    """
+    Return whether a configuration's solve reached the target gap: an optimal MIP solve, or a
+    relax-and-repair solve within SolverRelativeGap of the LP bound.  pulp gives a CBC solve
+    stopped on time with a solution the Optimal status, so a MIP solve must also have an
+    optimal solution status.
+
+    :param problem dict: the configuration's problem
+    :param solve_mode str: the configuration's solve mode
+    :param status int: pulp status of the solve
+    :param sol_status int: pulp solution status of the solve
+    """
+
+    if status != 1:
+        return False
+
+    if solve_mode == "RelaxAndRepair":
+        gap = problem.get("relax_and_repair", {}).get("gap")
+        target = sp.get_setting(problem, "SolverRelativeGap")
+
+        return gap is not None and target is not None and gap <= target
+
+    return sol_status == pp.LpSolutionOptimal
+
+
+def collect_results(problem, configurations, processes, results):
+    """
+    Collect the configurations' outcomes until one reaches the target gap, all have finished,
+    the time limit passes or the problem's stop event is set.  Returns the outcomes by name.
+
+    :param problem dict: main problem
+    :param configurations list: configurations raced
+    :param processes dict: process of each configuration
+    :param results multiprocessing.Queue: queue of outcomes
+    """
+
+    time_limit = sp.get_setting(problem, "SolverTimeLimitSecs")
+    deadline = None if time_limit is None else time.time() + time_limit + portfolio_grace_secs
+    stop_event = problem.get("stop_event")
+    outcomes = dict()
+
+    while len(outcomes) < len(configurations):
+        if deadline is not None and time.time() > deadline:
+            break
+
+        if stop_event is not None and stop_event.is_set():
+            break
+
+        try:
+            outcome = results.get(timeout=0.1)
+        except queue.Empty:
+            # A process that died without reporting (e.g. killed by the system) has failed
+            for name, process in processes.items():
+                if name not in outcomes and not process.is_alive() and results.empty():
+                    outcomes[name] = {"name": name, "error": "exit code %s" % process.exitcode}
+
+            continue
+
+        outcomes[outcome["name"]] = outcome
+        solvers.report_progress(
+            problem,
+            "portfolio_result",
+            configuration=outcome["name"],
+            status=outcome.get("status"),
+            objective=outcome.get("objective"),
+            error=outcome.get("error")
+        )
+
+        if outcome.get("reached_target"):
+            break
+
+    return outcomes
+
+
+def kill_process(process):
+    """
+    Kill a configuration's process, and the solver processes in its session.
+
+    :param process multiprocessing.Process: configuration's process
+    """
+
+    if process.is_alive():
+        if hasattr(os, "killpg"):
+            with contextlib.suppress(ProcessLookupError, PermissionError):
+                os.killpg(process.pid, signal.SIGKILL)
+
+        process.kill()
+
+    process.join()
+
+
+def choose_winner(outcomes):
+    """
+    Return the name of the winning configuration: the first to reach the target gap, otherwise
+    the one with the lowest objective among those with a solution, or None.
+
+    :param outcomes dict: outcome of each configuration, in the order they finished
+    """
+
+    for name, outcome in outcomes.items():
+        if outcome.get("reached_target"):
+            return name
+
+    solved = {
+        name: outcome["objective"] for name, outcome in outcomes.items()
+        if outcome.get("status") in [0, 1] and outcome.get("objective") is not None
+        and not np.isnan(outcome["values"]).all()
+    }
+
+    if not solved:
+        return None
+
+    return min(solved, key=solved.get)
+
+
+def portfolio_report(configurations, outcomes, winner):
+    """
+    Return the winner and a table of each configuration's outcome: Won, Finished, Failed or
+    Killed (still running when the race ended).
+
+    :param configurations list: configurations raced
+    :param outcomes dict: outcome of each configuration that finished
+    :param winner str: name of the winning configuration, or None
+    """
+
+    rows = list()
+
+    for configuration in configurations:
+        name = configuration["Name"]
+        outcome = outcomes.get(name, {})
+
+        if name == winner:
+            result = "Won"
+        elif "error" in outcome:
+            result = "Failed"
+        elif outcome:
+            result = "Finished"
+        else:
+            result = "Killed"
+
+        rows.append({
+            "Configuration": name,
+            "Result": result,
+            "Status": outcome.get("status"),
+            "SolutionStatus": outcome.get("sol_status"),
+            "Objective": outcome.get("objective"),
+            "SolveTime": outcome.get("solve_time"),
+            "Error": outcome.get("error"),
+        })
+
+    return {"winner": winner, "results": pd.DataFrame(rows).set_index("Configuration")}
+
+
+def set_portfolio_solution(problem, outcome):
+    """
+    Pass the winning configuration's solution back to the Vars, and set its status, solution
+    status and solve time on the pulp problem.
+
+    :param problem dict: main problem
+    :param outcome dict: the winning configuration's outcome
+    """
+
+    for v, value in zip(portfolio_variables(problem), outcome["values"].tolist()):
+        v.varValue = None if np.isnan(value) else value
+
+    problem["problem"].assignStatus(outcome["status"], outcome["sol_status"])
+    problem["problem"].solutionTime = outcome["solve_time"]
+
+    if outcome.get("relax_and_repair") is not None:
+        problem["relax_and_repair"] = outcome["relax_and_repair"]
+
+    problem["solver_options"] = outcome.get("solver_options")
+
+
+def print_portfolio(report):
+    print("Portfolio winner: %s" % report["winner"])
+
+    for name, row in report["results"].iterrows():
+        print("    %s: %s%s" % (
+            name, row["Result"],
+            "" if row["Objective"] is None or pd.isna(row["Objective"])
+            else " (%f)" % row["Objective"]
+        ))
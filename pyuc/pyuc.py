@@ -7,7 +7,13 @@ import pulp as pp
 from pyuc import constraint_adder as ca
 from pyuc import load_data as ld
 from pyuc import objective_function as of
+from pyuc import portfolio as pf
+from pyuc import reduction as rd
+from pyuc import relax_and_fix as rf
+from pyuc import relax_and_repair as rr
 from pyuc import setup_problem as sp
+from pyuc import solvers
+from pyuc import warm_start as ws
 
 
 def run_opt_problem(name, input_data_path, output_data_path):
@@ -17,6 +23,8 @@ def run_opt_problem(name, input_data_path, output_data_path):
     problem["var"] = create_variables(problem["sets"])
     problem["problem"] = ca.add_constraints(problem)
     problem["problem"] = of.make_objective_function(problem)
+    rd.apply_reduction_setting(problem)
+    ws.apply_warm_start_setting(problem)
     problem["problem"] = solve_problem(problem)
     save_results(problem)
 
@@ -37,6 +45,16 @@ def create_variables(sets):
     vars["num_starting_up"] = \
         Var("num_starting_up", "#Units", [s["intervals"], s["units_commit"]], "Integer")
 
+    # Running totals of the start ups and shut downs from the first interval, so the minimum up
+    # and down time rows count the events within a window from two terms
+    vars["cumulative_starting_up"] = \
+        Var("cumulative_starting_up", "#Units", [s["intervals"], s["units_commit"]],
+            "Continuous")
+
+    vars["cumulative_shutting_down"] = \
+        Var("cumulative_shutting_down", "#Units", [s["intervals"], s["units_commit"]],
+            "Continuous")
+
     vars["unserved_power"] = \
         Var("unserved_power", "MW", [s["intervals"]], "Continuous")
 
@@ -53,7 +71,8 @@ def create_variables(sets):
         Var("reserve_enabled",
             "MW",
             [s["intervals"], s["units_reserve"], s["reserves"]],
-            "Continuous"
+            "Continuous",
+            s.get("units_reserve_x_reserves")
             )
 
     return vars
@@ -61,17 +80,33 @@ def create_variables(sets):
 
 def solve_problem(problem):
     """
-    Pass the problem to the solver, using the pulp command
+    Pass the problem to the solver chosen by the Solver setting (CBC by default), using the
+    solve mode chosen by the SolveMode setting.
 
     :param problem dict: model problem
     """
 
-    problem["problem"].solve(solver=pp.apis.PULP_CBC_CMD(msg=False))
+    solve_mode = sp.get_setting(problem, "SolveMode")
+
+    if solve_mode not in solve_modes.keys():
+        print("\nSolve mode %s is not one of %s\n" % (solve_mode, ", ".join(solve_modes.keys())))
+        raise ValueError("Unknown solve mode")
+
+    problem["problem"] = solve_modes[solve_mode](problem)
+
     print_solution_value_and_time(problem["problem"])
 
     return problem["problem"]
 
 
+solve_modes = {
+    "MIP": solvers.solve,
+    "RelaxAndRepair": rr.solve_relax_and_repair,
+    "RelaxAndFix": rf.solve_relax_and_fix,
+    "Portfolio": pf.solve_portfolio,
+}
+
+
 def print_solution_value_and_time(problem):
     status_dict = {
         1: "Optimal",
@@ -91,6 +126,11 @@ def save_results(problem):
         var.to_df_fn_chooser()
         var.to_csv(problem["paths"]["results"])
 
+    if "constraint_names" in problem.keys():
+        ca.constraint_name_table(problem).to_csv(
+            os.path.join(problem["paths"]["outputs"], "constraint_names.csv")
+        )
+
 
 class Set():
     def __init__(self, name, indices, master_set=None):
@@ -104,6 +144,8 @@ class Set():
 
         self.name = name
         self.indices = indices
+        self.ordered_indices = tuple(indices)
+        self.positions = {ind: n for n, ind in enumerate(self.ordered_indices)}
         self.subsets = list()
 
         if master_set is not None:
@@ -116,6 +158,50 @@ class Set():
     def __repr__(self):
         return "Set(%s)" % self.name
 
+    def __contains__(self, ind):
+        return ind in self.positions
+
+    def __len__(self):
+        return len(self.ordered_indices)
+
+    def __iter__(self):
+        return iter(self.ordered_indices)
+
+    def __getitem__(self, key):
+        return self.ordered_indices[key]
+
+    def position(self, ind):
+        """
+        Return the position of an indice in the set.
+
+        :param ind: Indice of the set
+        """
+
+        return self.positions[ind]
+
+    def previous(self, ind, lag=1):
+        """
+        Return the indice lag positions before ind, or None if there isn't one.  Unlike ind - 1,
+        this doesn't assume the indices are consecutive integers.
+
+        :param ind: Indice of the set
+        :param lag int: Number of positions to look back
+        """
+
+        position = self.positions[ind] - lag
+
+        return self.ordered_indices[position] if 0 <= position < len(self) else None
+
+    def next(self, ind, lead=1):
+        """
+        Return the indice lead positions after ind, or None if there isn't one.
+
+        :param ind: Indice of the set
+        :param lead int: Number of positions to look forward
+        """
+
+        return self.previous(ind, -lead)
+
     def validate_set(self, master_set):
         """
         Ensure that each indice of the self subset belongs to the master set.
@@ -125,7 +211,7 @@ class Set():
         """
 
         for ind in self.indices:
-            if ind not in master_set.indices:
+            if ind not in master_set:
                 print("\nMember of set called %s (%s) is not a member" % (self.name, str(ind)),
                       "of the master set %s\n" % master_set.name)
                 raise ValueError("Subset validation error")
@@ -141,7 +227,7 @@ class Set():
 
 
 class Var():
-    def __init__(self, name, units, sets, var_type="Continuous"):
+    def __init__(self, name, units, sets, var_type="Continuous", domain=None):
         """
         Initiate the variable
 
@@ -149,12 +235,15 @@ class Var():
         :param units str: variable units e.g., MWh
         :param sets list: list of Sets
         :param var_type str: Continuous/Binary/Integer etc
+        :param domain Set or list: if given, the index tuples over sets[1:] that the variable is
+            defined for (e.g. unit-reserve pairs), instead of every combination
         """
 
         self.name = name
         self.units = units
         self.sets = sets
         self.type = var_type
+        self.domain = domain
         self.filename = self.name + "_" + self.units + ".csv"
         self.sets_indices = self.make_var_indices()
         self.var = self.make_pulp_variable()
@@ -169,91 +258,131 @@ class Var():
         return "Var(%s); units=%s, Sets=[%s]" % (self.name, self.units, set_str)
 
     def make_var_indices(self):
-        """Make all combinations of indices. """
+        """
+        Make all combinations of indices, or each index of the first set combined with each
+        member of the domain if one is given.
+        """
 
         list_of_set_indices = [x.indices for x in self.sets]
 
-        next_set = list_of_set_indices.pop(0)
-        indices_permut = itertools.product(next_set)
-        indices_permut_list = [x[0] for x in indices_permut]
+        if len(list_of_set_indices) == 1:
+            return list(list_of_set_indices[0])
+
+        if self.domain is None:
+            return list(itertools.product(*list_of_set_indices))
+
+        self.validate_domain()
+
+        return [(x0,) + tuple(x) for x0 in list_of_set_indices[0] for x in self.domain]
+
+    def validate_domain(self):
+        """
+        Ensure that each member of the domain is a combination of members of sets[1:].
+
+        :raises ValueError: If a domain member doesn't belong to the sets.
+        """
+
+        for x in self.domain:
+            if len(x) != len(self.sets) - 1 or \
+                    not all(ind in s for ind, s in zip(x, self.sets[1:])):
+                print("\nDomain member %s of variable %s is not a combination of" % (x, self.name),
+                      "the sets %s\n" % ", ".join(s.name for s in self.sets[1:]))
+                raise ValueError("Variable domain validation error")
 
-        for n in range(len(list_of_set_indices)):
-            next_set = list_of_set_indices.pop(0)
-            indices_permut = itertools.product(indices_permut_list, next_set)
-            indices_permut_list = list(indices_permut)
+    def value_of(self, ind):
+        """
+        Return the variable's value at ind, which is zero outside the variable's domain.
 
-            if n > 0:
-                temp_list = list()
+        :param ind tuple: index of the variable
+        """
 
-                for x in indices_permut_list:
-                    xlist = list(x[0])
-                    xlist.append(x[1])
-                    temp_list.append(tuple(xlist))
-                indices_permut_list = temp_list
+        if ind not in self.var:
+            return 0
 
-        return indices_permut_list
+        return self.var[ind].value()
 
     def make_pulp_variable(self):
         return pp.LpVariable.dicts(self.name, self.sets_indices, lowBound=0, cat=self.type)
 
-    def one_dim_to_df(self):
+    def result_indices(self, main_intervals=None):
+        """
+        Return the indices of the first set to pass to the results: the main intervals if they
+        are given and the first set is the intervals, leaving out any look-ahead intervals, and
+        otherwise all of its indices.
+
+        :param main_intervals list: interval indices to keep, or None to keep all
+        """
+
+        if main_intervals is None or self.sets[0].name != "intervals":
+            return list(self.sets[0].indices)
+
+        return list(main_intervals)
+
+    def one_dim_to_df(self, main_intervals=None):
         """
         Pass optimal variable values to a pandas Series
         """
 
-        values = [self.var[i].value() for i in self.sets_indices]
-        self.result_df = pd.Series(data=values, index=self.sets_indices, name=self.name)
+        indices = self.result_indices(main_intervals)
+        values = [self.var[i].value() for i in indices]
+        self.result_df = pd.Series(data=values, index=indices, name=self.name)
 
-    def two_dim_to_df(self):
+    def two_dim_to_df(self, main_intervals=None):
         """
         Pass optimal variable values to a DataFrame
         """
 
-        self.result_df = \
-            pd.DataFrame(index=self.sets[0].indices, columns=self.sets[1].indices)
+        indices = self.result_indices(main_intervals)
+        self.result_df = pd.DataFrame(index=indices, columns=self.sets[1].indices)
 
-        for x0 in self.sets[0].indices:
+        for x0 in indices:
             for x1 in self.sets[1].indices:
-                self.result_df.loc[x0, x1] = self.var[(x0, x1)].value()
+                self.result_df.loc[x0, x1] = self.value_of((x0, x1))
 
-    def three_dim_to_df(self):
+    def three_dim_to_df(self, main_intervals=None):
         """
         Pass optimal variable values to a 3D MultiIndex DataFrame
         """
 
+        indices = self.result_indices(main_intervals)
         index = pd.MultiIndex.from_product(
-            [self.sets[i].indices for i in range(2)],
+            [indices, self.sets[1].indices],
             names=[self.sets[i].name for i in range(2)]
         )
 
         self.result_df = pd.DataFrame(index=index)
 
-        for x0 in self.sets[0].indices:
+        for x0 in indices:
             for x1 in self.sets[1].indices:
                 for x2 in self.sets[2].indices:
-                    self.result_df.loc[(x0, x1), x2] = self.var[(x0, x1, x2)].value()
+                    self.result_df.loc[(x0, x1), x2] = self.value_of((x0, x1, x2))
 
-    def four_dim_to_df(self):
+    def four_dim_to_df(self, main_intervals=None):
         """
         Pass optimal variable values to a 4D MultiIndex DataFrame
         """
 
+        indices = self.result_indices(main_intervals)
         index = pd.MultiIndex.from_product(
-            [self.sets[i].indices for i in range(3)],
+            [indices, self.sets[1].indices, self.sets[2].indices],
             names=[self.sets[i].name for i in range(3)]
         )
 
         self.result_df = pd.DataFrame(index=index)
 
-        for x0 in self.sets[0].indices:
+        for x0 in indices:
             for x1 in self.sets[1].indices:
                 for x2 in self.sets[2].indices:
                     for x3 in self.sets[3].indices:
-                        self.result_df.loc[(x0, x1, x2), x3] = \
-                            self.var[(x0, x1, x2, x3)].value()
+                        self.result_df.loc[(x0, x1, x2), x3] = self.value_of((x0, x1, x2, x3))
+
+    def to_df_fn_chooser(self, main_intervals=None):
+        """
+        Calls the appropriate function to build the dataframe, based on number of sets.
 
-    def to_df_fn_chooser(self):
-        """Calls the appropriate function to build the dataframe, based on number of sets. """
+        :param main_intervals list: interval indices to keep, leaving out look-ahead intervals,
+            or None to keep all
+        """
 
         function_dict = {
             1: self.one_dim_to_df,
@@ -262,7 +391,7 @@ class Var():
             4: self.four_dim_to_df,
         }
 
-        function_dict[len(self.sets)]()
+        function_dict[len(self.sets)](main_intervals)
         self.result_df_clean_up()
 
     def result_df_clean_up(self):
@@ -281,14 +410,6 @@ class Var():
             except TypeError:
                 print("Could not change dtype of %s to float." % self.name)
 
-    # def remove_LA_int_from_results(self, main_intervals):
-        # if "intervals" not in [setx.name for setx in self.sets]:
-            # self.result_df_trimmed = self.result_df
-
-            # return
-        # else:
-            # self.result_df_trimmed = self.result_df.loc[main_intervals]
-
     def to_csv(self, write_directory):
         """
         Write the results dataframe to a CSV file.
@@ -1,61 +1,823 @@
+import contextlib
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from pyuc import constraint_adder as ca
+from pyuc import load_data as ld
+from pyuc import objective_function as of
+from pyuc import portfolio as pf
 from pyuc import pyuc
+from pyuc import reduction as rd
 from pyuc import setup_problem as sp
-from pyuc import load_data as ld
+from pyuc import vectorised_constraints as vcnsts
+from pyuc.initial_state import InitialStateHistory, initial_state_history
+from pyuc.unit_parameters import unit_parameters
+
+# Variables carried to the next day's initial state for the last interval only, and those whose
+# history is carried back over the longest minimum up or down time
+end_state_variables = ["num_committed", "power_generated", "stored_energy"]
+history_variables = ["num_starting_up", "num_shutting_down"]
+
+# State variables compared to the SeriesRepairTolerance setting in the Parallel series mode,
+# rather than as whole numbers of units
+continuous_state_variables = ["power_generated", "stored_energy"]
+
+series_modes = ["Sequential", "Parallel"]
+
+# The model of each Parallel series mode worker process, set by start_series_worker
+series_worker = dict()
+
+
+class SeriesModel():
+    def __init__(self, series, constraint_index):
+        """
+        The model of a series' days, built for the first day and then kept: the pulp problem and
+        variables of each later day of the same length are reused, with only the right hand sides
+        that depend on the traces and initial state (vcnsts.window_rhs_functions) updated before
+        solving again.  The model is built again for a day of a different length, and every day
+        if the SeriesReuseModel setting is off, or the model can't be reused.
+
+        The reused model keeps the first day's interval indices, so each later day's traces are
+        relabelled to them, and its results relabelled back to the day's own intervals.
+
+        :param series dict: series problem, holding the paths and settings
+        :param constraint_index DataFrame: constraints to include, from constraint_selector
+        """
+
+        self.series = series
+        self.constraint_index = constraint_index
+        self.reuse = reuse_model(series)
+        self.problem = None
+        self.family_rows = None
+        self.num_builds = 0
+        self.num_updates = 0
+
+    def __repr__(self):
+        return "SeriesModel(builds=%d, updates=%d)" % (self.num_builds, self.num_updates)
+
+    def solve(self, day_data, name):
+        """
+        Solve a day, returning its solved problem.
+
+        :param day_data dict: the day's data, from filter_traces
+        :param name str: name of the day's problem
+        """
+
+        num_intervals = len(day_data["demand"])
+
+        if self.reuse and self.problem is not None \
+                and len(self.problem["sets"]["intervals"].indices) == num_intervals:
+            self.update(day_data)
+            self.problem["problem"] = pyuc.solve_problem(self.problem)
+        else:
+            self.problem = call_pyuc(self.series, day_data, self.constraint_index, name)
+            self.family_rows = family_rows(self.problem) if self.reuse else None
+            self.num_builds += 1
+
+        return self.problem
+
+    def update(self, day_data):
+        """
+        Update the right hand sides of the built model for a day.
+
+        :param day_data dict: the day's data, from filter_traces
+        """
+
+        intervals = self.problem["sets"]["intervals"].indices
+        self.problem["data"] = dict(
+            relabel_traces(day_data, intervals),
+            constraint_index=self.problem["data"]["constraint_index"]
+        )
+
+        for family_id, rows in self.family_rows.items():
+            cnt_fn = self.constraint_index.loc[family_id, "Function"]
+            rhs = vcnsts.window_rhs_functions[cnt_fn.__name__](
+                self.problem["sets"], self.problem["data"]
+            )
+
+            if ca.use_matrix_backend(self.problem):
+                model = self.problem["matrix_model"]
+                start, end = rows
+                model_rhs = model.rhs()
+                model_rhs[start:end] = rhs
+                model.row_rhs = [model_rhs]
+            else:
+                for constraint, value in zip(rows, rhs.tolist()):
+                    constraint.changeRHS(value)
+
+        self.num_updates += 1
 
 
-def run_series_problem(name, input_path, output_path):
-    problem_details = \
-        {
-            "name": name,
-            "input_path": input_path,
-            "output_path": output_path,
-            "paths": paths
+class SeriesCheckpoints():
+    def __init__(self, series):
+        """
+        A store of each solved day's outcome, so a series run can be resumed.  After each day,
+        its outcome (its results, its initial state and the state it ends in, which carries the
+        committed units, power, stored energy and start up and shut down history to the next day)
+        is pickled to its own compressed file in the checkpoints directory, if the
+        SeriesCheckpoints setting is on.  Each checkpoint also holds the day's intervals, the
+        series' settings and a fingerprint of the day's inputs (see input_fingerprint), so it is
+        only resumed by a run with the same days, settings and inputs.
+
+        :param series dict: series problem
+        """
+
+        self.path = series["paths"]["checkpoints"]
+        self.settings = series["settings"]
+        self.data = series["data"]
+        self.enabled = sp.get_setting(series, "SeriesCheckpoints")
+
+    def __repr__(self):
+        return "SeriesCheckpoints(%s)" % self.path
+
+    def day_path(self, day):
+        return os.path.join(self.path, "day_%d.pkl.gz" % day)
+
+    def save(self, day, intervals, window, outcome):
+        """
+        Save a day's checkpoint, writing to a temporary file first so a run stopped part way
+        through leaves no partial checkpoint.
+
+        :param day int: day number
+        :param intervals list: the day's interval indices
+        :param window list: the day's intervals and its look-ahead intervals
+        :param outcome dict: the day's outcome, from solve_day
+        """
+
+        if not self.enabled:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        checkpoint = {
+            "intervals": intervals,
+            "window": window,
+            "settings": self.settings,
+            "inputs": input_fingerprint(self.data, window),
+            "outcome": outcome,
         }
+        temporary_path = self.day_path(day) + ".tmp"
+        pd.to_pickle(checkpoint, temporary_path, compression="gzip")
+        os.replace(temporary_path, self.day_path(day))
 
-    paths = sp.initialise_paths(input_path, output_path, name)
-    settings = sp.load_settings(paths["settings"])
-    traces = read_traces(input_path)
-    days = get_days(traces, settings)
+    def load(self, days, windows):
+        """
+        Return the outcomes of the days completed by an earlier run, from the first day up to
+        the first day without a matching checkpoint.  The checkpoints after that are removed, as
+        they follow on from a state this run will solve again.
+
+        :param days list: interval indices of each day, from get_days
+        :param windows list: intervals solved for each day, from add_look_ahead
+        """
+
+        outcomes = list()
+
+        for day, (intervals, window) in enumerate(zip(days, windows)):
+            if not os.path.exists(self.day_path(day)):
+                break
+
+            checkpoint = pd.read_pickle(self.day_path(day), compression="gzip")
+
+            if (checkpoint["intervals"], checkpoint["window"], checkpoint["settings"]) \
+                    != (intervals, window, self.settings) \
+                    or checkpoint.get("inputs") != input_fingerprint(self.data, window):
+                break
+
+            outcomes.append(checkpoint["outcome"])
+
+        self.clear(first_day=len(outcomes))
+        print("Resumed %d of %d days from checkpoints" % (len(outcomes), len(days)))
+
+        return outcomes
+
+    def clear(self, first_day=0):
+        """
+        Remove the checkpoints from first_day on, or the whole store from the first day.
+
+        :param first_day int: first day whose checkpoint is removed
+        """
+
+        if not os.path.exists(self.path):
+            return
+
+        if first_day == 0:
+            shutil.rmtree(self.path)
+            return
+
+        for filename in os.listdir(self.path):
+            day = filename.split(".")[0].split("_")[-1]
+
+            if day.isdigit() and int(day) >= first_day:
+                os.remove(os.path.join(self.path, filename))
 
-    for day in days:
-        filter_traces()
-        write_current_day_to_folder()
-        call_pyuc()
-        update_initial_state()
 
+def input_fingerprint(data, window):
+    """
+    Return a hash of the inputs a day's outcome depends on, other than the settings: the traces
+    over the day's window, the unit data and the series' initial state.  A day's outcome also
+    depends on the days before it, whose checkpoints are checked first.
+
+    :param data dict: data dictionary of the whole horizon
+    :param window list: the day's intervals and its look-ahead intervals
+    """
+
+    digest = hashlib.sha256()
+    traces = [
+        data[trace].loc[window] if data.get(trace) is not None else None
+        for trace in ["demand", "variable_traces", "reserve_requirement"]
+    ]
+
+    for frame in traces + [data["units"], data["initial_state"]]:
+        if frame is None:
+            digest.update(b"None")
+            continue
+
+        digest.update(repr(frame.columns.to_list()).encode())
+        digest.update(pd.util.hash_pandas_object(frame).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+def run_series_problem(name, input_path, output_path, resume=False):
+    """
+    Solve a long horizon day by day, in memory.  The inputs are read once, each day's problem is
+    built from slices of the demand and variable traces, and each day starts from the state the
+    previous day ended in.  The results of all days are written together at the end, and a
+    summary of each day's solve to series_summary.csv.
+
+    The day length is the SeriesHorizonIntervals setting, or a day of intervals of
+    IntervalDurationHrs by default.  Days of the same length share one model (see SeriesModel).
+
+    With the SeriesLookAheadIntervals setting, each day is optimised together with that many
+    of the following intervals, so its decisions account for what comes after it.  Only the
+    day's own (main) intervals are passed to the results and carried to the next day's initial
+    state; the look-ahead intervals are solved again as part of the next day.
+
+    With the Parallel SeriesMode setting, the days are solved in parallel and then checked in
+    order against the state the previous day ended in (see solve_days_parallel).
+
+    Each day is checkpointed once it is solved (see SeriesCheckpoints).  With resume, the days
+    completed by an earlier run with the same days, settings and inputs are taken from the
+    checkpoints, and the run carries on from the state the last of them ended in.  Without it,
+    any earlier checkpoints are removed.
+
+    :param name str: problem name
+    :param input_path str: path to data inputs
+    :param output_path str: path to save outputs
+    :param resume bool: whether to resume from the checkpoints of an earlier run
+    """
+
+    series = sp.setup_problem(name, input_path, output_path)
+    series["data"] = ld.load_data(series)
+    constraint_index = ca.constraint_selector(
+        series["paths"], sp.get_setting(series, "ConstraintBuilder")
+    )
+
+    days = get_days(series["data"], series["settings"])
+    windows = add_look_ahead(days, look_ahead_intervals(series))
+    checkpoints = SeriesCheckpoints(series)
+
+    if resume:
+        outcomes = checkpoints.load(days, windows)
+    else:
+        checkpoints.clear()
+        outcomes = list()
+
+    series["resumed_days"] = len(outcomes)
+
+    if series_mode(series) == "Parallel":
+        solve_days_parallel(series, constraint_index, days, windows, checkpoints, outcomes)
+    else:
+        solve_days_sequential(series, constraint_index, days, windows, checkpoints, outcomes)
+
+    results = dict()
+
+    for outcome in outcomes:
+        for filename, result_df in outcome["results"].items():
+            results.setdefault(filename, list()).append(result_df)
+
+    write_series_results(series, results)
+    series["summary"] = pd.DataFrame([outcome["summary"] for outcome in outcomes]) \
+        .set_index("Day")
+    series["summary"].to_csv(os.path.join(series["paths"]["outputs"], "series_summary.csv"))
+
+    return series
+
+
+def series_mode(series):
+    """
+    Return the series mode (SeriesMode setting): Sequential or Parallel.
+
+    :param series dict: series problem
+    """
+
+    mode = sp.get_setting(series, "SeriesMode")
+
+    if mode not in series_modes:
+        print("\nSeries mode %s is not one of %s\n" % (mode, ", ".join(series_modes)))
+        raise ValueError("Unknown series mode")
+
+    return mode
+
+
+def solve_day(model, series, day, intervals, window, initial_state):
+    """
+    Solve a day, returning its outcome: its summary, its results over the day's own intervals,
+    its initial state and the state it ends in.
+
+    :param model SeriesModel: model to solve the day with
+    :param series dict: series problem
+    :param day int: day number
+    :param intervals list: the day's interval indices
+    :param window list: the day's intervals and its look-ahead intervals
+    :param initial_state DataFrame: the day's initial state, or None
+    """
+
+    problem = model.solve(
+        filter_traces(series["data"], window, initial_state), "%s_day%d" % (series["name"], day)
+    )
+    main_intervals = list(problem["sets"]["intervals"].indices)[:len(intervals)]
+    day_intervals = dict(zip(main_intervals, intervals))
+    results = dict()
+
+    for var in problem["var"].values():
+        var.to_df_fn_chooser(main_intervals)
+
+        if var.sets[0].name == "intervals":
+            var.result_df = var.result_df.rename(index=day_intervals, level=0)
+
+        results[var.filename] = var.result_df
 
-def read_traces_series(paths):
     return {
-        "demand": ld.load_demand_data(paths["demand"]),
-        "variable_traces": ld.load_variable_data(paths["variable_traces"])
+        "summary": day_summary(day, intervals, window, problem["problem"]),
+        "results": results,
+        "initial_state": initial_state,
+        "end_state": update_initial_state(problem, initial_state, main_intervals),
     }
 
 
-def filter_traces(traces):
-    pass
+def solve_days_sequential(series, constraint_index, days, windows, checkpoints, outcomes):
+    """
+    Solve the days in order, each from the state the previous day ended in, adding the outcome
+    of each to outcomes and checkpointing it.  The days already in outcomes are skipped.
 
+    :param series dict: series problem
+    :param constraint_index DataFrame: constraints to include, from constraint_selector
+    :param days list: interval indices of each day, from get_days
+    :param windows list: intervals solved for each day, from add_look_ahead
+    :param checkpoints SeriesCheckpoints: checkpoint store
+    :param outcomes list: outcomes of the days already solved
+    """
 
-def write_current_day_to_folder():
-    pass
+    series["model"] = SeriesModel(series, constraint_index)
+    initial_state = resumed_state(series, outcomes)
 
+    for day in range(len(outcomes), len(days)):
+        outcome = solve_day(series["model"], series, day, days[day], windows[day], initial_state)
+        checkpoints.save(day, days[day], windows[day], outcome)
+        outcomes.append(outcome)
+        initial_state = outcome["end_state"]
 
-def update_initial_state():
-    pass
 
+def resumed_state(series, outcomes):
+    """
+    Return the initial state of the first day to solve: the state the last day already solved
+    ended in, or the series' initial state.
+
+    :param series dict: series problem
+    :param outcomes list: outcomes of the days already solved
+    """
+
+    if outcomes:
+        return outcomes[-1]["end_state"]
+
+    return series["data"]["initial_state"]
+
+
+def solve_days_parallel(series, constraint_index, days, windows, checkpoints, outcomes):
+    """
+    Solve the days speculatively in a pool of SeriesProcesses processes (one per CPU by default),
+    then accept or repair them in order.  For its initial state, each day's process forecasts the
+    state the previous day ends in, by first solving the SeriesWarmUpDays days before it in
+    order from the initial state of the first day to solve.  A day is accepted if that forecast
+    matches the state the accepted previous day actually ended in: the same number of committed
+    units and start up and shut down history, and power and stored energy within
+    SeriesRepairTolerance.  Otherwise the day is solved again, in order, from the actual state.
+
+    The summary records which days were repaired.  As in the sequential mode, each day is added
+    to outcomes and checkpointed, and the days already in outcomes are skipped.
+
+    :param series dict: series problem
+    :param constraint_index DataFrame: constraints to include, from constraint_selector
+    :param days list: interval indices of each day, from get_days
+    :param windows list: intervals solved for each day, from add_look_ahead
+    :param checkpoints SeriesCheckpoints: checkpoint store
+    :param outcomes list: outcomes of the days already solved
+    """
+
+    context = pf.fork_context("The Parallel series mode")
+    warm_up_days = series_warm_up_days(series)
+    tolerance = sp.get_setting(series, "SeriesRepairTolerance")
+    series["model"] = SeriesModel(series, constraint_index)
+    first_day = len(outcomes)
+    initial_state = resumed_state(series, outcomes)
+
+    with context.Pool(
+        sp.get_setting(series, "SeriesProcesses"), initializer=start_series_worker,
+        initargs=(series, constraint_index, days, windows, first_day, initial_state)
+    ) as pool:
+        speculative_outcomes = pool.imap(
+            solve_speculative_day,
+            [(day, warm_up_days) for day in range(first_day, len(days))]
+        )
+
+        for day, outcome in enumerate(speculative_outcomes, first_day):
+            repaired = not states_match(outcome["initial_state"], initial_state, tolerance)
+
+            if repaired:
+                outcome = solve_day(
+                    series["model"], series, day, days[day], windows[day], initial_state
+                )
+
+            outcome["summary"]["Repaired"] = repaired
+            checkpoints.save(day, days[day], windows[day], outcome)
+            outcomes.append(outcome)
+            initial_state = outcome["end_state"]
+
+    print("Parallel series: repaired %d of %d days"
+          % (sum(o["summary"]["Repaired"] for o in outcomes[first_day:]),
+             len(outcomes) - first_day))
+
+
+def series_warm_up_days(series):
+    """
+    Return the number of days solved before each day to forecast its initial state, in the
+    Parallel series mode (SeriesWarmUpDays setting).
+
+    :param series dict: series problem
+    """
+
+    warm_up_days = sp.get_setting(series, "SeriesWarmUpDays")
+
+    if warm_up_days < 0:
+        print("\nSeries warm up can't be negative, not %d days\n" % warm_up_days)
+        raise ValueError("Invalid series warm up")
+
+    return warm_up_days
+
+
+def start_series_worker(series, constraint_index, days, windows, first_day, initial_state):
+    """
+    Give a Parallel series mode worker process its own model, the days, and the first day to
+    solve with its initial state.
+    """
+
+    series_worker.update(
+        series=series, model=SeriesModel(series, constraint_index), days=days, windows=windows,
+        first_day=first_day, initial_state=initial_state
+    )
+
+
+def solve_speculative_day(task):
+    """
+    Solve a day in a worker process, after solving its warm up days in order from the initial
+    state of the first day to solve, returning the day's outcome.
+
+    :param task tuple: day number and number of warm up days
+    """
+
+    day, warm_up_days = task
+    series, model = series_worker["series"], series_worker["model"]
+    days, windows = series_worker["days"], series_worker["windows"]
+    initial_state = series_worker["initial_state"]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for warm_up_day in range(max(day - warm_up_days, series_worker["first_day"]), day):
+            initial_state = solve_day(
+                model, series, warm_up_day, days[warm_up_day], windows[warm_up_day],
+                initial_state
+            )["end_state"]
+
+        return solve_day(model, series, day, days[day], windows[day], initial_state)
+
+
+def states_match(state, other_state, tolerance):
+    """
+    Return whether two initial states match: the same number of committed units and start up
+    and shut down history, and power and stored energy within the tolerance.
+
+    :param state DataFrame: initial state, or None
+    :param other_state DataFrame: initial state, or None
+    :param tolerance float: tolerance of the continuous state variables
+    """
+
+    history, other_history = InitialStateHistory(state), InitialStateHistory(other_state)
+    units = list(dict.fromkeys(history.units + other_history.units))
+
+    for variable in end_state_variables + history_variables:
+        depth = max(
+            h.history[variable].shape[1] if variable in h else 0
+            for h in [history, other_history]
+        )
+        limit = tolerance if variable in continuous_state_variables else 0.5
+
+        for k in range(1, depth + 1):
+            difference = history.get(variable, units, -k) - other_history.get(variable, units, -k)
+
+            if np.any(np.abs(difference) > limit):
+                return False
+
+    return True
+
+
+def reuse_model(series):
+    """
+    Return whether a series' model is reused between days (SeriesReuseModel setting).  The
+    model is built each day instead with the Reference constraint builder, whose rows aren't in
+    the order of the right hand side functions, or with the Reduce setting, as the rows removed
+    depend on each day's data.
+
+    :param series dict: series problem
+    """
+
+    if not sp.get_setting(series, "SeriesReuseModel"):
+        return False
+
+    if sp.get_setting(series, "ConstraintBuilder") != "Vectorised" \
+            or sp.get_setting(series, "Reduce"):
+        print("\nThe series model is built each day, as it can only be reused with the "
+              "Vectorised constraint builder and without Reduce\n")
+        return False
+
+    return True
+
+
+def family_rows(problem):
+    """
+    Return the rows of each built family with a right hand side that changes between days: the
+    pulp constraints in the family's order, or the family's range of rows in the matrix model.
+
+    :param problem dict: the built problem
+    """
+
+    constraint_index = problem["data"]["constraint_index"]
+    included = constraint_index[constraint_index.ToInclude == True]
+
+    if ca.use_matrix_backend(problem):
+        return {
+            family_id: problem["matrix_model"].families[family_id]
+            for family_id, cnt_fn in included["Function"].items()
+            if cnt_fn.__name__ in vcnsts.window_rhs_functions
+            and family_id in problem["matrix_model"].families
+        }
+
+    constraints = list(problem["problem"].constraints.values())
+    num_rows = included["NumConstraints"].fillna(0).astype(int)
+
+    if len(constraints) != num_rows.sum():
+        print("\nThe pulp problem has %d constraints, but %d were built\n"
+              % (len(constraints), num_rows.sum()))
+        raise ValueError("Constraints can't be matched to their families")
+
+    rows = dict()
+    start = 0
+
+    for family_id, cnt_fn in included["Function"].items():
+        end = start + num_rows[family_id]
+
+        if cnt_fn.__name__ in vcnsts.window_rhs_functions and end > start:
+            rows[family_id] = constraints[start:end]
+
+        start = end
+
+    return rows
+
+
+def relabel_traces(day_data, intervals):
+    """
+    Return the day's data with its traces indexed by the given intervals, those of the reused
+    model.
+
+    :param day_data dict: the day's data, from filter_traces
+    :param intervals list: interval indices of the reused model
+    """
+
+    day_data = dict(day_data)
+
+    for trace in ["demand", "variable_traces", "reserve_requirement"]:
+        if day_data.get(trace) is not None:
+            day_data[trace] = day_data[trace].set_axis(intervals, axis=0)
+
+    return day_data
+
+
+def get_days(data, settings):
+    """
+    Split the intervals of the demand trace into days, returning the interval indices of each.
+    The last day is shorter if the horizon isn't a whole number of days.
+
+    :param data dict: data dictionary of the whole horizon
+    :param settings dict: settings dictionary
+    """
+
+    traces = data["variable_traces"]
+
+    if traces is not None and len(data["demand"]) != len(traces):
+        print("\nLength of demand trace (%d) and variable traces (%d) are unequal\n"
+              % (len(data["demand"]), len(traces)))
+        raise ValueError("Unequal trace lengths")
+
+    day_length = sp.get_setting({"settings": settings}, "SeriesHorizonIntervals")
+
+    if day_length is None:
+        day_length = int(round(24 / settings["IntervalDurationHrs"]))
+
+    if day_length < 1:
+        print("\nSeries horizon must be at least one interval, not %d\n" % day_length)
+        raise ValueError("Invalid series horizon")
+
+    intervals = data["demand"].index.to_list()
+
+    return [intervals[start:start + day_length] for start in range(0, len(intervals), day_length)]
+
+
+def look_ahead_intervals(series):
+    """
+    Return the number of look-ahead intervals solved with each day (SeriesLookAheadIntervals
+    setting).
+
+    :param series dict: series problem
+    """
+
+    look_ahead = sp.get_setting(series, "SeriesLookAheadIntervals")
+
+    if look_ahead < 0:
+        print("\nSeries look-ahead can't be negative, not %d intervals\n" % look_ahead)
+        raise ValueError("Invalid series look-ahead")
+
+    return look_ahead
+
+
+def add_look_ahead(days, look_ahead):
+    """
+    Return the intervals solved for each day: the day's own intervals followed by up to
+    look_ahead of the intervals after it, fewer at the end of the horizon.
+
+    :param days list: interval indices of each day, from get_days
+    :param look_ahead int: number of look-ahead intervals
+    """
+
+    intervals = [i for day in days for i in day]
+    windows = list()
+    end = 0
+
+    for day in days:
+        end += len(day)
+        windows.append(day + intervals[end:end + look_ahead])
+
+    return windows
+
+
+def filter_traces(data, intervals, initial_state):
+    """
+    Return the data dictionary of one day: the traces sliced to the day's intervals, and the
+    day's initial state.  Unit data is shared with the whole horizon.
+
+    :param data dict: data dictionary of the whole horizon
+    :param intervals list: the day's interval indices
+    :param initial_state DataFrame: the day's initial state, or None
+    """
+
+    day_data = dict(data)
+
+    for trace in ["demand", "variable_traces", "reserve_requirement"]:
+        if day_data.get(trace) is not None:
+            day_data[trace] = data[trace].loc[intervals]
+
+    day_data["initial_state"] = initial_state
+    day_data["initial_state_history"] = InitialStateHistory(initial_state)
+
+    return day_data
+
+
+def call_pyuc(series, day_data, constraint_index, name):
+    """
+    Build and solve one day's problem from its data, with the series' settings, returning the
+    solved problem.
+
+    :param series dict: series problem, holding the paths and settings
+    :param day_data dict: the day's data, from filter_traces
+    :param constraint_index DataFrame: constraints to include, from constraint_selector
+    :param name str: name of the day's problem
+    """
+
+    problem = {
+        "name": name,
+        "paths": series["paths"],
+        "settings": series["settings"],
+        "problem": sp.make_pulp_problem(name),
+        "data": dict(day_data, constraint_index=constraint_index.copy()),
+    }
+
+    problem["sets"] = ld.create_sets(problem["data"], problem["settings"]["reserves"])
+    problem["var"] = pyuc.create_variables(problem["sets"])
+    family_sizes = ca.build_constraints(problem)
+    problem["data"]["constraint_index"]["NumConstraints"] = pd.Series(family_sizes)
+    problem["problem"] = of.make_objective_function(problem)
+    rd.apply_reduction_setting(problem)
+    problem["problem"] = pyuc.solve_problem(problem)
+
+    return problem
+
+
+def variable_history(problem, name, units, intervals):
+    """
+    Return a variable's solution as an (intervals, units) array, with zeros for units the
+    variable isn't defined for.
+
+    :param problem dict: the day's solved problem
+    :param name str: variable name
+    :param units list: unit indices
+    :param intervals list: interval indices
+    """
+
+    var = problem["var"][name].var
+
+    return np.array(
+        [[(var[(i, u)].value() or 0) if (i, u) in var else 0 for u in units] for i in intervals],
+        dtype=float
+    ).reshape(len(intervals), len(units))
+
+
+def update_initial_state(problem, initial_state, intervals=None):
+    """
+    Return the initial state of the next day: the last interval of the committed units, power
+    and stored energy, and the start ups and shut downs over the longest minimum up or down
+    time.  Where that reaches back before the day, the history is taken from the day's own
+    initial state.
+
+    :param problem dict: the day's solved problem
+    :param initial_state DataFrame: the day's initial state, or None
+    :param intervals list: the day's main intervals, leaving out any look-ahead intervals, or
+        None for all of the problem's intervals
+    """
+
+    if intervals is None:
+        intervals = list(problem["sets"]["intervals"].indices)
+
+    units = problem["sets"]["units"].indices
+    previous = initial_state_history(problem["data"])
+    unit_params = unit_parameters(problem["data"])
+    depth = int(max(
+        1,
+        *unit_params.get("MinimumUpTimeHrs", units),
+        *unit_params.get("MinimumDownTimeHrs", units)
+    ))
+
+    columns = dict()
+
+    for name in end_state_variables + history_variables:
+        history = variable_history(problem, name, units, intervals)
+        num_intervals = len(history)
+
+        for k in range(1, (depth if name in history_variables else 1) + 1):
+            if k <= num_intervals:
+                values = history[num_intervals - k]
+            else:
+                values = previous.get(name, units, interval=num_intervals - k)
+
+            columns[(name, -k)] = values
+
+    next_state = pd.DataFrame(columns, index=units)
+    next_state.columns = pd.MultiIndex.from_tuples(next_state.columns)
+
+    return next_state
+
+
+def day_summary(day, intervals, window, pulp_problem):
+    """Return a summary of a day's solve.  The objective includes any look-ahead intervals. """
+
+    return {
+        "Day": day,
+        "FirstInterval": intervals[0],
+        "LastInterval": intervals[-1],
+        "LookAheadIntervals": len(window) - len(intervals),
+        "Status": pulp_problem.status,
+        "Objective": pulp_problem.objective.value(),
+        "SolveTime": pulp_problem.solutionTime,
+    }
 
-def get_days(traces, settings):
-    def check_len_demand_equals_len_variable_traces():
-        if len(traces["demand"]) != len(traces["variable_traces"]):
-            print("Length of demand trace and variable traces are unequal")
-            sys.exit()
-        else:
-            return
 
-    def add_days_to_demand():
-        pass
+def write_series_results(series, results):
+    """
+    Write each variable's results over all the days, to the series' results directory.
 
-    check_len_demand_equals_len_variable_traces()
-    add_days_to_demand()
+    :param series dict: series problem
+    :param results dict: results file name to the list of each day's results
+    """
 
-def call_pyuc():
-    pass
+    for filename, day_results in results.items():
+        pd.concat(day_results).to_csv(os.path.join(series["paths"]["results"], filename))
@@ -0,0 +1,283 @@
+import numpy as np
+import pandas as pd
+import pulp as pp
+
+from pyuc import constraint_adder as ca
+from pyuc import matrix_model as mm
+from pyuc import setup_problem as sp
+
+# Reasons a row is removed, indexed by the codes used in find_reductions (0 is kept)
+removal_reasons = ["Kept", "Singleton", "Empty", "Redundant", "Forcing"]
+
+
+def apply_reduction_setting(problem):
+    """
+    Reduce the problem if the Reduce setting is on.
+
+    :param problem dict: main problem
+    """
+
+    if sp.get_setting(problem, "Reduce"):
+        reduce_problem(problem)
+
+
+def reduce_problem(problem, tolerance=1e-9):
+    """
+    Remove rows the solver doesn't need, and tighten the variables' bounds in their place:
+
+    * singleton rows become bounds on their variable, e.g. Power<=Capacity, or the power of a
+      variable unit with a zero trace, which is then fixed to zero
+    * rows that can't be violated within the variables' bounds are dropped
+    * forcing rows, which can only hold with every variable at a bound, fix those variables
+    * fixed variables are substituted out of the remaining rows, e.g. the charge of a storage
+      unit with no round trip efficiency, which is fixed to zero
+
+    Bounds are set on the pulp variables, so they apply to both model backends.  The rows and
+    columns removed are reported, and stored in problem["reduction"].
+
+    :param problem dict: main problem
+    :param tolerance float: feasibility tolerance
+    """
+
+    if ca.use_matrix_backend(problem):
+        model = problem["matrix_model"]
+        names = None
+        row_families = np.empty(model.num_rows, dtype=object)
+
+        for family_id, (start, end) in model.families.items():
+            row_families[start:end] = family_id
+    else:
+        model = mm.matrix_model_from_pulp_problem(problem)
+        names = list(problem["problem"].constraints.keys())
+        row_families = np.array([constraint_family(problem, n) for n in names], dtype=object)
+
+    reasons, lower, upper = find_reductions(model, tolerance)
+
+    if reasons is None:
+        print("\nReduction found the bounds to be infeasible, so the problem is not reduced\n")
+        return problem["problem"]
+
+    changed = np.flatnonzero((lower != model.column_lower) | (upper != model.column_upper))
+
+    for c in changed.tolist():
+        v = model.variables[c]
+        v.lowBound = None if lower[c] == -np.inf else lower[c]
+        v.upBound = None if upper[c] == np.inf else upper[c]
+
+    drop = reasons > 0
+    fixed = lower == upper
+
+    if names is None:
+        model.drop_rows(drop)
+        model.update_columns()
+        entries_removed = model.substitute_columns(fixed, lower)
+    else:
+        for n in np.flatnonzero(drop).tolist():
+            del problem["problem"].constraints[names[n]]
+
+        entries_removed = substitute_pulp_columns(problem, model, fixed, lower)
+        declare_pulp_columns(problem, model)
+
+    problem["reduction"] = reduction_report(row_families, reasons, lower, upper, changed)
+    problem["reduction"]["entries_removed"] = entries_removed
+    print_reduction(problem["reduction"])
+
+    return problem["problem"]
+
+
+def substitute_pulp_columns(problem, model, fixed, values):
+    """
+    Remove fixed variables from the pulp constraints, moving their contribution to the
+    constraint's constant.  Returns the number of entries removed.
+
+    :param problem dict: main problem
+    :param model MatrixModel: matrix model of the pulp problem
+    :param fixed array: boolean mask of the fixed columns
+    :param values array: value of each column, used for the fixed columns
+    """
+
+    fixed_values = {
+        model.variables[c]: values[c] for c in np.flatnonzero(fixed).tolist()
+    }
+    entries_removed = 0
+
+    for constraint in problem["problem"].constraints.values():
+        substituted = [v for v in constraint.keys() if v in fixed_values]
+
+        if not substituted:
+            continue
+
+        # Newer pulp versions hold the expression apart from the constraint, and it may be
+        # shared with other constraints, so it is copied before being changed
+        if hasattr(constraint, "expr"):
+            constraint.expr = constraint.expr.copy()
+            expression = constraint.expr
+        else:
+            expression = constraint
+
+        for v in substituted:
+            coefficient = expression.pop(v)
+            entries_removed += 1
+            constraint.constant += coefficient * fixed_values[v]
+
+    return entries_removed
+
+
+def declare_pulp_columns(problem, model):
+    """
+    Give each variable left without any constraint entries a zero objective coefficient, as
+    pulp's MPS writer only declares the columns of variables with a coefficient somewhere.
+
+    :param problem dict: main problem
+    :param model MatrixModel: matrix model of the pulp problem
+    """
+
+    objective = problem["problem"].objective
+    declared = set(objective.keys())
+
+    for constraint in problem["problem"].constraints.values():
+        declared.update(constraint.keys())
+
+    for v in model.variables:
+        if v not in declared:
+            objective[v] = 0
+
+
+def constraint_family(problem, name):
+    """
+    Return the family of a pulp constraint: the family ID of a compact name, otherwise the
+    label before its index, e.g. minimum_up_time for minimum_up_time(i=0,_u=U1).
+
+    :param problem dict: main problem
+    :param name str: constraint name
+    """
+
+    if "constraint_names" in problem.keys():
+        return ca.lookup_constraint_name(problem, name)[0]
+
+    return name.split("(")[0].rstrip("_")
+
+
+def find_reductions(model, tolerance=1e-9, max_passes=10):
+    """
+    Find the rows of a matrix model that can be removed, and the column bounds that replace
+    them, repeating until nothing more is found.  Returns the removal reason code of each row
+    (0 for rows that are kept) and the new lower and upper bounds, or None if the bounds cross.
+
+    :param model MatrixModel: matrix model
+    :param tolerance float: feasibility tolerance
+    :param max_passes int: maximum number of passes over the rows
+    """
+
+    rows, columns, values = model.coo()
+    senses, rhs = model.senses(), model.rhs()
+    lower, upper = model.column_lower.copy(), model.column_upper.copy()
+    integer = model.column_integer
+    reasons = np.zeros(model.num_rows, dtype=int)
+
+    is_le, is_ge = senses == pp.LpConstraintLE, senses == pp.LpConstraintGE
+    is_eq = senses == pp.LpConstraintEQ
+
+    for _ in range(max_passes):
+        active = reasons[rows] == 0
+        count = np.bincount(rows[active], minlength=model.num_rows)
+        num_removed = np.count_nonzero(reasons)
+
+        # Singleton rows: a x (sense) b becomes a bound of b / a on x
+        singleton = active & (count[rows] == 1)
+        r, c, a = rows[singleton], columns[singleton], values[singleton]
+        bound = rhs[r] / a
+        sets_upper = is_eq[r] | (is_le[r] & (a > 0)) | (is_ge[r] & (a < 0))
+        sets_lower = is_eq[r] | (is_ge[r] & (a > 0)) | (is_le[r] & (a < 0))
+        upper_bound = np.where(integer[c], np.floor(bound + tolerance), bound)
+        lower_bound = np.where(integer[c], np.ceil(bound - tolerance), bound)
+        np.minimum.at(upper, c[sets_upper], upper_bound[sets_upper])
+        np.maximum.at(lower, c[sets_lower], lower_bound[sets_lower])
+        reasons[r] = removal_reasons.index("Singleton")
+
+        # Empty rows that hold
+        empty = (reasons == 0) & (count == 0) & (
+            (is_le & (rhs >= -tolerance)) | (is_ge & (rhs <= tolerance))
+            | (is_eq & (np.abs(rhs) <= tolerance))
+        )
+        reasons[empty] = removal_reasons.index("Empty")
+
+        if np.any(lower > upper + tolerance):
+            return None, lower, upper
+
+        # Rows that hold over the whole range of their activity are redundant
+        active = reasons[rows] == 0
+        r, c, a = rows[active], columns[active], values[active]
+        min_activity = np.bincount(
+            r, weights=np.where(a > 0, a * lower[c], a * upper[c]), minlength=model.num_rows
+        )
+        max_activity = np.bincount(
+            r, weights=np.where(a > 0, a * upper[c], a * lower[c]), minlength=model.num_rows
+        )
+
+        kept = reasons == 0
+        redundant = kept & (
+            (is_le & (max_activity <= rhs + tolerance))
+            | (is_ge & (min_activity >= rhs - tolerance))
+            | (is_eq & (np.abs(max_activity - rhs) <= tolerance)
+               & (np.abs(min_activity - rhs) <= tolerance))
+        )
+        reasons[redundant] = removal_reasons.index("Redundant")
+
+        # Forcing rows can only hold with each variable at the bound giving the least activity
+        # (for <=) or the most activity (for >=)
+        forcing_le = kept & ~redundant & is_le & (np.abs(min_activity - rhs) <= tolerance)
+        forcing_ge = kept & ~redundant & is_ge & (np.abs(max_activity - rhs) <= tolerance)
+        at_lower = (forcing_le[r] & (a > 0)) | (forcing_ge[r] & (a < 0))
+        at_upper = (forcing_le[r] & (a < 0)) | (forcing_ge[r] & (a > 0))
+        upper[c[at_lower]] = lower[c[at_lower]]
+        lower[c[at_upper]] = upper[c[at_upper]]
+        reasons[forcing_le | forcing_ge] = removal_reasons.index("Forcing")
+
+        if np.count_nonzero(reasons) == num_removed:
+            break
+
+    return reasons, lower, upper
+
+
+def reduction_report(row_families, reasons, lower, upper, changed):
+    """
+    Return the number of rows removed from each family for each reason, and the number of
+    columns fixed and bounds tightened.
+
+    :param row_families array: family of each row
+    :param reasons array: removal reason code of each row, from find_reductions
+    :param lower array: new lower bound of each column
+    :param upper array: new upper bound of each column
+    :param changed array: columns whose bounds changed
+    """
+
+    rows = pd.crosstab(
+        pd.Series(row_families, name="Family"),
+        pd.Series(np.array(removal_reasons)[reasons], name="Reason")
+    ).reindex(columns=removal_reasons, fill_value=0)
+
+    fixed = lower[changed] == upper[changed]
+
+    return {
+        "rows": rows,
+        "rows_removed": int(np.count_nonzero(reasons)),
+        "rows_before": len(reasons),
+        "columns_fixed": int(np.count_nonzero(fixed)),
+        "bounds_tightened": int(np.count_nonzero(~fixed)),
+    }
+
+
+def print_reduction(report):
+    print("Reduction: removed %d of %d rows, fixed %d columns, tightened %d bounds and "
+          "substituted %d entries" % (
+              report["rows_removed"], report["rows_before"], report["columns_fixed"],
+              report["bounds_tightened"], report["entries_removed"]
+          ))
+
+    removed = report["rows"].drop(columns="Kept")
+
+    for family, counts in removed[removed.sum(axis=1) > 0].iterrows():
+        print("    %s: %s" % (family, ", ".join(
+            "%d %s" % (n, reason.lower()) for reason, n in counts.items() if n > 0
+        )))
@@ -0,0 +1,125 @@
+import pulp as pp
+
+from pyuc import relax_and_repair as rr
+from pyuc import setup_problem as sp
+from pyuc import solvers
+
+
+def solve_relax_and_fix(problem):
+    """
+    Solve the problem a window of intervals at a time: the commitment variables are integer in
+    the window and continuous after it, and those before it are fixed to the values already
+    found.  After each solve, the first RelaxAndFixStepIntervals of the window are fixed and
+    the window moves on, until it reaches the end of the horizon and the last solve is integral
+    throughout.  The same pulp problem is solved each time, changing only the variables'
+    categories and bounds, which are restored afterwards.
+
+    :param problem dict: main problem
+    """
+
+    window, step = relax_and_fix_windows(problem)
+    intervals = problem["sets"]["intervals"].indices
+    commitment = {
+        name: problem["var"][name].var for name in rr.commitment_variables
+    }
+    original = [
+        (v, v.cat, v.lowBound, v.upBound) for var in commitment.values() for v in var.values()
+    ]
+    solve_time = 0
+    num_windows = 0
+
+    try:
+        for start in range(0, len(intervals), step):
+            set_window_categories(problem, commitment, intervals, start, window)
+            rr.update_matrix_model_columns(problem)
+            problem["problem"] = solvers.solve(problem)
+            solve_time += problem["problem"].solutionTime
+            num_windows += 1
+
+            if problem["problem"].status != 1:
+                print("\nRelax and fix window starting at interval %s was not solved to "
+                      "optimality\n" % intervals[start])
+                break
+
+            if start + window >= len(intervals):
+                break
+
+            fix_intervals(commitment, intervals[start:start + step])
+
+    finally:
+        for v, cat, low_bound, up_bound in original:
+            v.cat, v.lowBound, v.upBound = cat, low_bound, up_bound
+
+        rr.update_matrix_model_columns(problem)
+
+    problem["problem"].solutionTime = solve_time
+    problem["relax_and_fix"] = {
+        "windows": num_windows,
+        "window_intervals": window,
+        "step_intervals": step,
+    }
+
+    print("Relax and fix: %d windows of %d intervals, stepping %d intervals"
+          % (num_windows, window, step))
+
+    return problem["problem"]
+
+
+def relax_and_fix_windows(problem):
+    """
+    Return the window and step lengths in intervals, from the RelaxAndFixWindowIntervals and
+    RelaxAndFixStepIntervals settings.  The step defaults to the window, and can't be longer.
+
+    :param problem dict: main problem
+    """
+
+    window = sp.get_setting(problem, "RelaxAndFixWindowIntervals")
+    step = sp.get_setting(problem, "RelaxAndFixStepIntervals")
+    step = window if step is None else step
+
+    if window < 1 or not 1 <= step <= window:
+        print("\nRelax and fix needs a window of at least one interval, and a step of between "
+              "one interval and the window (window %s, step %s)\n" % (window, step))
+        raise ValueError("Invalid relax and fix window")
+
+    return window, step
+
+
+def set_window_categories(problem, commitment, intervals, start, window):
+    """
+    Make the commitment variables integer in the window starting at position start, and
+    continuous after it.  Fixed intervals before the window are left as they are.
+
+    :param problem dict: main problem
+    :param commitment dict: commitment variable name to its pulp variables
+    :param intervals list: interval indices
+    :param start int: position of the window's first interval
+    :param window int: window length in intervals
+    """
+
+    in_window = set(intervals[start:start + window])
+    after_window = set(intervals[start + window:])
+
+    for var in commitment.values():
+        for key, v in var.items():
+            if key[0] in in_window:
+                v.cat = pp.LpInteger
+            elif key[0] in after_window:
+                v.cat = pp.LpContinuous
+
+
+def fix_intervals(commitment, intervals):
+    """
+    Fix the commitment variables of the intervals to their (integral) values.
+
+    :param commitment dict: commitment variable name to its pulp variables
+    :param intervals list: interval indices to fix
+    """
+
+    fixed = set(intervals)
+
+    for var in commitment.values():
+        for key, v in var.items():
+            if key[0] in fixed:
+                value = round(v.value() or 0)
+                v.lowBound, v.upBound = value, value
@@ -0,0 +1,176 @@
+import numpy as np
+import pulp as pp
+
+from pyuc import solvers
+from pyuc.constraints import window_start_intervals
+from pyuc.initial_state import initial_state_history
+from pyuc.unit_parameters import unit_parameters
+
+commitment_variables = ["num_committed", "num_starting_up", "num_shutting_down"]
+
+
+def solve_relax_and_repair(problem):
+    """
+    Solve the problem without proving integer optimality: solve the LP relaxation of the
+    commitment variables, round the commitment to a schedule that respects NumUnits and the
+    minimum up and down times, then solve the economic dispatch LP with the commitment fixed.
+    The gap between the repaired schedule and the LP bound is reported.
+
+    :param problem dict: main problem
+    """
+
+    variables = [v for name in commitment_variables for v in problem["var"][name].var.values()]
+    original = [(v, v.cat, v.lowBound, v.upBound) for v in variables]
+
+    try:
+        for v in variables:
+            v.cat = pp.LpContinuous
+
+        update_matrix_model_columns(problem)
+        problem["problem"] = solvers.solve(problem)
+        relaxation_status = problem["problem"].status
+        relaxation_time = problem["problem"].solutionTime
+        lp_bound = problem["problem"].objective.value()
+
+        if relaxation_status != 1:
+            print("\nThe LP relaxation was not solved to optimality, so can't be repaired\n")
+            return problem["problem"]
+
+        fix_commitment(problem, repair_commitment(problem))
+        update_matrix_model_columns(problem)
+        problem["problem"] = solvers.solve(problem)
+        problem["problem"].solutionTime += relaxation_time
+
+    finally:
+        for v, cat, low_bound, up_bound in original:
+            v.cat, v.lowBound, v.upBound = cat, low_bound, up_bound
+
+        update_matrix_model_columns(problem)
+
+    problem["relax_and_repair"] = relaxation_gap(problem["problem"].objective.value(), lp_bound)
+    print_relaxation_gap(problem["relax_and_repair"])
+
+    return problem["problem"]
+
+
+def update_matrix_model_columns(problem):
+    """
+    Pass changes to the variables' bounds and types on to the matrix model, if there is one.
+
+    :param problem dict: main problem
+    """
+
+    if "matrix_model" in problem.keys():
+        problem["matrix_model"].update_columns()
+
+
+def commitment_array(problem, name):
+    """
+    Return a commitment variable's solution as an (intervals, units_commit) array.
+
+    :param problem dict: main problem
+    :param name str: variable name
+    """
+
+    var = problem["var"][name]
+    intervals, units = problem["sets"]["intervals"], problem["sets"]["units_commit"]
+
+    return np.array(
+        [[var.var[(i, u)].value() or 0 for u in units] for i in intervals], dtype=float
+    ).reshape(len(intervals), len(units))
+
+
+def repair_commitment(problem):
+    """
+    Round the relaxed number of units committed to integers, interval by interval.  Each
+    rounded value is clipped to what the schedule so far allows: units started within their
+    minimum up time can't shut down, units shut down within their minimum down time can't
+    start, and no more than NumUnits are committed.  Returns the num_committed, num_starting_up
+    and num_shutting_down arrays of the repaired schedule.
+
+    :param problem dict: main problem
+    """
+
+    sets, data = problem["sets"], problem["data"]
+    intervals, units = sets["intervals"].indices, sets["units_commit"].indices
+    unit_params = unit_parameters(data)
+    history = initial_state_history(data)
+
+    num_units = unit_params.get("NumUnits", units)
+    up_time = unit_params.get("MinimumUpTimeHrs", units).astype(int)
+    down_time = unit_params.get("MinimumDownTimeHrs", units).astype(int)
+
+    up_start = window_start_intervals(intervals, up_time)
+    down_start = window_start_intervals(intervals, down_time)
+    initial_starts = history.window_sum("num_starting_up", units, up_start)
+    initial_stops = history.window_sum("num_shutting_down", units, down_start)
+
+    relaxed = commitment_array(problem, "num_committed")
+    committed = np.zeros(relaxed.shape)
+    cumulative_starts = np.zeros((len(intervals) + 1, len(units)))
+    cumulative_stops = np.zeros((len(intervals) + 1, len(units)))
+    previous = history.get("num_committed", units)
+    columns = np.arange(len(units))
+
+    for k in range(len(intervals)):
+        # Starts (stops) within the window up to the previous interval, inside the horizon
+        starts = cumulative_starts[k] \
+            - cumulative_starts[np.clip(up_start[k], 0, k), columns] + initial_starts[k]
+        stops = cumulative_stops[k] \
+            - cumulative_stops[np.clip(down_start[k], 0, k), columns] + initial_stops[k]
+
+        upper = np.maximum(np.minimum(num_units, num_units - stops), 0)
+        lower = np.minimum(starts, upper)
+        committed[k] = np.clip(np.floor(relaxed[k] + 0.5), lower, upper)
+
+        cumulative_starts[k + 1] = cumulative_starts[k] + np.maximum(committed[k] - previous, 0)
+        cumulative_stops[k + 1] = cumulative_stops[k] + np.maximum(previous - committed[k], 0)
+        previous = committed[k]
+
+    return {
+        "num_committed": committed,
+        "num_starting_up": np.diff(cumulative_starts, axis=0),
+        "num_shutting_down": np.diff(cumulative_stops, axis=0),
+    }
+
+
+def fix_commitment(problem, commitment):
+    """
+    Fix the commitment variables to the repaired schedule.
+
+    :param problem dict: main problem
+    :param commitment dict: arrays of the commitment variables, from repair_commitment
+    """
+
+    intervals, units = problem["sets"]["intervals"], problem["sets"]["units_commit"]
+
+    for name, values in commitment.items():
+        var = problem["var"][name]
+
+        for k, i in enumerate(intervals):
+            for m, u in enumerate(units):
+                var.var[(i, u)].lowBound = values[k, m]
+                var.var[(i, u)].upBound = values[k, m]
+
+
+def relaxation_gap(objective_value, lp_bound):
+    """
+    Return the repaired objective value, the LP bound and the relative gap between them.
+
+    :param objective_value float: objective value of the repaired schedule
+    :param lp_bound float: objective value of the LP relaxation
+    """
+
+    if objective_value is None or lp_bound is None:
+        gap = None
+    else:
+        gap = (objective_value - lp_bound) / max(abs(objective_value), 1e-9)
+
+    return {"objective": objective_value, "lp_bound": lp_bound, "gap": gap}
+
+
+def print_relaxation_gap(result):
+    print("LP Bound: %f" % result["lp_bound"])
+
+    if result["gap"] is not None:
+        print("Gap to LP Bound: %.4f%%" % (100 * result["gap"]))
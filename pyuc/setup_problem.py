@@ -6,6 +6,47 @@ import pulp as pp
 
 from pyuc import utils
 
+default_settings = {
+    "ConstraintBuilder": "Vectorised",
+    "CompactConstraintNames": False,
+    "SingleVariableBounds": False,
+    "ModelBackend": "Pulp",
+    "Solver": "CBC",
+    "SolveMode": "MIP",
+    "Reduce": False,
+    "RelaxAndFixWindowIntervals": 24,
+    "RelaxAndFixStepIntervals": None,
+    "SolverThreads": None,
+    "SolverRelativeGap": None,
+    "SolverAbsoluteGap": None,
+    "SolverTimeLimitSecs": None,
+    "SolverPresolve": None,
+    "SolverCuts": None,
+    "SolverRandomSeed": None,
+    "WarmStart": None,
+    "SeriesHorizonIntervals": None,
+    "SeriesReuseModel": True,
+    "SeriesLookAheadIntervals": 0,
+    "SeriesMode": "Sequential",
+    "SeriesProcesses": None,
+    "SeriesWarmUpDays": 1,
+    "SeriesRepairTolerance": 1e-6,
+    "SeriesCheckpoints": True,
+}
+
+# Solver options are left to the solver's own default unless set in settings.csv
+solver_option_types = {
+    "SolverThreads": int,
+    "SolverRelativeGap": float,
+    "SolverAbsoluteGap": float,
+    "SolverTimeLimitSecs": float,
+    "SolverPresolve": bool,
+    "SolverCuts": str,
+    "SolverRandomSeed": int,
+}
+
+cut_levels = ["Off", "Root", "On", "Aggressive"]
+
 
 def load_settings(settings_path):
     """
@@ -25,9 +66,75 @@ def validate_settings(settings):
     if "reserves" not in settings.keys():
         settings["reserves"] = None
 
+    validate_solver_options(settings)
+
     return settings
 
 
+def validate_solver_options(settings):
+    """
+    Check the type and range of each solver option in the settings.
+
+    :param settings dict: settings
+    """
+
+    for name, option_type in solver_option_types.items():
+        value = settings.get(name)
+
+        if value is None:
+            continue
+
+        if option_type is float and type(value) is int:
+            value = settings[name] = float(value)
+
+        if type(value) is not option_type:
+            print("\nSolver option %s should be of type %s, not %s\n"
+                  % (name, option_type.__name__, type(value).__name__))
+            raise ValueError("Invalid solver option type")
+
+    checks = {
+        "SolverThreads": lambda x: x >= 1,
+        "SolverRelativeGap": lambda x: 0 <= x <= 1,
+        "SolverAbsoluteGap": lambda x: x >= 0,
+        "SolverTimeLimitSecs": lambda x: x > 0,
+        "SolverCuts": lambda x: x in cut_levels,
+        "SolverRandomSeed": lambda x: x >= 0,
+    }
+
+    for name, check in checks.items():
+        if settings.get(name) is not None and not check(settings[name]):
+            print("\nSolver option %s has an invalid value (%s)\n" % (name, settings[name]))
+            raise ValueError("Invalid solver option value")
+
+
+def get_solver_options(problem):
+    """
+    Return the solver options that are set, as a dictionary of option names and values.
+
+    :param problem dict: main problem
+    """
+
+    options = {name: get_setting(problem, name) for name in solver_option_types.keys()}
+
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def get_setting(problem, name):
+    """
+    Return a setting from the problem, or its default if it is not set.
+
+    :param problem dict: main problem
+    :param name str: setting name
+    """
+
+    settings = problem.get("settings")
+
+    if settings is not None and name in settings.keys():
+        return settings[name]
+    else:
+        return default_settings[name]
+
+
 def import_settings_file(settings_path):
     """
     Read the settings file and convert each parameter to the appropriate type.
@@ -132,8 +239,10 @@ def initialise_paths(input_data_path, output_data_path, name):
         "demand": os.path.join(input_data_path, "demand.csv"),
         "reserve_requirement": os.path.join(input_data_path, "reserve_requirement.csv"),
         "constraint_list": os.path.join(input_data_path, "constraint_list.csv"),
+        "portfolio": os.path.join(input_data_path, "portfolio.csv"),
         "outputs": os.path.join(output_data_path, name),
         "results": os.path.join(output_data_path, name, "results"),
+        "checkpoints": os.path.join(output_data_path, "%s_checkpoints" % name),
     }
 
     return paths
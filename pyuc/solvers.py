@@ -0,0 +1,462 @@
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pulp as pp
+
+from pyuc import constraint_adder as ca
+from pyuc import matrix_model as mm
+from pyuc import setup_problem as sp
+
+cbc_status = {
+    "Optimal": 1,
+    "Infeasible": -1,
+    "Integer": -1,
+    "Unbounded": -2,
+    "Stopped": 0,
+}
+
+cbc_cut_levels = {"Off": "off", "Root": "root", "On": "on", "Aggressive": "forceOn"}
+
+# Seconds between checks of the stop event while CBC runs
+cbc_poll_secs = 0.1
+
+
+def solve(problem):
+    """
+    Solve the problem with the solver named by the Solver setting.  Each solver passes the
+    solution back to the Vars, and sets the status and solve time on the pulp problem so the
+    results are reported in the same way whichever solver is used.
+
+    :param problem dict: main problem
+    """
+
+    solver = sp.get_setting(problem, "Solver")
+
+    if solver not in solver_functions.keys():
+        print("\nSolver %s is not one of %s\n" % (solver, ", ".join(solver_functions.keys())))
+        raise ValueError("Unknown solver")
+
+    problem["problem"] = solver_functions[solver](problem)
+
+    report_progress(
+        problem,
+        "solved",
+        solver=solver,
+        status=problem["problem"].status,
+        objective=problem["problem"].objective.value(),
+        solve_time=problem["problem"].solutionTime
+    )
+
+    return problem["problem"]
+
+
+def report_progress(problem, event, **details):
+    """
+    Pass a progress event to the problem's progress callback, if it has one.  Events are
+    dictionaries with the event name and its details, e.g. an incumbent's objective and gap.
+
+    :param problem dict: main problem
+    :param event str: event name
+    """
+
+    callback = problem.get("progress_callback")
+
+    if callback is not None:
+        callback(dict(event=event, name=problem.get("name"), **details))
+
+
+def solve_cbc(problem):
+    """
+    Solve the problem with CBC: through the pulp command for the Pulp model backend, or from an
+    MPS file written directly by the matrix model for the Matrix model backend.  A problem with
+    a stop event is solved from a matrix model with either backend, as the CBC process pulp
+    starts can't be stopped.
+
+    :param problem dict: main problem
+    """
+
+    arguments = cbc_arguments(problem, sp.get_solver_options(problem))
+
+    if ca.use_matrix_backend(problem):
+        return solve_cbc_matrix_model(problem, problem["matrix_model"], arguments)
+
+    if problem.get("stop_event") is not None:
+        model = mm.matrix_model_from_pulp_problem(problem)
+        return solve_cbc_matrix_model(problem, model, arguments)
+
+    problem["problem"].solve(solver=pp.apis.PULP_CBC_CMD(
+        msg=False, options=arguments, warmStart=problem.get("warm_start", False)
+    ))
+
+    return problem["problem"]
+
+
+def cbc_arguments(problem, options):
+    """
+    Return the CBC command line arguments (without their leading dash) for the solver options,
+    and log the options applied.
+
+    :param problem dict: main problem
+    :param options dict: solver options, from get_solver_options
+    """
+
+    arguments = {
+        "SolverThreads": lambda x: "threads %d" % x,
+        "SolverRelativeGap": lambda x: "ratioGap %.17g" % x,
+        "SolverAbsoluteGap": lambda x: "allowableGap %.17g" % x,
+        "SolverTimeLimitSecs": lambda x: "seconds %.17g" % x,
+        "SolverPresolve": lambda x: "presolve %s" % ("on" if x else "off"),
+        "SolverCuts": lambda x: "cuts %s" % cbc_cut_levels[x],
+        "SolverRandomSeed": lambda x: "randomCbcSeed %d" % x,
+    }
+
+    log_solver_options(problem, "CBC", options, options)
+
+    return [arguments[name](value) for name, value in options.items()]
+
+
+def solve_cbc_matrix_model(problem, model, arguments=(), msg=False):
+    """
+    Write a matrix model of the problem to an MPS file, solve it with CBC, and pass the solution
+    back to the Vars.
+
+    :param problem dict: main problem
+    :param model MatrixModel: matrix model of the problem
+    :param arguments list: CBC command line arguments, from cbc_arguments
+    :param msg bool: show the solver output
+    """
+
+    model.set_objective(problem["problem"].objective, problem["problem"].sense)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mps_path = os.path.join(tmp_dir, "model.mps")
+        solution_path = os.path.join(tmp_dir, "model.sol")
+        model.write_mps(mps_path)
+
+        if problem.get("warm_start", False):
+            start_path = os.path.join(tmp_dir, "model.mst")
+            write_cbc_start(start_path, model)
+            arguments = list(arguments) + ["mips %s" % start_path]
+
+        start_time = time.time()
+        run_cbc(
+            problem,
+            [pp.apis.PULP_CBC_CMD().path, mps_path]
+            + [w for argument in arguments for w in ("-" + argument).split()]
+            + ["-solve", "-solu", solution_path],
+            msg
+        )
+        solution_time = time.time() - start_time
+
+        if os.path.exists(solution_path):
+            status, sol_status, values = read_cbc_solution(solution_path, len(model.variables))
+        else:
+            status, sol_status = -3, pp.LpSolutionNoSolutionFound
+            values = np.zeros(len(model.variables))
+
+    model.set_solution(values)
+    problem["problem"].assignStatus(status, sol_status)
+    problem["problem"].solutionTime = solution_time
+
+    return problem["problem"]
+
+
+def run_cbc(problem, command, msg=False):
+    """
+    Run a CBC command and return its exit code.  The CBC process is terminated if the problem's
+    stop event is set before it finishes, leaving no solution file.
+
+    :param problem dict: main problem
+    :param command list: CBC command and its arguments
+    :param msg bool: show the solver output
+    """
+
+    stop_event = problem.get("stop_event")
+    output = None if msg else subprocess.DEVNULL
+    cbc = subprocess.Popen(command, stdout=output, stderr=output)
+
+    while True:
+        if stop_event is not None and stop_event.is_set():
+            cbc.terminate()
+
+        try:
+            return cbc.wait(timeout=cbc_poll_secs)
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def read_cbc_solution(path, num_columns):
+    """
+    Read a CBC solution file of a model written by write_mps, returning the status, the
+    solution status and the value of each column (zero for columns CBC doesn't print).
+
+    :param path str: path of the solution file
+    :param num_columns int: number of columns in the model
+    """
+
+    values = np.zeros(num_columns)
+
+    with open(path) as f:
+        status_line = f.readline().split()
+        status = cbc_status.get(status_line[0] if status_line else "", -3)
+        sol_status = solution_status(status, "objective" in status_line)
+
+        for line in f:
+            fields = line.replace("**", "").split()
+
+            if len(fields) >= 3 and fields[1].startswith("C"):
+                values[int(fields[1][1:])] = float(fields[2])
+
+    return status, sol_status, values
+
+
+def solution_status(status, has_solution):
+    """
+    Return the pulp solution status of a solve, as pulp sets it for the solvers it runs: whether
+    the solution is optimal, or a feasible solution of a solve stopped early.
+
+    :param status int: pulp status of the solve
+    :param has_solution bool: whether the solve found a solution
+    """
+
+    if status == 1:
+        return pp.LpSolutionOptimal
+    elif status == 0 and has_solution:
+        return pp.LpSolutionIntegerFeasible
+
+    return {-1: pp.LpSolutionInfeasible, -2: pp.LpSolutionUnbounded}.get(
+        status, pp.LpSolutionNoSolutionFound
+    )
+
+
+def write_cbc_start(path, model):
+    """
+    Write the matrix model's initial values as a CBC MIP start file, in the solution file format
+    that CBC reads with -mips.  Columns without a value are left for CBC to complete.
+
+    :param path str: path of the MIP start file
+    :param model MatrixModel: matrix model
+    """
+
+    columns, values = model.initial_values()
+
+    with open(path, "w") as f:
+        f.write("Stopped on time - objective value 0\n")
+        f.writelines("%d C%d %.17g 0\n" % (c, c, x) for c, x in zip(columns.tolist(), values))
+
+
+def highs_option_values(problem, options):
+    """
+    Return the HiGHS option values for the solver options, and log the options applied.  HiGHS
+    can only choose whether cuts are separated beyond the root node, so the Off and Aggressive
+    cut levels are not applied.
+
+    :param problem dict: main problem
+    :param options dict: solver options, from get_solver_options
+    """
+
+    option_names = {
+        "SolverThreads": "threads",
+        "SolverRelativeGap": "mip_rel_gap",
+        "SolverAbsoluteGap": "mip_abs_gap",
+        "SolverTimeLimitSecs": "time_limit",
+        "SolverPresolve": "presolve",
+        "SolverRandomSeed": "random_seed",
+    }
+
+    values = dict()
+    applied = dict()
+
+    for name, value in options.items():
+        if name == "SolverPresolve":
+            values["presolve"] = "on" if value else "off"
+        elif name == "SolverCuts":
+            if value not in ["Root", "On"]:
+                continue
+            values["mip_allow_cut_separation_at_nodes"] = value == "On"
+        else:
+            values[option_names[name]] = value
+
+        applied[name] = value
+
+    log_solver_options(problem, "HiGHS", options, applied)
+
+    return values
+
+
+def log_solver_options(problem, solver, options, applied):
+    """
+    Print the solver options that took effect, and any the solver couldn't apply, and record
+    the applied options in the problem.
+
+    :param problem dict: main problem
+    :param solver str: solver name
+    :param options dict: solver options that were set
+    :param applied dict: solver options that took effect
+    """
+
+    problem["solver_options"] = applied
+
+    if not options:
+        return
+
+    print("%s options: %s" % (
+        solver, ", ".join("%s=%s" % (name, value) for name, value in applied.items()) or "none"
+    ))
+
+    not_applied = [name for name in options.keys() if name not in applied.keys()]
+
+    if not_applied:
+        print("%s options not applied: %s" % (
+            solver, ", ".join("%s=%s" % (name, options[name]) for name in not_applied)
+        ))
+
+
+def import_highspy():
+    """Import highspy, which is only needed when the HiGHS solver is used. """
+
+    try:
+        import highspy
+    except ImportError:
+        print("\nThe HiGHS solver needs the highspy package (pip install highspy)\n")
+        raise
+
+    return highspy
+
+
+def subscribe_highs_callbacks(problem, highs):
+    """
+    Report each improving MIP solution as an incumbent progress event, and stop the solve if the
+    problem's stop event is set (e.g. when an asynchronous run is cancelled).
+
+    :param problem dict: main problem
+    :param highs highspy.Highs: HiGHS instance
+    """
+
+    if problem.get("progress_callback") is not None:
+        highs.cbMipImprovingSolution.subscribe(lambda e: report_progress(
+            problem,
+            "incumbent",
+            objective=e.data_out.objective_function_value,
+            bound=e.data_out.mip_dual_bound,
+            gap=e.data_out.mip_gap,
+            time=e.data_out.running_time
+        ))
+
+    stop_event = problem.get("stop_event")
+
+    if stop_event is not None:
+        highs.cbMipInterrupt.subscribe(lambda e: e.interrupt() if stop_event.is_set() else None)
+
+
+def highs_status(highspy, model_status):
+    """
+    Return the pulp status of a HiGHS model status.
+
+    :param highspy module: highspy module
+    :param model_status highspy.HighsModelStatus: HiGHS model status
+    """
+
+    status_map = {
+        highspy.HighsModelStatus.kOptimal: 1,
+        highspy.HighsModelStatus.kInfeasible: -1,
+        highspy.HighsModelStatus.kUnbounded: -2,
+        highspy.HighsModelStatus.kUnboundedOrInfeasible: -2,
+    }
+
+    return status_map.get(model_status, 0)
+
+
+def make_highs_lp(highspy, model):
+    """
+    Return a HighsLp holding the matrix model's arrays, with the constraint matrix row-wise.
+
+    :param highspy module: highspy module
+    :param model MatrixModel: matrix model, with its objective set
+    """
+
+    indptr, columns, values = model.csr()
+    row_lower, row_upper = model.row_bounds()
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = len(model.variables)
+    lp.num_row_ = model.num_rows
+    lp.offset_ = model.objective_constant
+    lp.col_cost_ = model.objective
+    lp.col_lower_ = np.clip(model.column_lower, -highspy.kHighsInf, highspy.kHighsInf)
+    lp.col_upper_ = np.clip(model.column_upper, -highspy.kHighsInf, highspy.kHighsInf)
+    lp.row_lower_ = np.clip(row_lower, -highspy.kHighsInf, highspy.kHighsInf)
+    lp.row_upper_ = np.clip(row_upper, -highspy.kHighsInf, highspy.kHighsInf)
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.start_ = indptr
+    lp.a_matrix_.index_ = columns
+    lp.a_matrix_.value_ = values
+
+    if model.column_integer.any():
+        lp.integrality_ = [
+            highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+            for integer in model.column_integer.tolist()
+        ]
+
+    return lp
+
+
+def solve_highs(problem, msg=False):
+    """
+    Solve the problem with HiGHS in-process, passing the model as arrays so no model or
+    solution files are written.  The Matrix model backend's matrix model is used directly, and
+    for the Pulp model backend one is built from the pulp constraints.
+
+    :param problem dict: main problem
+    :param msg bool: show the solver output
+    """
+
+    highspy = import_highspy()
+
+    if ca.use_matrix_backend(problem):
+        model = problem["matrix_model"]
+    else:
+        model = mm.matrix_model_from_pulp_problem(problem)
+
+    model.set_objective(problem["problem"].objective, problem["problem"].sense)
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", msg)
+
+    for name, value in highs_option_values(problem, sp.get_solver_options(problem)).items():
+        highs.setOptionValue(name, value)
+
+    subscribe_highs_callbacks(problem, highs)
+
+    highs.passModel(make_highs_lp(highspy, model))
+
+    if problem.get("warm_start", False):
+        columns, values = model.initial_values()
+        highs.setSolution(len(columns), columns.astype(np.int32), values)
+
+    start_time = time.time()
+    highs.run()
+    solution_time = time.time() - start_time
+
+    status = highs_status(highspy, highs.getModelStatus())
+    has_solution = highs.getInfo().primal_solution_status > 0
+
+    if has_solution:
+        values = np.asarray(highs.getSolution().col_value)
+    else:
+        values = np.zeros(len(model.variables))
+
+    model.set_solution(values)
+    problem["problem"].assignStatus(status, solution_status(status, has_solution))
+    problem["problem"].solutionTime = solution_time
+
+    return problem["problem"]
+
+
+solver_functions = {
+    "CBC": solve_cbc,
+    "HiGHS": solve_highs,
+}
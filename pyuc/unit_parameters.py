@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+
+class UnitParameterTable():
+    def __init__(self, unit_data):
+        """
+        Hold each numeric unit data column as a contiguous float array, plus a map from unit to
+        array position, and precompute the derived quantities used by the model builders.
+
+        :param unit_data DataFrame: unit data, indexed by unit
+        """
+
+        self.unit_data = unit_data
+        self.units = unit_data.index.to_list()
+        self.positions = {u: n for n, u in enumerate(self.units)}
+        self.columns = dict()
+        self.text_columns = dict()
+        self.position_cache = dict()
+
+        for column in unit_data.columns:
+            if pd.api.types.is_numeric_dtype(unit_data[column]):
+                self.columns[column] = \
+                    np.ascontiguousarray(unit_data[column].to_numpy(dtype=float))
+            else:
+                self.text_columns[column] = unit_data[column].to_list()
+
+        self.add_derived_columns()
+
+    def __repr__(self):
+        return "UnitParameterTable(units=%d, columns=%d)" % (len(self.units), len(self.columns))
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def add_derived_columns(self):
+        """Add derived columns, where the columns they depend on are present. """
+
+        def has(*columns):
+            return all(column in self.columns for column in columns)
+
+        c = self.columns
+
+        if has("FuelCost$/GJ", "ThermalEfficiencyFrac"):
+            c["FuelCost$/MWh"] = fuel_cost_per_mwh(c["FuelCost$/GJ"], c["ThermalEfficiencyFrac"])
+
+        if has("CapacityMW", "NumUnits"):
+            c["TotalCapacityMW"] = c["CapacityMW"] * c["NumUnits"]
+
+        if has("CapacityMW", "MinimumGenerationFrac"):
+            c["MinimumGenerationMW"] = c["MinimumGenerationFrac"] * c["CapacityMW"]
+
+        if has("CapacityMW", "RampRate_pctCapphr"):
+            c["OnlineRampMW"] = c["RampRate_pctCapphr"] * c["CapacityMW"]
+
+        if has("CapacityMW", "RampRate_pctCapphr", "MinimumGenerationFrac"):
+            c["StartUpRampMW"] = \
+                np.maximum(c["RampRate_pctCapphr"], c["MinimumGenerationFrac"]) * c["CapacityMW"]
+            c["ShutDownRampMW"] = c["StartUpRampMW"]
+
+        if has("CapacityMW", "NumUnits", "RoundTripEfficiencyFrac"):
+            c["ChargeCapacityMW"] = c["NumUnits"] * c["CapacityMW"] * c["RoundTripEfficiencyFrac"]
+
+        if has("CapacityMW", "NumUnits", "StorageHrs"):
+            c["EnergyCapacityMWh"] = c["NumUnits"] * c["CapacityMW"] * c["StorageHrs"]
+
+    def unit_positions(self, units):
+        """
+        Return the array positions of the units, caching the result for repeated unit lists.
+
+        :param units list: unit names
+        """
+
+        key = tuple(units)
+
+        if key not in self.position_cache:
+            self.position_cache[key] = \
+                np.array([self.positions[u] for u in units], dtype=np.intp)
+
+        return self.position_cache[key]
+
+    def get(self, column, units):
+        """
+        Return a column as a float array aligned to the units.
+
+        :param column str: column name
+        :param units list: unit names
+        """
+
+        if len(units) == 0:
+            return np.zeros(0)
+
+        return self.columns[column][self.unit_positions(units)]
+
+    def value(self, column, u):
+        """
+        Return a column value for a single unit.
+
+        :param column str: column name
+        :param u str: unit name
+        """
+
+        return self.columns[column][self.positions[u]]
+
+    def text(self, column, units):
+        """
+        Return a non-numeric column (e.g. Technology) as a list aligned to the units.
+
+        :param column str: column name
+        :param units list: unit names
+        """
+
+        return [self.text_columns[column][self.positions[u]] for u in units]
+
+
+def fuel_cost_per_mwh(fuel_cost, thermal_efficiency):
+    """
+    Calculate fuel cost in $/MWh, which is zero for units without a thermal efficiency.
+
+    :param fuel_cost array: fuel cost in $/GJ
+    :param thermal_efficiency array: thermal efficiency fraction
+    """
+
+    fuel_cost_mwh = np.zeros(len(fuel_cost))
+    has_efficiency = thermal_efficiency != 0
+    fuel_cost_mwh[has_efficiency] = \
+        3.6 * fuel_cost[has_efficiency] / thermal_efficiency[has_efficiency]
+
+    return fuel_cost_mwh
+
+
+def unit_parameters(data):
+    """
+    Return the unit parameter table from the data dictionary, building it from the unit data
+    the first time it is needed if load_data has not already done so (or if the unit data has
+    since been replaced).
+
+    :param data dict: data dictionary
+    """
+
+    table = data.get("unit_parameters")
+
+    if table is None or table.unit_data is not data["units"]:
+        table = UnitParameterTable(data["units"])
+        data["unit_parameters"] = table
+
+    return table
@@ -0,0 +1,760 @@
+import numpy as np
+import pulp as pp
+
+from pyuc import constraints as cnsts
+from pyuc.constraints import cached_helper, constraint_adder
+from pyuc.initial_state import initial_state_history
+from pyuc.unit_parameters import unit_parameters
+
+
+class ConstraintBlock():
+    def __init__(self, name, index_names, index, sense):
+        """
+        A family of constraints held as coefficient arrays, with one row per index.
+
+        :param name str: label prefix shared by the rows, e.g. "power_lt_capacity_"
+        :param index_names tuple: names used for each index dimension in labels, e.g. ("i", "u")
+        :param index list: index tuple of each row
+        :param sense int: pulp constraint sense (pp.LpConstraintLE, GE or EQ)
+        """
+
+        self.name = name
+        self.index_names = index_names
+        self.index = index
+        self.sense = sense
+        self.terms = list()
+        self.expressions = list()
+        self.rhs = np.zeros(len(index))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        return "ConstraintBlock(%s); rows=%d, terms=%d" % (self.name, len(self), len(self.terms))
+
+    def add_term(self, variables, coefficients):
+        """
+        Add a term holding one variable per row.
+
+        :param variables list: pulp variable for each row, or None where the row has no term
+        :param coefficients float or array: coefficient for each row
+        """
+
+        coefficients = np.broadcast_to(np.asarray(coefficients, dtype=float), (len(self),))
+        self.terms.append((variables, coefficients))
+
+    def add_expressions(self, expressions):
+        """
+        Add a term holding a {variable: coefficient} dictionary per row, e.g. a window sum.  The
+        first such term is copied as the starting point of each row.
+
+        :param expressions list: dictionary for each row
+        """
+
+        self.expressions.append(expressions)
+
+    def add_rhs(self, rhs):
+        """
+        Add to the right hand side of each row.
+
+        :param rhs float or array: value to add for each row
+        """
+
+        self.rhs = self.rhs + np.broadcast_to(np.asarray(rhs, dtype=float), (len(self),))
+
+    def labels(self):
+        """Yield the label of each row, matching the format of the reference constraints. """
+
+        for ind in self.index:
+            keys = ", ".join([f"{n}={k}" for n, k in zip(self.index_names, ind)])
+            yield f"{self.name}({keys})"
+
+    def items(self):
+        """Yield label-condition pairs. """
+
+        return zip(self.labels(), self.values())
+
+    def values(self):
+        """Yield the condition of each row, building each pulp constraint from the arrays. """
+
+        terms = [(variables, coefficients.tolist()) for variables, coefficients in self.terms]
+        rhs = self.rhs.tolist()
+
+        for n in range(len(self)):
+            expression = dict(self.expressions[0][n]) if self.expressions else dict()
+
+            for row_expressions in self.expressions[1:]:
+                for variable, coefficient in row_expressions[n].items():
+                    expression[variable] = expression.get(variable, 0) + coefficient
+
+            for variables, coefficients in terms:
+                variable, coefficient = variables[n], coefficients[n]
+
+                if variable is None or coefficient == 0:
+                    continue
+
+                expression[variable] = expression.get(variable, 0) + coefficient
+
+            yield pp.LpConstraint(
+                pp.LpAffineExpression(expression), sense=self.sense, rhs=rhs[n]
+            )
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+def grid_index(intervals, units):
+    """Return the interval-major index of every interval-unit pair. """
+
+    return [(i, u) for i in intervals for u in units]
+
+
+def grid_variables(var, intervals, units):
+    """Return the pulp variable of every interval-unit pair, interval-major. """
+
+    return [var.var[(i, u)] for i in intervals for u in units]
+
+
+def lagged_grid_variables(var, intervals, units, lag):
+    """
+    Return the pulp variable of the interval lag positions before each interval-unit pair, or
+    None where that interval is outside the intervals.  A negative lag looks forward.
+    """
+
+    return [
+        var.var[(intervals[n - lag], u)] if 0 <= n - lag < len(intervals) else None
+        for n in range(len(intervals)) for u in units
+    ]
+
+
+def per_unit(values, intervals):
+    """Repeat a per-unit array across intervals, interval-major. """
+
+    return np.tile(values, len(intervals))
+
+
+@cached_helper
+def commitment_grid(sets, var):
+    """
+    Return the interval-major index of every interval-unit pair for units that commit, with the
+    power and commitment variables of each pair, as used by the commitment families.
+    """
+
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = {"index": grid_index(intervals, units)}
+
+    for variable in ["power_generated", "num_committed", "num_starting_up", "num_shutting_down"]:
+        grid[variable] = grid_variables(var[variable], intervals, units)
+
+    return grid
+
+
+@cached_helper
+def previous_power_generated(sets, data, var):
+    """
+    Return the power generated variable of the previous interval for each interval-unit pair of
+    units that commit, and the initial state power which takes its place in the first interval.
+    """
+
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+
+    return (
+        lagged_grid_variables(var["power_generated"], intervals, units, 1),
+        initial_grid_values(sets, data, "power_generated")
+    )
+
+
+def initial_grid_values(sets, data, variable):
+    """
+    Return an initial state variable for each interval-unit pair of units that commit, in the
+    first interval, and zero after it.
+    """
+
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    values = np.zeros(len(intervals) * len(units))
+    values[:len(units)] = initial_state_history(data).get(variable, units)
+
+    return values
+
+
+def add_reserve_terms(block, sets, var, intervals, units, reserve_set, coefficient):
+    """
+    Add reserve enabled terms for each reserve in reserve_set, for the unit-reserve pairs in the
+    reserve enabled variable's domain.
+    """
+
+    reserve_enabled = var["reserve_enabled"].var
+
+    if len(reserve_enabled) == 0:
+        return
+
+    for r in sets[reserve_set].indices:
+        block.add_term(
+            [reserve_enabled.get((i, u, r)) for i in intervals for u in units], coefficient
+        )
+
+
+@constraint_adder
+def cnt_supply_eq_demand(sets, data, var):
+    intervals = list(sets["intervals"].indices)
+    index = [(i,) for i in intervals]
+    block = ConstraintBlock("supply_eq_demand_", ("i",), index, pp.LpConstraintEQ)
+
+    for u in sets["units"].indices:
+        block.add_term([var["power_generated"].var[(i, u)] for i in intervals], 1)
+
+    block.add_term([var["unserved_power"].var[(i)] for i in intervals], 1)
+
+    units_storage = list(sets["units_storage"].indices)
+    round_trip_efficiency = \
+        unit_parameters(data).get("RoundTripEfficiencyFrac", units_storage)
+
+    # Storage without a round trip efficiency cannot charge, so its charge is left out rather
+    # than given an infinite coefficient
+    for u, efficiency in zip(units_storage, round_trip_efficiency):
+        if efficiency == 0:
+            continue
+
+        block.add_term([var["power_charged"].var[(i, u)] for i in intervals], -1 / efficiency)
+
+    block.add_rhs(rhs_supply_eq_demand(sets, data))
+
+    return block
+
+
+def rhs_supply_eq_demand(sets, data):
+    return data["demand"]["Demand"].loc[list(sets["intervals"].indices)].to_numpy(dtype=float)
+
+
+@constraint_adder
+def cnt_reserve_enabled_exceeds_reserve_requirement(sets, data, var):
+    intervals = list(sets["intervals"].indices)
+    reserves = list(sets["reserves"].indices)
+    index = grid_index(intervals, reserves)
+    block = ConstraintBlock(
+        "reserve_enabled_exceeds_reserve_requirement_", ("i", "r"), index, pp.LpConstraintGE
+    )
+
+    reserve_enabled = var["reserve_enabled"].var
+
+    for u in sets["units_reserve"].indices:
+        block.add_term([reserve_enabled.get((i, u, r)) for (i, r) in index], 1)
+
+    block.add_term(grid_variables(var["unserved_reserve"], intervals, reserves), 1)
+    block.add_rhs(rhs_reserve_requirement(sets, data))
+
+    return block
+
+
+def rhs_reserve_requirement(sets, data):
+    intervals = list(sets["intervals"].indices)
+    reserves = list(sets["reserves"].indices)
+
+    return data["reserve_requirement"].loc[intervals, reserves].to_numpy(dtype=float).ravel()
+
+
+@constraint_adder
+def cnt_power_lt_capacity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units"].indices)
+    block = ConstraintBlock(
+        "power_lt_capacity_", ("i", "u"), grid_index(intervals, units), pp.LpConstraintLE
+    )
+
+    capacity = unit_parameters(data).get("TotalCapacityMW", units)
+
+    block.add_term(grid_variables(var["power_generated"], intervals, units), 1)
+    block.add_rhs(per_unit(capacity, intervals))
+
+    return block
+
+
+@constraint_adder
+def cnt_power_lt_committed_capacity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "power_lt_committed_capacity_", ("i", "u"), grid["index"], pp.LpConstraintLE
+    )
+
+    capacity = unit_parameters(data).get("CapacityMW", units)
+
+    block.add_term(grid["power_generated"], 1)
+    add_reserve_terms(block, sets, var, intervals, units, "raise_reserves", 1)
+    block.add_term(grid["num_committed"], -per_unit(capacity, intervals))
+
+    return block
+
+
+@constraint_adder
+def cnt_power_gt_minimum_generation(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "power_gt_minimum_generation_", ("i", "u"), grid["index"], pp.LpConstraintGE
+    )
+
+    minimum_generation = unit_parameters(data).get("MinimumGenerationMW", units)
+
+    block.add_term(grid["power_generated"], 1)
+    add_reserve_terms(block, sets, var, intervals, units, "lower_reserves", -1)
+    block.add_term(grid["num_committed"], -per_unit(minimum_generation, intervals))
+
+    return block
+
+
+@constraint_adder
+def cnt_num_committed_lt_num_units(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "num_committed_lt_num_units", ("i", "u"), grid["index"], pp.LpConstraintLE
+    )
+
+    block.add_term(grid["num_committed"], 1)
+    block.add_rhs(per_unit(unit_parameters(data).get("NumUnits", units), intervals))
+
+    return block
+
+
+@constraint_adder
+def cnt_commitment_continuity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    block = ConstraintBlock(
+        "commitment_continuity", ("i", "u"), grid_index(intervals[1:], units), pp.LpConstraintEQ
+    )
+
+    block.add_term(grid_variables(var["num_committed"], intervals[1:], units), 1)
+    block.add_term(grid_variables(var["num_committed"], intervals[:-1], units), -1)
+    block.add_term(grid_variables(var["num_starting_up"], intervals[1:], units), -1)
+    block.add_term(grid_variables(var["num_shutting_down"], intervals[1:], units), 1)
+
+    return block
+
+
+@constraint_adder
+def cnt_commitment_continuity_initial_interval(sets, data, var):
+    intervals, units = list(sets["intervals"].indices)[:1], list(sets["units_commit"].indices)
+    block = ConstraintBlock(
+        "commitment_continuity", ("i", "u"), grid_index(intervals, units), pp.LpConstraintEQ
+    )
+
+    block.add_term(grid_variables(var["num_committed"], intervals, units), 1)
+    block.add_term(grid_variables(var["num_starting_up"], intervals, units), -1)
+    block.add_term(grid_variables(var["num_shutting_down"], intervals, units), 1)
+    block.add_rhs(rhs_commitment_continuity_initial_interval(sets, data))
+
+    return block
+
+
+def rhs_commitment_continuity_initial_interval(sets, data):
+    units = list(sets["units_commit"].indices)
+
+    return initial_state_history(data).get("num_committed", units)
+
+
+@constraint_adder
+def cnt_cumulative_starting_up(sets, data, var):
+    return cumulative_count_block(sets, var, "cumulative_starting_up", "num_starting_up")
+
+
+@constraint_adder
+def cnt_cumulative_shutting_down(sets, data, var):
+    return cumulative_count_block(sets, var, "cumulative_shutting_down", "num_shutting_down")
+
+
+def cumulative_count_block(sets, var, name, events):
+    """
+    Return the rows that make a cumulative count variable the running total of its events from
+    the first interval (see cnsts.cumulative_count_constraints).
+    """
+
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    block = ConstraintBlock(name, ("i", "u"), grid_index(intervals, units), pp.LpConstraintEQ)
+
+    block.add_term(grid_variables(var[name], intervals, units), 1)
+    block.add_term(lagged_grid_variables(var[name], intervals, units, 1), -1)
+    block.add_term(grid_variables(var[events], intervals, units), -1)
+
+    return block
+
+
+def add_window_count_terms(block, cumulative, intervals, units, window, coefficient):
+    """
+    Add the number of events within each unit's window of intervals ending at each interval,
+    multiplied by coefficient: the cumulative count at the interval less that window intervals
+    before it (see cnsts.window_counts).  Rows with no window have no terms.
+    """
+
+    window = np.asarray(window, dtype=int)
+
+    block.add_term([
+        cumulative.var[(i, u)] if w > 0 else None
+        for i in intervals for u, w in zip(units, window)
+    ], coefficient)
+    block.add_term([
+        cumulative.var[(intervals[n - w], u)] if 0 < w <= n else None
+        for n in range(len(intervals)) for u, w in zip(units, window)
+    ], -coefficient)
+
+
+@constraint_adder
+def cnt_minimum_up_time(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "minimum_up_time", ("i", "u"), grid["index"], pp.LpConstraintGE
+    )
+
+    up_time = unit_parameters(data).get("MinimumUpTimeHrs", units)
+
+    add_window_count_terms(block, var["cumulative_starting_up"], intervals, units, up_time, -1)
+    block.add_term(grid["num_committed"], 1)
+    block.add_rhs(rhs_minimum_up_time(sets, data))
+
+    return block
+
+
+def rhs_minimum_up_time(sets, data):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    up_time = unit_parameters(data).get("MinimumUpTimeHrs", units)
+
+    return initial_state_history(data).window_sum(
+        "num_starting_up", units, cnsts.window_start_intervals(intervals, up_time)
+    ).ravel()
+
+
+@constraint_adder
+def cnt_minimum_down_time(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "minimum_down_time", ("i", "u"), grid["index"], pp.LpConstraintGE
+    )
+
+    down_time = unit_parameters(data).get("MinimumDownTimeHrs", units)
+
+    add_window_count_terms(
+        block, var["cumulative_shutting_down"], intervals, units, down_time, -1
+    )
+    block.add_term(grid["num_committed"], -1)
+    block.add_rhs(rhs_minimum_down_time(sets, data))
+
+    return block
+
+
+def rhs_minimum_down_time(sets, data):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    unit_params = unit_parameters(data)
+    down_time = unit_params.get("MinimumDownTimeHrs", units)
+
+    return initial_state_history(data).window_sum(
+        "num_shutting_down", units, cnsts.window_start_intervals(intervals, down_time)
+    ).ravel() - per_unit(unit_params.get("NumUnits", units), intervals)
+
+
+def add_ramp_terms(block, sets, data, var, direction):
+    """
+    Add the change in power output relative to the previous interval (or the initial state power
+    for the first interval), multiplied by direction (1 for up, -1 for down).
+    """
+
+    previous_power, initial_power = previous_power_generated(sets, data, var)
+
+    block.add_term(commitment_grid(sets, var)["power_generated"], direction)
+    block.add_term(previous_power, -direction)
+    block.add_rhs(direction * initial_power)
+
+
+def rhs_ramp_rate_up(sets, data):
+    return initial_grid_values(sets, data, "power_generated")
+
+
+def rhs_ramp_rate_down(sets, data):
+    return -initial_grid_values(sets, data, "power_generated")
+
+
+@constraint_adder
+def cnt_ramp_rate_up(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "ramp_rate_up_", ("i", "u"), grid["index"], pp.LpConstraintLE
+    )
+
+    unit_params = unit_parameters(data)
+    online_ramp_capacity = per_unit(unit_params.get("OnlineRampMW", units), intervals)
+    start_up_ramp_capacity = per_unit(unit_params.get("StartUpRampMW", units), intervals)
+    minimum_generation = per_unit(unit_params.get("MinimumGenerationMW", units), intervals)
+
+    add_ramp_terms(block, sets, data, var, 1)
+    block.add_term(grid["num_committed"], -online_ramp_capacity)
+    block.add_term(grid["num_starting_up"], online_ramp_capacity - start_up_ramp_capacity)
+    block.add_term(grid["num_shutting_down"], minimum_generation)
+
+    return block
+
+
+@constraint_adder
+def cnt_ramp_rate_down(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "ramp_rate_down_", ("i", "u"), grid["index"], pp.LpConstraintLE
+    )
+
+    unit_params = unit_parameters(data)
+    online_ramp_capacity = per_unit(unit_params.get("OnlineRampMW", units), intervals)
+    shut_down_ramp_capacity = per_unit(unit_params.get("ShutDownRampMW", units), intervals)
+    minimum_generation = per_unit(unit_params.get("MinimumGenerationMW", units), intervals)
+
+    add_ramp_terms(block, sets, data, var, -1)
+    block.add_term(grid["num_committed"], -online_ramp_capacity)
+    block.add_term(grid["num_starting_up"], online_ramp_capacity + minimum_generation)
+    block.add_term(grid["num_shutting_down"], -shut_down_ramp_capacity)
+
+    return block
+
+
+def tight_grid_parameters(data, intervals, units):
+    """Return the tight formulation parameters repeated across intervals, interval-major. """
+
+    return {
+        name: per_unit(values, intervals) for name, values in
+        cnsts.tight_formulation_parameters(data, units, as_arrays=True).items()
+    }
+
+
+@constraint_adder
+def cnt_power_lt_start_up_shut_down_capacity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "power_lt_start_up_shut_down_capacity_", ("i", "u"), grid["index"], pp.LpConstraintLE
+    )
+
+    tight = tight_grid_parameters(data, intervals, units)
+
+    block.add_term(grid["power_generated"], 1)
+    block.add_term(grid["num_committed"], -tight["capacity"])
+    block.add_term(grid["num_starting_up"], tight["capacity"] - tight["start_up"])
+    block.add_term(
+        lagged_grid_variables(var["num_shutting_down"], intervals, units, -1),
+        (tight["capacity"] - tight["shut_down"]) * tight["long_up_time"]
+    )
+
+    return block
+
+
+@constraint_adder
+def cnt_power_lt_shut_down_capacity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    long_up_time = \
+        cnsts.tight_formulation_parameters(data, units, as_arrays=True)["long_up_time"]
+    units = [u for u, long in zip(units, long_up_time) if not long]
+    block = ConstraintBlock(
+        "power_lt_shut_down_capacity_", ("i", "u"), grid_index(intervals[:-1], units),
+        pp.LpConstraintLE
+    )
+
+    tight = tight_grid_parameters(data, intervals[:-1], units)
+
+    block.add_term(grid_variables(var["power_generated"], intervals[:-1], units), 1)
+    block.add_term(grid_variables(var["num_committed"], intervals[:-1], units), -tight["capacity"])
+    block.add_term(
+        grid_variables(var["num_shutting_down"], intervals[1:], units),
+        tight["capacity"] - tight["shut_down"]
+    )
+
+    return block
+
+
+@constraint_adder
+def cnt_tight_ramp_rate_up(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "tight_ramp_rate_up_", ("i", "u"), grid["index"], pp.LpConstraintLE
+    )
+
+    tight = tight_grid_parameters(data, intervals, units)
+
+    add_ramp_terms(block, sets, data, var, 1)
+    block.add_term(grid["num_committed"], -tight["online_ramp"])
+    block.add_term(grid["num_starting_up"], tight["online_ramp"] - tight["start_up"])
+    block.add_term(grid["num_shutting_down"], tight["minimum_generation"])
+    block.add_term(
+        lagged_grid_variables(var["num_shutting_down"], intervals, units, -1),
+        np.maximum(
+            tight["online_ramp"] - tight["shut_down"] + tight["minimum_generation"], 0
+        ) * tight["long_up_time"]
+    )
+
+    return block
+
+
+@constraint_adder
+def cnt_tight_ramp_rate_down(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    grid = commitment_grid(sets, var)
+    block = ConstraintBlock(
+        "tight_ramp_rate_down_", ("i", "u"), grid["index"], pp.LpConstraintLE
+    )
+
+    tight = tight_grid_parameters(data, intervals, units)
+    start_up_coupling = tight_start_up_coupling(tight)
+
+    add_ramp_terms(block, sets, data, var, -1)
+    block.add_term(grid["num_committed"], -tight["online_ramp"])
+    block.add_term(grid["num_starting_up"], tight["online_ramp"] + tight["minimum_generation"])
+    block.add_term(grid["num_shutting_down"], -tight["shut_down"])
+    block.add_term(
+        lagged_grid_variables(var["num_starting_up"], intervals, units, 1), start_up_coupling
+    )
+    block.add_rhs(
+        -start_up_coupling * initial_grid_values(sets, data, "num_starting_up")
+    )
+
+    return block
+
+
+def tight_start_up_coupling(tight):
+    """Return the coefficient of the previous interval's start ups in TightRampRateDown. """
+
+    return np.maximum(
+        tight["online_ramp"] - tight["start_up"] + tight["minimum_generation"], 0
+    ) * tight["long_up_time"]
+
+
+def rhs_tight_ramp_rate_down(sets, data):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_commit"].indices)
+    start_up_coupling = tight_start_up_coupling(tight_grid_parameters(data, intervals, units))
+
+    return rhs_ramp_rate_down(sets, data) \
+        - start_up_coupling * initial_grid_values(sets, data, "num_starting_up")
+
+
+@constraint_adder
+def cnt_variable_resource_availability(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_variable"].indices)
+    block = ConstraintBlock(
+        "variable_resource_availability", ("i", "u"), grid_index(intervals, units),
+        pp.LpConstraintLE
+    )
+
+    if len(units) == 0:
+        return block
+
+    block.add_term(grid_variables(var["power_generated"], intervals, units), 1)
+    block.add_rhs(rhs_variable_resource_availability(sets, data))
+
+    return block
+
+
+def rhs_variable_resource_availability(sets, data):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_variable"].indices)
+
+    if len(units) == 0:
+        return np.zeros(0)
+
+    unit_params = unit_parameters(data)
+    technology = unit_params.text("Technology", units)
+    capacity = unit_params.get("TotalCapacityMW", units)
+    traces = data["variable_traces"].loc[intervals, technology].to_numpy(dtype=float)
+
+    return (traces * capacity[None, :]).ravel()
+
+
+@constraint_adder
+def cnt_charge_lt_rt_loss_adjusted_capacity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_storage"].indices)
+    block = ConstraintBlock(
+        "charge_lt_rt_loss_adjusted_capacity", ("i", "u"), grid_index(intervals, units),
+        pp.LpConstraintLE
+    )
+
+    charge_capacity = unit_parameters(data).get("ChargeCapacityMW", units)
+
+    block.add_term(grid_variables(var["power_charged"], intervals, units), 1)
+    block.add_rhs(per_unit(charge_capacity, intervals))
+
+    return block
+
+
+def add_storage_flow_terms(block, data, var, intervals, units):
+    """Add the energy charged less the energy discharged over each interval. """
+
+    duration = data["IntervalDurationHrs"]
+
+    block.add_term(grid_variables(var["power_charged"], intervals, units), duration)
+    block.add_term(grid_variables(var["power_generated"], intervals, units), -duration)
+
+
+@constraint_adder
+def cnt_storage_energy_continuity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_storage"].indices)
+    block = ConstraintBlock(
+        "storage_energy_continuity", ("i", "u"), grid_index(intervals[1:], units),
+        pp.LpConstraintEQ
+    )
+
+    block.add_term(grid_variables(var["stored_energy"], intervals[:-1], units), 1)
+    block.add_term(grid_variables(var["stored_energy"], intervals[1:], units), -1)
+    add_storage_flow_terms(block, data, var, intervals[1:], units)
+
+    return block
+
+
+@constraint_adder
+def cnt_storage_energy_continuity_initial_interval(sets, data, var):
+    intervals, units = list(sets["intervals"].indices)[:1], list(sets["units_storage"].indices)
+    block = ConstraintBlock(
+        "storage_energy_continuity", ("i", "u"), grid_index(intervals, units), pp.LpConstraintEQ
+    )
+
+    block.add_term(grid_variables(var["stored_energy"], intervals, units), -1)
+    add_storage_flow_terms(block, data, var, intervals, units)
+    block.add_rhs(rhs_storage_energy_continuity_initial_interval(sets, data))
+
+    return block
+
+
+def rhs_storage_energy_continuity_initial_interval(sets, data):
+    units = list(sets["units_storage"].indices)
+
+    return -initial_state_history(data).get("stored_energy", units)
+
+
+@constraint_adder
+def cnt_stored_energy_lt_storage_capacity(sets, data, var):
+    intervals, units = list(sets["intervals"].indices), list(sets["units_storage"].indices)
+    block = ConstraintBlock(
+        "stored_energy_lt_storage_capacity", ("i", "u"), grid_index(intervals, units),
+        pp.LpConstraintLE
+    )
+
+    energy_capacity = \
+        unit_parameters(data).get("EnergyCapacityMWh", units) * data["IntervalDurationHrs"]
+
+    block.add_term(grid_variables(var["stored_energy"], intervals, units), 1)
+    block.add_rhs(per_unit(energy_capacity, intervals))
+
+    return block
+
+
+# Right hand sides that change with the traces or the initial state, by family function name, so
+# a model built for one window can be updated for the next without building its rows again.  The
+# right hand sides of the other families depend only on the unit data.
+window_rhs_functions = {
+    "cnt_supply_eq_demand": rhs_supply_eq_demand,
+    "cnt_reserve_enabled_exceeds_reserve_requirement": rhs_reserve_requirement,
+    "cnt_commitment_continuity_initial_interval": rhs_commitment_continuity_initial_interval,
+    "cnt_minimum_up_time": rhs_minimum_up_time,
+    "cnt_minimum_down_time": rhs_minimum_down_time,
+    "cnt_ramp_rate_up": rhs_ramp_rate_up,
+    "cnt_ramp_rate_down": rhs_ramp_rate_down,
+    "cnt_tight_ramp_rate_up": rhs_ramp_rate_up,
+    "cnt_tight_ramp_rate_down": rhs_tight_ramp_rate_down,
+    "cnt_variable_resource_availability": rhs_variable_resource_availability,
+    "cnt_storage_energy_continuity_initial_interval":
+        rhs_storage_energy_continuity_initial_interval,
+}
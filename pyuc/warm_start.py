@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pyuc import setup_problem as sp
+from pyuc.initial_state import initial_state_history
+
+warm_start_variables = [
+    "num_committed",
+    "num_starting_up",
+    "num_shutting_down",
+    "power_generated",
+]
+
+
+def apply_warm_start_setting(problem):
+    """
+    Seed the warm start named by the WarmStart setting: InitialState to hold the initial state
+    commitment flat, or the path to a results directory written by save_results.
+
+    :param problem dict: main problem
+    """
+
+    warm_start = sp.get_setting(problem, "WarmStart")
+
+    if warm_start is None:
+        return
+    elif warm_start == "InitialState":
+        values = warm_start_from_initial_state(problem)
+    else:
+        values = load_warm_start(problem, warm_start)
+
+    set_warm_start(problem, values)
+
+
+def load_warm_start(problem, results_path):
+    """
+    Read the warm start variables from a results directory written by save_results, returning a
+    dictionary of DataFrames indexed by interval, with a column per unit.
+
+    :param problem dict: main problem
+    :param results_path str: results directory
+    """
+
+    if not os.path.isdir(results_path):
+        print("\nWarm start results directory %s does not exist\n" % results_path)
+        raise ValueError("Warm start results directory not found")
+
+    values = dict()
+
+    for name in warm_start_variables:
+        path = os.path.join(results_path, problem["var"][name].filename)
+
+        if os.path.exists(path):
+            values[name] = pd.read_csv(path, index_col=0)
+
+    return values
+
+
+def warm_start_from_initial_state(problem):
+    """
+    Return warm start values holding each unit's initial state commitment flat across the
+    intervals, with no units starting up or shutting down.
+
+    :param problem dict: main problem
+    """
+
+    intervals = problem["sets"]["intervals"].indices
+    units = problem["sets"]["units_commit"].indices
+    num_committed = initial_state_history(problem["data"]).get("num_committed", units)
+
+    def flat(unit_values):
+        return pd.DataFrame(
+            np.tile(unit_values, (len(intervals), 1)), index=intervals, columns=units
+        )
+
+    return {
+        "num_committed": flat(num_committed),
+        "num_starting_up": flat(np.zeros(len(units))),
+        "num_shutting_down": flat(np.zeros(len(units))),
+    }
+
+
+def set_warm_start(problem, values, interval_offset=0):
+    """
+    Set the initial values of the problem's variables from the warm start values, and flag the
+    problem so the solver uses them as a MIP start.  Intervals or units without a value are left
+    for the solver to complete.
+
+    :param problem dict: main problem
+    :param values dict: variable name to DataFrame indexed by interval, with a column per unit,
+        e.g. from load_warm_start or the result_df of each Var
+    :param interval_offset int: the warm start of interval i is taken from interval
+        i + interval_offset of the values, e.g. to shift a previous plan forward
+    """
+
+    num_seeded = 0
+
+    for name, df in values.items():
+        var = problem["var"][name]
+        intervals, units = var.sets[0].indices, var.sets[1].indices
+
+        df = df.copy()
+        df.columns = df.columns.astype(str)
+        seed = df.reindex(
+            index=[i + interval_offset for i in intervals], columns=[str(u) for u in units]
+        ).to_numpy(dtype=float)
+
+        for n, i in enumerate(intervals):
+            for m, u in enumerate(units):
+                if np.isnan(seed[n, m]) or (i, u) not in var.var:
+                    continue
+
+                value = seed[n, m]
+
+                if var.type in ["Binary", "Integer"]:
+                    value = round(value)
+
+                var.var[(i, u)].setInitialValue(value)
+                num_seeded += 1
+
+    problem["warm_start"] = num_seeded > 0
+
+    print("Warm start: %d values seeded for %s" % (num_seeded, ", ".join(values.keys())))
@@ -61,3 +61,31 @@ class TestSubSetInit(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.subSet = \
                 pyuc.Set(self.sub_set_name, self.sub_set_indices, master_set=self.masterSet)
+
+
+class TestSetLookups(unittest.TestCase):
+    def setUp(self):
+        self.set = pyuc.Set("intervals", [10, 20, 30, 40])
+
+    def test_membership(self):
+        self.assertIn(20, self.set)
+        self.assertNotIn(25, self.set)
+
+    def test_ordered_indices_and_positions(self):
+        self.assertEqual(self.set.ordered_indices, (10, 20, 30, 40))
+        self.assertEqual(self.set.position(30), 2)
+        self.assertEqual(len(self.set), 4)
+        self.assertEqual(list(self.set), [10, 20, 30, 40])
+
+    def test_slicing(self):
+        self.assertEqual(self.set[1:], (20, 30, 40))
+        self.assertEqual(self.set[0], 10)
+
+    def test_previous(self):
+        self.assertEqual(self.set.previous(30), 20)
+        self.assertEqual(self.set.previous(30, 2), 10)
+        self.assertIsNone(self.set.previous(10))
+
+    def test_next(self):
+        self.assertEqual(self.set.next(30), 40)
+        self.assertIsNone(self.set.next(40))
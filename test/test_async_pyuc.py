@@ -0,0 +1,87 @@
+import asyncio
+import importlib.util
+import os
+import shutil
+import unittest
+
+import mock
+from pyuc import async_pyuc, solvers
+
+has_highspy = importlib.util.find_spec("highspy") is not None
+
+
+class testAsyncRun(unittest.TestCase):
+    def setUp(self):
+        self.name = "MY_PROB"
+        self.input_path = os.path.join("test", "test_problem")
+        self.output_path = os.path.join("test", "TEMP", "async")
+        self.addCleanup(shutil.rmtree, self.output_path, True)
+
+    @mock.patch("builtins.print")
+    def test_run_reports_phases(self, print_mock):
+        async def main():
+            run = async_pyuc.run_opt_problem_async(self.name, self.input_path, self.output_path)
+            events = [event async for event in run.stream()]
+            problem = await run
+
+            return run, events, problem
+
+        run, events, problem = asyncio.run(main())
+
+        phases = [e["phase"] for e in events if e["event"] == "phase"]
+        self.assertEqual(phases, ["setup", "load_data", "build", "solve", "save_results"])
+        self.assertEqual([e["event"] for e in events if e["event"] != "phase"],
+                         ["solved", "finished"])
+        self.assertEqual(events[-1]["status"], 1)
+        self.assertEqual(problem["problem"].status, 1)
+        self.assertTrue(run.done())
+        self.assertTrue(os.path.exists(
+            os.path.join(self.output_path, self.name, "results", "power_generated_MW.csv")
+        ))
+
+    @mock.patch("builtins.print")
+    def test_cancel(self, print_mock):
+        async def main():
+            run = async_pyuc.run_opt_problem_async(self.name, self.input_path, self.output_path)
+            events = list()
+            run.add_callback(events.append)
+            await asyncio.sleep(0)
+            run.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await run
+
+            return run, events
+
+        run, events = asyncio.run(main())
+
+        self.assertTrue(run.cancelled())
+        self.assertTrue(run.stop_event.is_set())
+        self.assertEqual(events[-1]["event"], "cancelled")
+
+    @mock.patch("builtins.print")
+    def test_failure_is_reported(self, print_mock):
+        async def main():
+            run = async_pyuc.run_opt_problem_async(self.name, "no_such_path", self.output_path)
+            events = [event async for event in run.stream()]
+
+            with self.assertRaises(Exception):
+                await run
+
+            return events
+
+        events = asyncio.run(main())
+        self.assertEqual(events[-1]["event"], "failed")
+        self.assertEqual(events[-1]["phase"], "setup")
+
+
+class testProgressEvents(unittest.TestCase):
+    def test_report_progress(self):
+        events = list()
+        problem = {"name": "MY_PROB", "progress_callback": events.append}
+        solvers.report_progress(problem, "incumbent", objective=5)
+
+        self.assertEqual(events, [{"event": "incumbent", "name": "MY_PROB", "objective": 5}])
+
+    def test_no_progress_callback(self):
+        solvers.report_progress({}, "incumbent", objective=5)
@@ -5,6 +5,7 @@ import pandas as pd
 import pulp as pp
 from pyuc import constraint_adder as ca
 from pyuc import constraints as cnsts
+from pyuc import vectorised_constraints as vcnsts
 
 
 class testConstraintSelector(unittest.TestCase):
@@ -70,7 +71,194 @@ class testBuildAndAddConstraints(unittest.TestCase):
         self.assertEqual(result, expected)
 
     def test_build_constraints(self):
-        problem = {"data": {"constraint_index": self.constraint_index}}
+        problem = {
+            "data": {"constraint_index": self.constraint_index.set_index("ID")},
+            "problem": pp.LpProblem("MY_PROB")
+        }
         result = ca.build_constraints(problem)
-        expected = self.constraint1
+        expected = {"Constraint1": 1}
         self.assertEqual(result, expected)
+
+    def test_build_constraints_adds_to_pulp_problem(self):
+        problem = {
+            "data": {"constraint_index": self.constraint_index.set_index("ID")},
+            "problem": pp.LpProblem("MY_PROB")
+        }
+        ca.build_constraints(problem)
+
+        result = list(problem["problem"].constraints.keys())
+        expected = ["Constraint1"]
+
+        self.assertEqual(result, expected)
+
+    def test_build_constraints_shared_function_built_once(self):
+        constraint_index = self.constraint_index.set_index("ID")
+        constraint_index.loc["Constraint1Again"] = \
+            [True, constraint_index.loc["Constraint1", "Function"]]
+
+        problem = {
+            "data": {"constraint_index": constraint_index},
+            "problem": pp.LpProblem("MY_PROB")
+        }
+        result = ca.build_constraints(problem)
+        expected = {"Constraint1": 1, "Constraint1Again": 0}
+
+        self.assertEqual(result, expected)
+        self.assertEqual(len(problem["problem"].constraints), 1)
+
+
+class testHelperCache(unittest.TestCase):
+    def setUp(self):
+        self.helper_calls = 0
+
+        @cnsts.cached_helper
+        def shared_helper(sets):
+            self.helper_calls += 1
+            return pp.LpVariable("x") + sets["offset"]
+
+        @cnsts.constraint_adder
+        def constraint_func1(sets, data, var):
+            return {"Constraint1": shared_helper(sets) <= 5}
+
+        @cnsts.constraint_adder
+        def constraint_func2(sets, data, var):
+            return {"Constraint2": shared_helper(sets) >= 1}
+
+        self.shared_helper = shared_helper
+        self.problem = {
+            "sets": {"offset": 2},
+            "data": {"constraint_index": pd.DataFrame({
+                "ID": ["Constraint1", "Constraint2"],
+                "ToInclude": [True, True],
+                "Function": [constraint_func1, constraint_func2]
+            }).set_index("ID")},
+            "var": None,
+            "problem": pp.LpProblem("MY_PROB")
+        }
+
+    def test_helper_built_once_per_build(self):
+        ca.build_constraints(self.problem)
+        self.assertEqual(self.helper_calls, 1)
+        self.assertEqual(len(self.problem["problem"].constraints), 2)
+
+    def test_helper_cache_dropped_after_build(self):
+        ca.build_constraints(self.problem)
+        self.assertNotIn("helper_cache", self.problem)
+
+    def test_helper_not_cached_outside_build(self):
+        self.shared_helper(self.problem["sets"])
+        self.shared_helper(self.problem["sets"])
+        self.assertEqual(self.helper_calls, 2)
+
+
+class testCompactConstraintNames(unittest.TestCase):
+    def setUp(self):
+        x, y = pp.LpVariable("x"), pp.LpVariable("y")
+
+        def dict_family(problem):
+            return {"Constraint1": (x + y <= 5), "Constraint2": (x - y <= 1)}
+
+        def block_family(problem):
+            block = vcnsts.ConstraintBlock("block", ("i", "u"), [(0, "A"), (1, "B")],
+                                           pp.LpConstraintLE)
+            block.add_term([x, y], 1)
+            return block
+
+        constraint_index = pd.DataFrame({
+            "ID": ["Dict", "Block"],
+            "ToInclude": [True, True],
+            "Function": [dict_family, block_family]
+        }).set_index("ID")
+
+        self.problem = {
+            "data": {"constraint_index": constraint_index},
+            "problem": pp.LpProblem("MY_PROB"),
+            "settings": {"CompactConstraintNames": True}
+        }
+
+        ca.build_constraints(self.problem)
+
+    def test_constraints_have_compact_names(self):
+        result = list(self.problem["problem"].constraints.keys())
+        expected = ["c0_0", "c0_1", "c1_0", "c1_1"]
+        self.assertEqual(result, expected)
+
+    def test_lookup_dict_family(self):
+        result = ca.lookup_constraint_name(self.problem, "c0_1")
+        self.assertEqual(result, ("Dict", "Constraint2"))
+
+    def test_lookup_block_family(self):
+        result = ca.lookup_constraint_name(self.problem, "c1_1")
+        self.assertEqual(result, ("Block", (1, "B")))
+
+    def test_constraint_name_table(self):
+        result = ca.constraint_name_table(self.problem)
+
+        self.assertEqual(list(result.index), ["c0_0", "c0_1", "c1_0", "c1_1"])
+        self.assertEqual(result.loc["c1_0", "Family"], "Block")
+        self.assertEqual(result.loc["c1_0", "Key"], (0, "A"))
+
+    def test_verbose_names_by_default(self):
+        self.problem["settings"] = {}
+        self.problem["problem"] = pp.LpProblem("MY_PROB")
+        ca.build_constraints(self.problem)
+
+        result = list(self.problem["problem"].constraints.keys())
+        expected = ["Constraint1", "Constraint2", "block(i=0,_u=A)", "block(i=1,_u=B)"]
+        self.assertEqual(result, expected)
+
+
+class testSingleVariableBounds(unittest.TestCase):
+    def setUp(self):
+        self.x = {i: pp.LpVariable("x_%d" % i, lowBound=0, upBound=4) for i in range(2)}
+        self.y = pp.LpVariable("y")
+
+        def block_family(problem):
+            block = vcnsts.ConstraintBlock("block", ("i",), [(0,), (1,)], pp.LpConstraintLE)
+            block.add_term([self.x[0], self.x[1]], [2, 1])
+            block.add_rhs([6, 5])
+            return block
+
+        def dict_family(problem):
+            return {"Constraint1": (self.y >= -2), "Constraint2": (self.x[0] + self.y <= 1)}
+
+        constraint_index = pd.DataFrame({
+            "ID": ["Power<=Capacity", "Other"],
+            "ToInclude": [True, True],
+            "Function": [block_family, dict_family]
+        }).set_index("ID")
+
+        self.problem = {
+            "data": {"constraint_index": constraint_index},
+            "problem": pp.LpProblem("MY_PROB"),
+            "settings": {"SingleVariableBounds": True}
+        }
+
+    def test_block_family_set_as_bounds(self):
+        family_sizes = ca.build_constraints(self.problem)
+
+        self.assertEqual(family_sizes, {"Power<=Capacity": 0, "Other": 2})
+        self.assertEqual(self.problem["column_bounds"], {"Power<=Capacity": 2})
+        self.assertEqual(self.x[0].upBound, 3)
+        self.assertEqual(self.x[1].upBound, 4)
+        self.assertEqual(list(self.problem["problem"].constraints.keys()),
+                         ["Constraint1", "Constraint2"])
+
+    def test_dict_family_set_as_bounds(self):
+        result = ca.add_constraints_as_bounds({"Constraint1": (self.y >= -2)})
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.y.lowBound, -2)
+        self.assertIsNone(self.y.upBound)
+
+    def test_family_with_several_variables_rejected(self):
+        with mock.patch("builtins.print"):
+            with self.assertRaises(ValueError):
+                ca.add_constraints_as_bounds({"Constraint2": (self.x[0] + self.y <= 1)})
+
+    def test_rows_by_default(self):
+        self.problem["settings"] = {}
+        family_sizes = ca.build_constraints(self.problem)
+
+        self.assertEqual(family_sizes["Power<=Capacity"], 2)
+        self.assertEqual(self.x[0].upBound, 4)
@@ -5,6 +5,7 @@ import pandas as pd
 import pulp as pp
 from pyuc import constraints as ca
 from pyuc import load_data, pyuc
+from pyuc import vectorised_constraints as vcnsts
 
 
 class BasicConstraintEquations(unittest.TestCase):
@@ -281,6 +282,10 @@ class MinUpAndDownTimes(unittest.TestCase):
         self.problem["var"]["num_shutting_down"].var[(2, "U1")].setInitialValue(3)
         self.problem["var"]["num_shutting_down"].var[(3, "U1")].setInitialValue(2)
 
+        for name in ["cumulative_starting_up", "cumulative_shutting_down"]:
+            for i, cumulative in enumerate([1, 3, 6, 8]):
+                self.problem["var"][name].var[(i, "U1")].setInitialValue(cumulative)
+
     def test_minimum_up_time(self):
         constraints = ca.cnt_minimum_up_time(self.problem)
 
@@ -415,6 +420,104 @@ class RampRatesConstraints(unittest.TestCase):
         self.assertEqual(constraints["ramp_rate_down_(i=1, u=U1)"].value(), 0)
 
 
+class TightFormulationConstraints(unittest.TestCase):
+    def setUp(self):
+        unit_data = pd.DataFrame(data={
+            "Unit": ["U1", "U2"],
+            "NumUnits": [10, 10],
+            "CapacityMW": [100, 100],
+            "RampRate_pctCapphr": [0.2, 0.2],
+            "MinimumGenerationFrac": [0.6, 0.6],
+            "MinimumUpTimeHrs": [3, 1],
+        }).set_index("Unit")
+
+        units = pyuc.Set("units", list(unit_data.index))
+        units_commit = pyuc.Set("units_commit", list(unit_data.index), master_set=units)
+        units_variable = pyuc.Set("units_variable", [], master_set=units)
+        units_storage = pyuc.Set("units_storage", [], master_set=units)
+        units_reserve = pyuc.Set("units_reserve", [], master_set=units)
+        intervals = pyuc.Set("intervals", list(range(4)))
+        reserves = pyuc.Set("reserves", [])
+
+        sets = {
+            "units": units,
+            "units_commit": units_commit,
+            "units_variable": units_variable,
+            "units_reserve": units_reserve,
+            "units_storage": units_storage,
+            "intervals": intervals,
+            "reserves": reserves
+        }
+
+        self.problem = {
+            "data": {"units": unit_data, "initial_state": None},
+            "problem": pp.LpProblem(name="MY_PROB", sense=pp.LpMinimize),
+            "sets": sets,
+            "paths": None
+        }
+        self.problem["var"] = pyuc.create_variables(self.problem["sets"])
+
+    def set_values(self, u, **values):
+        for name, interval_values in values.items():
+            for i, value in interval_values.items():
+                self.problem["var"][name].var[(i, u)].setInitialValue(value)
+
+    def test_power_lt_start_up_shut_down_capacity(self):
+        self.set_values(
+            "U1",
+            num_committed={1: 3},
+            num_starting_up={1: 1},
+            num_shutting_down={2: 1},
+            power_generated={1: 220}
+        )
+
+        constraints = ca.cnt_power_lt_start_up_shut_down_capacity(self.problem)
+        label = "power_lt_start_up_shut_down_capacity_(i=1, u=U1)"
+        self.assertEqual(constraints[label].value(), 0)
+
+    def test_power_lt_start_up_shut_down_capacity_short_up_time(self):
+        self.set_values(
+            "U2",
+            num_committed={1: 3},
+            num_starting_up={1: 1},
+            num_shutting_down={2: 1},
+            power_generated={1: 260}
+        )
+
+        constraints = ca.cnt_power_lt_start_up_shut_down_capacity(self.problem)
+        label = "power_lt_start_up_shut_down_capacity_(i=1, u=U2)"
+        self.assertEqual(constraints[label].value(), 0)
+
+    def test_power_lt_shut_down_capacity_short_up_time_only(self):
+        constraints = ca.cnt_power_lt_shut_down_capacity(self.problem)
+        expected = [f"power_lt_shut_down_capacity_(i={i}, u=U2)" for i in range(3)]
+        self.assertEqual(list(constraints.keys()), expected)
+
+    def test_tight_ramp_rate_up_shutting_down_next(self):
+        self.set_values(
+            "U1",
+            num_committed={1: 2},
+            num_starting_up={1: 0},
+            num_shutting_down={1: 0, 2: 1},
+            power_generated={0: 140, 1: 160}
+        )
+
+        constraints = ca.cnt_tight_ramp_rate_up(self.problem)
+        self.assertEqual(constraints["tight_ramp_rate_up_(i=1, u=U1)"].value(), 0)
+
+    def test_tight_ramp_rate_down_started_up_previously(self):
+        self.set_values(
+            "U1",
+            num_committed={1: 2},
+            num_starting_up={0: 1, 1: 0},
+            num_shutting_down={1: 0},
+            power_generated={0: 160, 1: 140}
+        )
+
+        constraints = ca.cnt_tight_ramp_rate_down(self.problem)
+        self.assertEqual(constraints["tight_ramp_rate_down_(i=1, u=U1)"].value(), 0)
+
+
 class VariableResourceConstraints(unittest.TestCase):
     def setUp(self):
         unit_data = pd.DataFrame(
@@ -915,6 +1018,9 @@ class OtherFunctions(unittest.TestCase):
         var["num_starting_up"].var[(3, "U1")].setInitialValue(1)
         var["num_starting_up"].var[(4, "U1")].setInitialValue(0)
 
+        for i, cumulative in enumerate([0, 1, 3, 4, 4]):
+            var["cumulative_starting_up"].var[(i, "U1")].setInitialValue(cumulative)
+
         num_start_ups_within_up_time = \
             ca.num_start_ups_within_up_time_calculator(sets, data, var)
 
@@ -941,6 +1047,9 @@ class OtherFunctions(unittest.TestCase):
         var["num_shutting_down"].var[(3, "U1")].setInitialValue(1)
         var["num_shutting_down"].var[(4, "U1")].setInitialValue(0)
 
+        for i, cumulative in enumerate([0, 1, 3, 4, 4]):
+            var["cumulative_shutting_down"].var[(i, "U1")].setInitialValue(cumulative)
+
         num_shut_downs_within_down_time = \
             ca.num_shut_downs_within_down_time_calculator(sets, data, var)
 
@@ -957,6 +1066,37 @@ class OtherFunctions(unittest.TestCase):
 
         self.assertEqual(result_keys, expected_keys)
 
+    def test_window_counts(self):
+        cumulative = self.problem["var"]["cumulative_starting_up"]
+        initial_counts = np.array([[5, 1], [0, 0], [0, 0], [0, 0]])
+        counts = ca.window_counts(cumulative, [0, 1, 2, 3], ["U1", "U2"], [3, 0], initial_counts)
+
+        self.assertEqual(dict(counts[(0, "U1")]), {cumulative.var[(0, "U1")]: 1})
+        self.assertEqual(counts[(0, "U1")].constant, 5)
+        self.assertEqual(
+            dict(counts[(3, "U1")]), {cumulative.var[(3, "U1")]: 1, cumulative.var[(0, "U1")]: -1}
+        )
+        self.assertEqual(dict(counts[(3, "U2")]), {})
+        self.assertEqual(counts[(0, "U2")].constant, 1)
+
+    def test_minimum_up_and_down_time_terms_do_not_grow_with_window(self):
+        unit_data = self.problem["data"]["units"]
+        unit_data["NumUnits"] = [2, 2, 1]
+
+        for window in [1, 3, 12]:
+            unit_data["MinimumUpTimeHrs"] = [window, window, 0]
+            unit_data["MinimumDownTimeHrs"] = [window, window, 0]
+            self.problem["data"].pop("unit_parameters", None)
+
+            for module in [ca, vcnsts]:
+                for function in ["cnt_minimum_up_time", "cnt_minimum_down_time"]:
+                    with self.subTest(window=window, module=module.__name__, function=function):
+                        constraints = getattr(module, function)(self.problem)
+                        num_terms = [len(c) for c in constraints.values()]
+
+                        self.assertEqual(len(num_terms), 48)
+                        self.assertLessEqual(max(num_terms), 3)
+
     def test_ramp_calculator_all_intervals_and_units(self):
         sets, data, var = \
             self.problem["sets"], self.problem["data"], self.problem["var"]
@@ -32,6 +32,8 @@ class makeVariables(unittest.TestCase):
             "num_committed",
             "num_shutting_down",
             "num_starting_up",
+            "cumulative_starting_up",
+            "cumulative_shutting_down",
             "unserved_power",
             "unserved_reserve",
             "stored_energy",
@@ -62,7 +64,13 @@ class makeVariables(unittest.TestCase):
         self.assertEqual(sorted(result), sorted(expected))
 
     def test_indices_intervals_x_units_commit(self):
-        relevant_variables = ["num_committed", "num_shutting_down", "num_starting_up"]
+        relevant_variables = [
+            "num_committed",
+            "num_shutting_down",
+            "num_starting_up",
+            "cumulative_starting_up",
+            "cumulative_shutting_down",
+        ]
 
         expected = [
             (0, "U1"), (1, "U1"), (2, "U1"),
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from pyuc import initial_state as ist
+
+
+class testInitialStateHistory(unittest.TestCase):
+    def setUp(self):
+        self.initial_state = pd.DataFrame(
+            np.array([[2, 1, 4, 1], [0, 3, 0, 2]]),
+            columns=pd.MultiIndex.from_tuples([
+                ("num_starting_up", -3),
+                ("num_starting_up", -1),
+                ("num_shutting_down", -2),
+                ("num_committed", -1),
+            ]),
+            index=["U1", "U2"]
+        )
+
+        self.history = ist.InitialStateHistory(self.initial_state)
+
+    def test_history_arrays(self):
+        np.testing.assert_array_equal(
+            self.history.history["num_starting_up"], [[1, 0, 2], [3, 0, 0]]
+        )
+        np.testing.assert_array_equal(
+            self.history.cumulative["num_starting_up"], [[0, 1, 1, 3], [0, 3, 3, 3]]
+        )
+
+    def test_get(self):
+        np.testing.assert_array_equal(
+            self.history.get("num_committed", ["U2", "U1", "U3"]), [2, 1, 0]
+        )
+        np.testing.assert_array_equal(self.history.get("num_starting_up", ["U1"], -3), [2])
+        np.testing.assert_array_equal(self.history.get("num_starting_up", ["U1"], -4), [0])
+        np.testing.assert_array_equal(self.history.get("stored_energy", ["U1"]), [0])
+
+    def test_value(self):
+        self.assertEqual(self.history.value("num_shutting_down", "U1", -2), 4)
+
+    def test_window_sum(self):
+        result = self.history.window_sum("num_starting_up", ["U1", "U2"], [-1, -2])
+        np.testing.assert_array_equal(result, [1, 3])
+
+    def test_window_sum_by_interval(self):
+        interval_low = np.array([[-2, -5], [0, 1]])
+        result = self.history.window_sum("num_starting_up", ["U1", "U2"], interval_low)
+        np.testing.assert_array_equal(result, [[1, 3], [0, 0]])
+
+    def test_no_initial_state(self):
+        history = ist.InitialStateHistory(None)
+
+        np.testing.assert_array_equal(history.get("num_committed", ["U1"]), [0])
+        np.testing.assert_array_equal(history.window_sum("num_starting_up", ["U1"], [-3]), [0])
+
+
+class testInitialStateHistoryFromData(unittest.TestCase):
+    def test_history_is_rebuilt_when_initial_state_changes(self):
+        data = {"initial_state": None}
+        result = ist.initial_state_history(data)
+
+        self.assertIs(ist.initial_state_history(data), result)
+
+        data["initial_state"] = pd.DataFrame(
+            [[5]], columns=pd.MultiIndex.from_tuples([("num_committed", -1)]), index=["U1"]
+        )
+
+        self.assertEqual(ist.initial_state_history(data).value("num_committed", "U1"), 5)
@@ -147,6 +147,12 @@ class LoadSubSets(unittest.TestCase):
         expected = ["lower"]
         self.assertEqual(result, expected)
 
+    def test_units_reserve_x_reserves_combination_set(self):
+        sets = ld.create_combination_sets(self.sets)
+        result = sets["units_reserve_x_reserves"].indices
+        expected = [(u, r) for u in ["Co", "CC", "OC", "Nu", "St"] for r in ["raise", "lower"]]
+        self.assertEqual(result, expected)
+
 
 class LoadDataItems(unittest.TestCase):
     def setUp(self):
@@ -316,8 +322,10 @@ class LoadData(unittest.TestCase):
         expected = {
             "demand": self.demand_df,
             "units": self.unit_data_df,
+            "unit_parameters": None,
             "variable_traces": self.variable_data_df,
             "initial_state": self.variable_data_df,
+            "initial_state_history": None,
             "ValueOfLostLoad$/MWh": 10,
             "IntervalDurationHrs": 0.5
         }
@@ -326,3 +334,5 @@ class LoadData(unittest.TestCase):
         pd.testing.assert_frame_equal(result["demand"], expected["demand"])
         pd.testing.assert_frame_equal(result["units"], expected["units"])
         pd.testing.assert_frame_equal(result["variable_traces"], expected["variable_traces"])
+        self.assertEqual(result["unit_parameters"].units, ["U1", "U2"])
+        self.assertIs(result["initial_state_history"].initial_state, result["initial_state"])
@@ -0,0 +1,134 @@
+import os
+import shutil
+import unittest
+
+import mock
+import numpy as np
+import pulp as pp
+from pyuc import constraint_adder as ca
+from pyuc import pyuc
+from pyuc import matrix_model as mm
+from pyuc import vectorised_constraints as vcnsts
+from test import two_unit_problem as tup
+
+
+class testMatrixModel(unittest.TestCase):
+    def setUp(self):
+        intervals = pyuc.Set("intervals", [0, 1])
+        self.var = {
+            "x": pyuc.Var("x", "MW", [intervals], "Continuous"),
+            "n": pyuc.Var("n", "#Units", [intervals], "Integer"),
+        }
+        self.x, self.n = self.var["x"].var, self.var["n"].var
+        self.model = mm.MatrixModel(self.var)
+
+        self.block = vcnsts.ConstraintBlock("block", ("i",), [(0,), (1,)], pp.LpConstraintLE)
+        self.block.add_term([self.x[0], self.x[1]], 1)
+        self.block.add_term([self.n[0], None], np.array([-50, -50]))
+        self.block.add_expressions([{self.x[1]: 2}, {}])
+        self.block.add_rhs([5, 6])
+
+        self.conditions = {"c1": self.x[0] + self.x[0] + 3 * self.n[1] >= 4}
+
+    def test_columns(self):
+        self.assertEqual(self.model.variables, [self.x[0], self.x[1], self.n[0], self.n[1]])
+        np.testing.assert_array_equal(self.model.column_integer, [False, False, True, True])
+        np.testing.assert_array_equal(self.model.column_lower, [0, 0, 0, 0])
+
+    def test_add_block(self):
+        self.model.add_constraints(self.block, "Block")
+        rows, columns, values = self.model.coo()
+
+        self.assertEqual(list(zip(rows, columns, values)),
+                         [(0, 0, 1), (0, 1, 2), (0, 2, -50), (1, 1, 1)])
+        np.testing.assert_array_equal(self.model.rhs(), [5, 6])
+        np.testing.assert_array_equal(self.model.senses(), [pp.LpConstraintLE] * 2)
+
+    def test_add_conditions(self):
+        self.model.add_constraints(self.block, "Block")
+        self.model.add_constraints(self.conditions, "Conditions")
+        rows, columns, values = self.model.coo()
+
+        self.assertEqual(list(zip(rows[4:], columns[4:], values[4:])), [(2, 0, 2), (2, 3, 3)])
+        np.testing.assert_array_equal(self.model.rhs(), [5, 6, 4])
+        self.assertEqual(self.model.families, {"Block": (0, 2), "Conditions": (2, 3)})
+
+    def test_csr(self):
+        self.model.add_constraints(self.block, "Block")
+        indptr, columns, values = self.model.csr()
+
+        np.testing.assert_array_equal(indptr, [0, 3, 4])
+        np.testing.assert_array_equal(columns, [0, 1, 2, 1])
+
+    def test_drop_rows(self):
+        self.model.add_constraints(self.block, "Block")
+        self.model.add_constraints(self.conditions, "Conditions")
+        self.model.drop_rows(np.array([False, True, False]))
+        rows, columns, values = self.model.coo()
+
+        self.assertEqual(list(zip(rows, columns, values)),
+                         [(0, 0, 1), (0, 1, 2), (0, 2, -50), (1, 0, 2), (1, 3, 3)])
+        np.testing.assert_array_equal(self.model.rhs(), [5, 4])
+        self.assertEqual(self.model.families, {"Block": (0, 1), "Conditions": (1, 2)})
+        self.assertEqual(self.model.num_rows, 2)
+
+    def test_write_mps(self):
+        self.model.add_constraints(self.conditions, "Conditions")
+        self.model.set_objective(2 * self.x[1] + self.n[0])
+
+        tmp_dir = os.path.join("test", "TEMP", "matrix_model")
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, "model.mps")
+        self.model.write_mps(path)
+
+        with open(path) as f:
+            result = f.read().splitlines()
+
+        expected = [
+            "NAME pyuc FREE",
+            "ROWS", " N OBJ", " G R0",
+            "COLUMNS",
+            " C0 R0 2", " C1 OBJ 2",
+            " MARKER 'MARKER' 'INTORG'", " C2 OBJ 1", " C3 R0 3", " MARKER 'MARKER' 'INTEND'",
+            "RHS", " RHS R0 4",
+            "BOUNDS", " LO BND C2 0", " LO BND C3 0",
+            "ENDATA"
+        ]
+
+        self.assertEqual(result, expected)
+
+
+class testMatrixBackend(unittest.TestCase):
+    def setUp(self):
+        self.data = tup.make_data([100, 250, 180], num_units=(2, 2))
+
+    def make_problem(self, model_backend):
+        return tup.make_problem(self.data, {"ModelBackend": model_backend}, build=False)
+
+    def solve(self, model_backend):
+        return tup.solve(tup.make_problem(self.data, {"ModelBackend": model_backend}))
+
+    def test_matrix_backend_constraints_bypass_pulp(self):
+        problem = self.make_problem("Matrix")
+        family_sizes = ca.build_constraints(problem)
+
+        self.assertEqual(len(problem["problem"].constraints), 0)
+        self.assertEqual(problem["matrix_model"].num_rows, sum(family_sizes.values()))
+
+    def test_matrix_backend_matches_pulp(self):
+        pulp_problem = self.solve("Pulp")
+        matrix_problem = self.solve("Matrix")
+
+        self.assertEqual(matrix_problem["problem"].status, 1)
+        self.assertAlmostEqual(
+            matrix_problem["problem"].objective.value(), pulp_problem["problem"].objective.value()
+        )
+
+        num_committed = matrix_problem["var"]["num_committed"]
+        self.assertTrue(all(v.value() is not None for v in num_committed.var.values()))
+
+    @mock.patch("builtins.print")
+    def test_unknown_model_backend(self, print_mock):
+        with self.assertRaises(ValueError):
+            ca.build_constraints(self.make_problem("Unknown"))
@@ -1,5 +1,6 @@
 import unittest
 
+import mock
 import pandas as pd
 import pulp as pp
 from pyuc import objective_function as of
@@ -82,21 +83,15 @@ class testObjectiveFunctionTerms(unittest.TestCase):
         result = of.fuel_cost_term(self.problem)
         self.assertEqual(result.value(), self.expected_fuel_cost*0.5)
 
+    @mock.patch("builtins.print")
+    def test_fuel_cost_term_zero_efficiency(self, print_mock):
+        unit_data = self.problem["data"]["units"]
+        self.problem["data"]["units"] = unit_data.assign(ThermalEfficiencyFrac=[1, 0])
+
+        with self.assertRaises(ValueError):
+            of.fuel_cost_term(self.problem)
+
     def test_unserved_energy_cost_term_interval_duration(self):
         self.problem["data"]["IntervalDurationHrs"] = 0.5
         result = of.unserved_energy_cost_term(self.problem)
         self.assertEqual(result.value(), self.expected_unserved_cost*0.5)
-
-
-class testObjectiveFunctionUtils(unittest.TestCase):
-    def test_heat_rate_calculator(self):
-        unit_data = pd.DataFrame(data={
-            "Unit": ["U1", "U2"],
-            "FuelCost$/GJ": [10, 20],
-            "ThermalEfficiencyFrac": [0.5, 0.25]
-        }).set_index("Unit")
-
-        result = of.fuel_cost_per_mwh_calculator(unit_data, "U1")
-        expected = 3.6*10/0.5
-
-        self.assertEqual(result, expected)
@@ -0,0 +1,140 @@
+import os
+import shutil
+import unittest
+
+import mock
+import numpy as np
+import pulp as pp
+from pyuc import portfolio as pf
+from test import two_unit_problem as tup
+
+
+class testSolvePortfolio(unittest.TestCase):
+    def setUp(self):
+        self.data = tup.make_data([100, 250, 180, 90])
+
+    def solve(self, solve_mode, configurations=None):
+        return tup.solve(tup.make_problem(
+            self.data, {"SolveMode": solve_mode}, portfolio_configurations=configurations
+        ))
+
+    def test_winner_solution_is_passed_back(self):
+        expected = self.solve("MIP")["problem"].objective.value()
+        problem = self.solve("Portfolio", [
+            {"Name": "CBC", "Solver": "CBC"},
+            {"Name": "CBCMatrix", "Solver": "CBC", "ModelBackend": "Matrix"},
+        ])
+        results = problem["portfolio"]["results"]
+
+        self.assertEqual(problem["problem"].status, 1)
+        self.assertAlmostEqual(problem["problem"].objective.value(), expected)
+        self.assertIn(problem["portfolio"]["winner"], ["CBC", "CBCMatrix"])
+        self.assertEqual(results.loc[problem["portfolio"]["winner"], "Result"], "Won")
+
+    def test_stopped_on_time_does_not_reach_target(self):
+        def solve_stopped_on_time(problem):
+            # pulp gives a CBC solve stopped on time with a solution the Optimal status
+            problem["problem"].assignStatus(pp.LpStatusOptimal, pp.LpSolutionIntegerFeasible)
+            return problem["problem"]
+
+        with mock.patch.dict(pf.portfolio_solve_modes, StoppedOnTime=solve_stopped_on_time):
+            problem = self.solve("Portfolio", [
+                {"Name": "StoppedOnTime", "SolveMode": "StoppedOnTime"},
+                {"Name": "CBC", "Solver": "CBC"},
+            ])
+
+        results = problem["portfolio"]["results"]
+
+        self.assertEqual(problem["portfolio"]["winner"], "CBC")
+        self.assertEqual(problem["problem"].sol_status, pp.LpSolutionOptimal)
+        self.assertNotEqual(results.loc["StoppedOnTime", "Result"], "Won")
+
+    def test_failed_configuration_is_reported(self):
+        problem = self.solve("Portfolio", [
+            {"Name": "Unknown", "Solver": "Unknown"},
+            {"Name": "RelaxAndRepair", "SolveMode": "RelaxAndRepair"},
+        ])
+        results = problem["portfolio"]["results"]
+
+        self.assertEqual(problem["portfolio"]["winner"], "RelaxAndRepair")
+        self.assertEqual(results.loc["Unknown", "Result"], "Failed")
+        self.assertIn("ValueError", results.loc["Unknown", "Error"])
+        self.assertIn("gap", problem["relax_and_repair"])
+
+
+class testPortfolioConfigurations(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join("test", "TEMP", "portfolio")
+        os.makedirs(self.path, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_load_portfolio(self):
+        portfolio_path = os.path.join(self.path, "portfolio.csv")
+
+        with open(portfolio_path, "w") as f:
+            f.write("Name,Solver,SolverRandomSeed,SolverRelativeGap,SolverPresolve\n")
+            f.write("Seeded,CBC,3,,\n")
+            f.write("HiGHS,HiGHS,,0.01,FALSE\n")
+
+        result = pf.portfolio_configurations({"paths": {"portfolio": portfolio_path}})
+        expected = [
+            {"Name": "Seeded", "Solver": "CBC", "SolverRandomSeed": 3},
+            {"Name": "HiGHS", "Solver": "HiGHS", "SolverRelativeGap": 0.01,
+             "SolverPresolve": False},
+        ]
+
+        self.assertEqual(result, expected)
+
+    def test_default_portfolio(self):
+        result = pf.portfolio_configurations({"paths": None})
+        self.assertEqual(result, pf.default_portfolio)
+
+    @mock.patch("builtins.print")
+    def test_invalid_configurations(self, print_mock):
+        for problem, configuration in [
+            ({}, {"Name": "A", "NotASetting": 1}),
+            ({}, {"Name": "A", "SolveMode": "Portfolio"}),
+            ({}, {"Name": "A", "SolverThreads": 0}),
+            ({"settings": {"ModelBackend": "Matrix"}}, {"Name": "A", "ModelBackend": "Pulp"}),
+        ]:
+            with self.subTest(configuration=configuration):
+                with self.assertRaises(ValueError):
+                    pf.validate_configuration(problem, configuration)
+
+
+class testChooseWinner(unittest.TestCase):
+    def outcome(self, status, objective, reached_target=False):
+        return {"status": status, "objective": objective, "values": np.zeros(2),
+                "reached_target": reached_target}
+
+    def test_first_to_reach_target(self):
+        outcomes = {"A": self.outcome(0, 90), "B": self.outcome(1, 100, True)}
+        self.assertEqual(pf.choose_winner(outcomes), "B")
+
+    def test_best_solution_without_target(self):
+        outcomes = {"A": self.outcome(0, 110), "B": self.outcome(1, 100), "C": {"error": "E"}}
+        self.assertEqual(pf.choose_winner(outcomes), "B")
+
+    def test_no_solution(self):
+        outcomes = {"A": {"error": "E"}, "B": self.outcome(-1, 0)}
+        self.assertIsNone(pf.choose_winner(outcomes))
+
+
+class testReachedTarget(unittest.TestCase):
+    def test_reached_target(self):
+        problem = {
+            "settings": {"SolverRelativeGap": 0.01}, "relax_and_repair": {"gap": 0.005}
+        }
+
+        for solve_mode, status, sol_status, expected in [
+            ("MIP", 1, pp.LpSolutionOptimal, True),
+            ("MIP", 1, pp.LpSolutionIntegerFeasible, False),
+            ("MIP", 0, pp.LpSolutionIntegerFeasible, False),
+            ("RelaxAndRepair", 1, pp.LpSolutionIntegerFeasible, True),
+        ]:
+            with self.subTest(solve_mode=solve_mode, status=status, sol_status=sol_status):
+                self.assertEqual(
+                    pf.reached_target(problem, solve_mode, status, sol_status), expected
+                )
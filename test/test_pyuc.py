@@ -285,7 +285,7 @@ class testVarDfFnChooser(unittest.TestCase):
         self.sets = [pyuc.Set("intervals", list(range(3)))]
         self.var = pyuc.Var(self.name, self.units, self.sets)
         self.var.to_df_fn_chooser()
-        one_dim_mock.assert_called_once_with()
+        one_dim_mock.assert_called_once_with(None)
 
     @mock.patch("pyuc.pyuc.Var.result_df_clean_up")
     @mock.patch("pyuc.pyuc.Var.two_dim_to_df")
@@ -293,7 +293,7 @@ class testVarDfFnChooser(unittest.TestCase):
         self.sets = 2 * [pyuc.Set("intervals", list(range(3)))]
         self.var = pyuc.Var(self.name, self.units, self.sets)
         self.var.to_df_fn_chooser()
-        two_dim_mock.assert_called_once_with()
+        two_dim_mock.assert_called_once_with(None)
 
     @mock.patch("pyuc.pyuc.Var.result_df_clean_up")
     @mock.patch("pyuc.pyuc.Var.three_dim_to_df")
@@ -301,7 +301,7 @@ class testVarDfFnChooser(unittest.TestCase):
         self.sets = 3 * [pyuc.Set("intervals", list(range(3)))]
         self.var = pyuc.Var(self.name, self.units, self.sets)
         self.var.to_df_fn_chooser()
-        three_dim_mock.assert_called_once_with()
+        three_dim_mock.assert_called_once_with(None)
 
     @mock.patch("pyuc.pyuc.Var.result_df_clean_up")
     @mock.patch("pyuc.pyuc.Var.four_dim_to_df")
@@ -309,7 +309,7 @@ class testVarDfFnChooser(unittest.TestCase):
         self.sets = 4 * [pyuc.Set("intervals", list(range(3)))]
         self.var = pyuc.Var(self.name, self.units, self.sets)
         self.var.to_df_fn_chooser()
-        four_dim_mock.assert_called_once_with()
+        four_dim_mock.assert_called_once_with(None)
 
 
 class testDimToDf(unittest.TestCase):
@@ -412,6 +412,59 @@ class testDimToDf(unittest.TestCase):
 
         pd.testing.assert_frame_equal(result, expected, check_dtype=False)
 
+    def test_main_intervals_are_kept(self):
+        intervals = pyuc.Set("intervals", self.indices1)
+
+        for sets, main_intervals, expected in [
+            ([intervals], [3, 4], [3, 4]),
+            ([intervals, self.sets[1]], [3, 4], [3, 4]),
+            ([intervals, self.sets[1], self.sets[2]], [3], [(3, j) for j in self.indices2]),
+            (self.sets[0:2], [3, 4], list(self.indices1)),
+        ]:
+            with self.subTest(num_sets=len(sets), first_set=sets[0].name):
+                var = pyuc.Var("var1", "MY_UNITS", sets)
+
+                for v in var.var.values():
+                    v.setInitialValue(1)
+
+                var.to_df_fn_chooser(main_intervals)
+                self.assertEqual(var.result_df.index.to_list(), expected)
+
+
+class testVarDomain(unittest.TestCase):
+    def setUp(self):
+        self.sets = [
+            pyuc.Set("intervals", [0, 1]),
+            pyuc.Set("units", ["U1", "U2"]),
+            pyuc.Set("reserves", ["raise", "lower"]),
+        ]
+        self.domain = pyuc.Set("domain", [("U1", "raise"), ("U2", "raise"), ("U2", "lower")])
+        self.var = pyuc.Var("var1", "MY_UNITS", self.sets, domain=self.domain)
+
+    def test_indices_cover_domain_only(self):
+        expected = [(i, u, r) for i in [0, 1] for (u, r) in self.domain.indices]
+        self.assertEqual(self.var.sets_indices, expected)
+        self.assertEqual(list(self.var.var.keys()), expected)
+
+    def test_dense_indices_are_product(self):
+        var = pyuc.Var("var2", "MY_UNITS", self.sets)
+        self.assertEqual(len(var.sets_indices), 8)
+        self.assertEqual(var.sets_indices[:2], [(0, "U1", "raise"), (0, "U1", "lower")])
+
+    @mock.patch("builtins.print")
+    def test_invalid_domain(self, print_mock):
+        with self.assertRaises(ValueError):
+            pyuc.Var("var3", "MY_UNITS", self.sets, domain=[("U3", "raise")])
+
+    def test_value_outside_domain_is_zero(self):
+        for n, ind in enumerate(self.var.sets_indices):
+            self.var.var[ind].setInitialValue(n + 1)
+
+        self.var.three_dim_to_df()
+
+        self.assertEqual(self.var.result_df.loc[(1, "U1"), "lower"], 0)
+        self.assertEqual(self.var.result_df.loc[(1, "U2"), "lower"], 6)
+
 
 class testSolve(unittest.TestCase):
     def setUp(self):
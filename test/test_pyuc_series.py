@@ -1,18 +1,330 @@
 import os
+import shutil
 import unittest
 
 import mock
+import numpy as np
 import pandas as pd
 import pulp as pp
+from pyuc import constraint_adder as ca
 from pyuc import pyuc
 from pyuc import pyuc_series as pyucs
+from pyuc import vectorised_constraints as vcnsts
+from pyuc.initial_state import InitialStateHistory
+from test import two_unit_problem as tup
 
 
-class testLoadDataAndPaths(unittest.TestCase):
-    @mock.patch("pyuc.load_data.load_variable_data", return_value="abc")
-    @mock.patch("pyuc.load_data.load_demand_data", return_value="xyz")
-    def test_read_traces_series(self, demand_trace_mock, variable_trace_mock):
-        dummy_paths = {"demand": "dummy", "variable_traces": "dummy"}
-        result = pyucs.read_traces_series(dummy_paths)
-        expected = {"demand": "xyz", "variable_traces": "abc"}
-        self.assertEqual(result, expected)
+class testRunSeriesProblem(unittest.TestCase):
+    def setUp(self):
+        self.name = "SERIES"
+        self.input_path = os.path.join("test", "TEMP", "series_in")
+        self.output_path = os.path.join("test", "TEMP", "series_out")
+        self.addCleanup(shutil.rmtree, self.input_path, True)
+        self.addCleanup(shutil.rmtree, self.output_path, True)
+        shutil.copytree(os.path.join("test", "test_problem"), self.input_path,
+                        ignore=shutil.ignore_patterns("MY_PROB"))
+
+        day = list(range(20, 260, 20)) + list(range(240, 0, -20))
+        pd.DataFrame(data={"Interval": range(72), "Demand": day * 3}).to_csv(
+            os.path.join(self.input_path, "demand.csv"), index=False
+        )
+
+    @mock.patch("builtins.print")
+    def test_days_are_solved_and_joined(self, print_mock):
+        series = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+        results_path = os.path.join(self.output_path, self.name, "results")
+        power = pd.read_csv(os.path.join(results_path, "power_generated_MW.csv"), index_col=0)
+
+        self.assertEqual(series["summary"].index.to_list(), [0, 1, 2])
+        self.assertEqual(series["summary"]["Status"].to_list(), [1, 1, 1])
+        self.assertEqual(series["summary"]["FirstInterval"].to_list(), [0, 24, 48])
+        self.assertEqual(power.index.to_list(), list(range(72)))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.output_path, self.name, "series_summary.csv")
+        ))
+        self.assertEqual((series["model"].num_builds, series["model"].num_updates), (1, 2))
+
+    def write_settings(self, settings):
+        shutil.copy(os.path.join("test", "test_problem", "settings.csv"), self.input_path)
+
+        with open(os.path.join(self.input_path, "settings.csv"), "a") as f:
+            for name, (value, setting_type) in settings.items():
+                f.write("%s,%s,%s,\n" % (name, value, setting_type))
+
+    @mock.patch("builtins.print")
+    def test_results_with_reserves(self, print_mock):
+        self.write_settings({"reserves": ("RaiseAndLower", "str")})
+
+        series = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+        results_path = os.path.join(self.output_path, self.name, "results")
+        reserve_enabled = pd.read_csv(
+            os.path.join(results_path, "reserve_enabled_MW.csv"), index_col=[0, 1]
+        )
+        units_reserve = reserve_enabled.index.get_level_values(1).unique().to_list()
+
+        self.assertEqual(series["summary"]["Status"].to_list(), [1, 1, 1])
+        self.assertEqual(
+            reserve_enabled.index.to_list(),
+            [(i, u) for i in range(72) for u in units_reserve]
+        )
+        self.assertEqual(reserve_enabled.columns.to_list(), ["raise", "lower"])
+
+    @mock.patch("builtins.print")
+    def test_reused_model_matches_rebuilt(self, print_mock):
+        results = dict()
+
+        for model_backend in ["Pulp", "Matrix"]:
+            for reuse in [True, False]:
+                self.write_settings({
+                    "ModelBackend": (model_backend, "str"), "SeriesReuseModel": (reuse, "bool")
+                })
+
+                series = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+                results[model_backend, reuse] = series["summary"]["Objective"].to_list()
+
+        for key in [("Pulp", True), ("Matrix", True), ("Matrix", False)]:
+            with self.subTest(key=key):
+                np.testing.assert_allclose(results[key], results["Pulp", False])
+
+    @mock.patch("builtins.print")
+    def test_look_ahead_is_trimmed(self, print_mock):
+        self.write_settings({"SeriesLookAheadIntervals": (6, "int")})
+
+        series = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+        results_path = os.path.join(self.output_path, self.name, "results")
+        power = pd.read_csv(os.path.join(results_path, "power_generated_MW.csv"), index_col=0)
+
+        self.assertEqual(series["summary"]["Status"].to_list(), [1, 1, 1])
+        self.assertEqual(series["summary"]["LookAheadIntervals"].to_list(), [6, 6, 0])
+        self.assertEqual(power.index.to_list(), list(range(72)))
+        self.assertEqual((series["model"].num_builds, series["model"].num_updates), (2, 1))
+
+    @mock.patch("builtins.print")
+    def test_parallel_matches_sequential(self, print_mock):
+        expected = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+
+        for warm_up_days, repaired in [(1, [False, False, False]), (0, [False, True, True])]:
+            with self.subTest(warm_up_days=warm_up_days):
+                self.write_settings({
+                    "SeriesMode": ("Parallel", "str"),
+                    "SeriesProcesses": (2, "int"),
+                    "SeriesWarmUpDays": (warm_up_days, "int"),
+                })
+
+                series = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+
+                self.assertEqual(series["summary"]["Repaired"].to_list(), repaired)
+                np.testing.assert_allclose(
+                    series["summary"]["Objective"], expected["summary"]["Objective"]
+                )
+
+    @mock.patch("builtins.print")
+    def test_resume_after_failure(self, print_mock):
+        expected = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+        results_path = os.path.join(self.output_path, self.name, "results")
+        expected_power = pd.read_csv(os.path.join(results_path, "power_generated_MW.csv"))
+        solve_day = pyucs.solve_day
+
+        def fail_on_last_day(model, series, day, *args):
+            if day == 2:
+                raise RuntimeError("Solver crashed")
+
+            return solve_day(model, series, day, *args)
+
+        for series_mode in ["Sequential", "Parallel"]:
+            with self.subTest(series_mode=series_mode):
+                self.write_settings({"SeriesMode": (series_mode, "str")})
+
+                with mock.patch("pyuc.pyuc_series.solve_day", side_effect=fail_on_last_day):
+                    with self.assertRaises(RuntimeError):
+                        pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+
+                series = pyucs.run_series_problem(
+                    self.name, self.input_path, self.output_path, resume=True
+                )
+                power = pd.read_csv(os.path.join(results_path, "power_generated_MW.csv"))
+
+                self.assertEqual(series["resumed_days"], 2)
+                np.testing.assert_allclose(
+                    series["summary"]["Objective"], expected["summary"]["Objective"]
+                )
+                pd.testing.assert_frame_equal(power[:48], expected_power[:48])
+                self.assertEqual(len(power), 72)
+
+    @mock.patch("builtins.print")
+    def test_checkpoints_of_other_settings_are_not_resumed(self, print_mock):
+        pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+        self.write_settings({"SeriesLookAheadIntervals": (2, "int")})
+
+        series = pyucs.run_series_problem(
+            self.name, self.input_path, self.output_path, resume=True
+        )
+
+        self.assertEqual(series["resumed_days"], 0)
+        self.assertEqual(series["model"].num_builds + series["model"].num_updates, 3)
+
+    @mock.patch("builtins.print")
+    def test_checkpoints_of_other_inputs_are_not_resumed(self, print_mock):
+        pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+        demand_path = os.path.join(self.input_path, "demand.csv")
+        demand = pd.read_csv(demand_path)
+        demand.loc[30, "Demand"] += 50
+        demand.to_csv(demand_path, index=False)
+
+        series = pyucs.run_series_problem(
+            self.name, self.input_path, self.output_path, resume=True
+        )
+        expected = pyucs.run_series_problem(self.name, self.input_path, self.output_path)
+
+        self.assertEqual(series["resumed_days"], 1)
+        np.testing.assert_allclose(
+            series["summary"]["Objective"], expected["summary"]["Objective"]
+        )
+
+
+class testSeriesModel(unittest.TestCase):
+    def reserve_rhs(self, problem):
+        return [
+            -constraint.constant for name, constraint in problem["problem"].constraints.items()
+            if name.startswith("reserve_enabled_exceeds_reserve_requirement")
+        ]
+
+    @mock.patch("builtins.print")
+    def test_reused_model_updates_reserve_requirement(self, print_mock):
+        data = tup.make_data([100, 250, 180, 90] * 2)
+        data["reserve_requirement"] = pd.DataFrame(data={
+            "raise": [10, 10, 10, 10, 60, 70, 80, 90], "lower": [5, 5, 5, 5, 30, 35, 40, 45]
+        })
+
+        constraint_index = ca.make_constraint_index("Vectorised")
+        constraint_index.loc["ReserveEnabled>=ReserveRequirement", "Function"] = \
+            vcnsts.cnt_reserve_enabled_exceeds_reserve_requirement
+        constraint_index["ToInclude"] = True
+
+        rhs = dict()
+
+        for reuse in [True, False]:
+            series = {"paths": None, "settings": {"reserves": "RaiseAndLower",
+                                                  "SeriesReuseModel": reuse}}
+            model = pyucs.SeriesModel(series, constraint_index)
+
+            for day, window in enumerate([[0, 1, 2, 3], [4, 5, 6, 7]]):
+                problem = model.solve(pyucs.filter_traces(data, window, None), "day%d" % day)
+                rhs[reuse, day] = self.reserve_rhs(problem)
+
+            self.assertEqual(model.num_updates, 1 if reuse else 0)
+
+        self.assertEqual(rhs[True, 1], [60, 30, 70, 35, 80, 40, 90, 45])
+        self.assertEqual(rhs[True, 1], rhs[False, 1])
+
+
+class testSeriesHelpers(unittest.TestCase):
+    def test_get_days(self):
+        data = {"demand": pd.DataFrame(index=range(10)), "variable_traces": None}
+
+        for settings, expected in [
+            ({"IntervalDurationHrs": 6}, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]),
+            ({"IntervalDurationHrs": 1, "SeriesHorizonIntervals": 5},
+             [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9]]),
+        ]:
+            with self.subTest(settings=settings):
+                self.assertEqual(pyucs.get_days(data, settings), expected)
+
+    def test_add_look_ahead(self):
+        days = [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+        for look_ahead, expected in [
+            (0, days),
+            (2, [[0, 1, 2, 3, 4], [3, 4, 5, 6, 7], [6, 7]]),
+            (4, [[0, 1, 2, 3, 4, 5, 6], [3, 4, 5, 6, 7], [6, 7]]),
+        ]:
+            with self.subTest(look_ahead=look_ahead):
+                self.assertEqual(pyucs.add_look_ahead(days, look_ahead), expected)
+
+    @mock.patch("builtins.print")
+    def test_negative_look_ahead(self, print_mock):
+        with self.assertRaises(ValueError):
+            pyucs.look_ahead_intervals({"settings": {"SeriesLookAheadIntervals": -1}})
+
+    @mock.patch("builtins.print")
+    def test_get_days_unequal_traces(self, print_mock):
+        data = {"demand": pd.DataFrame(index=range(10)),
+                "variable_traces": pd.DataFrame(index=range(9))}
+
+        with self.assertRaises(ValueError):
+            pyucs.get_days(data, {"IntervalDurationHrs": 1})
+
+    def test_update_initial_state(self):
+        units = ["U1", "U2"]
+        sets = {"intervals": pyuc.Set("intervals", [0, 1]), "units": pyuc.Set("units", units)}
+        var = dict()
+
+        for name, values in [
+            ("num_committed", [[1, 0], [1, 1]]),
+            ("power_generated", [[50, 0], [60, 20]]),
+            ("stored_energy", [[0, 0], [0, 0]]),
+            ("num_starting_up", [[0, 0], [0, 1]]),
+            ("num_shutting_down", [[0, 0], [0, 0]]),
+        ]:
+            var[name] = mock.Mock(var={
+                (i, u): mock.Mock(value=mock.Mock(return_value=values[n][m]))
+                for n, i in enumerate(sets["intervals"].indices) for m, u in enumerate(units)
+            })
+
+        initial_state = pd.DataFrame(
+            data={("num_starting_up", -1): [1, 0], ("num_shutting_down", -1): [0, 1]},
+            index=units
+        )
+        unit_data = pd.DataFrame(
+            data={"MinimumUpTimeHrs": [3, 1], "MinimumDownTimeHrs": [1, 1]}, index=units
+        )
+        problem = {
+            "sets": sets,
+            "var": var,
+            "data": {
+                "units": unit_data,
+                "IntervalDurationHrs": 1,
+                "initial_state": initial_state,
+                "initial_state_history": InitialStateHistory(initial_state)
+            }
+        }
+
+        result = pyucs.update_initial_state(problem, initial_state)
+
+        self.assertEqual(result[("num_committed", -1)].to_list(), [1, 1])
+        self.assertEqual(result[("power_generated", -1)].to_list(), [60, 20])
+        self.assertEqual(result[("num_starting_up", -2)].to_list(), [0, 0])
+        self.assertEqual(result[("num_starting_up", -3)].to_list(), [1, 0])
+        self.assertEqual(result[("num_shutting_down", -3)].to_list(), [0, 1])
+        self.assertNotIn(("num_committed", -2), result.columns)
+
+        result = pyucs.update_initial_state(problem, initial_state, intervals=[0])
+
+        self.assertEqual(result[("num_committed", -1)].to_list(), [1, 0])
+        self.assertEqual(result[("num_starting_up", -2)].to_list(), [1, 0])
+
+    def test_states_match(self):
+        columns = pd.MultiIndex.from_tuples([
+            ("num_committed", -1), ("power_generated", -1), ("num_starting_up", -1),
+            ("num_starting_up", -2)
+        ])
+        state = pd.DataFrame([[1, 50, 0, 1], [0, 0, 0, 0]], index=["U1", "U2"], columns=columns)
+
+        for other_values, match in [
+            ([[1, 50, 0, 1], [0, 0, 0, 0]], True),
+            ([[1, 50.0001, 0, 1], [0, 0, 0, 0]], True),
+            ([[1, 51, 0, 1], [0, 0, 0, 0]], False),
+            ([[1, 50, 0, 0], [0, 0, 0, 0]], False),
+            ([[1, 50, 0, 1], [1, 0, 0, 0]], False),
+        ]:
+            with self.subTest(other_values=other_values):
+                other_state = pd.DataFrame(other_values, index=["U1", "U2"], columns=columns)
+                self.assertEqual(pyucs.states_match(state, other_state, 0.001), match)
+
+        self.assertTrue(pyucs.states_match(None, state * 0, 0.001))
+        self.assertFalse(pyucs.states_match(None, state, 0.001))
+
+    @mock.patch("builtins.print")
+    def test_unknown_series_mode(self, print_mock):
+        with self.assertRaises(ValueError):
+            pyucs.series_mode({"settings": {"SeriesMode": "Unknown"}})
@@ -0,0 +1,167 @@
+import unittest
+
+import mock
+import numpy as np
+import pandas as pd
+import pulp as pp
+from pyuc import constraint_adder as ca
+from pyuc import load_data
+from pyuc import matrix_model as mm
+from pyuc import objective_function as of
+from pyuc import pyuc
+from pyuc import reduction as rd
+
+
+class testFindReductions(unittest.TestCase):
+    def setUp(self):
+        intervals = pyuc.Set("intervals", [0, 1])
+        self.var = {
+            "x": pyuc.Var("x", "MW", [intervals], "Continuous"),
+            "n": pyuc.Var("n", "#Units", [intervals], "Integer"),
+        }
+        self.x, self.n = self.var["x"].var, self.var["n"].var
+        self.model = mm.MatrixModel(self.var)
+
+    def find(self, constraints):
+        self.model.add_constraints(constraints, "Family")
+        return rd.find_reductions(self.model)
+
+    def test_singleton_rows_become_bounds(self):
+        reasons, lower, upper = self.find({
+            "a": 2 * self.x[0] <= 5,
+            "b": -1 * self.x[1] <= -1,
+            "c": self.n[0] <= 2.5,
+            "d": self.x[0] + self.x[1] + self.n[1] >= 1,
+        })
+
+        np.testing.assert_array_equal(reasons, [1, 1, 1, 3])
+        np.testing.assert_array_equal(lower, [0, 1, 0, 0])
+        np.testing.assert_array_equal(upper, [2.5, np.inf, 2, np.inf])
+
+    def test_redundant_and_forcing_rows(self):
+        reasons, lower, upper = self.find({
+            "a": self.n[0] <= 2,
+            "b": self.x[0] <= 3,
+            "c": self.x[0] + 10 * self.n[0] <= 30,
+            "d": self.x[1] + self.n[1] <= 0,
+        })
+
+        np.testing.assert_array_equal(reasons, [1, 1, 3, 4])
+        np.testing.assert_array_equal(upper, [3, 0, 2, 0])
+
+    def test_empty_rows(self):
+        reasons, lower, upper = self.find({"a": 0 * self.x[0] <= 1, "b": self.x[0] >= 1})
+        np.testing.assert_array_equal(reasons, [2, 1])
+
+    def test_crossed_bounds(self):
+        reasons, lower, upper = self.find({"a": self.x[0] <= 1, "b": self.x[0] >= 2})
+        self.assertIsNone(reasons)
+
+
+class testReduceProblem(unittest.TestCase):
+    def setUp(self):
+        demand = pd.DataFrame(data={"Demand": [100, 250, 180]})
+        variable_traces = pd.DataFrame(data={"Wind": [0.5, 0, 0.2]})
+        unit_data = pd.DataFrame(data={
+            "Unit": ["U1", "U2", "W1", "B1"],
+            "Technology": ["Coal", "OCGT", "Wind", "Storage"],
+            "NumUnits": [2, 2, 1, 1],
+            "CapacityMW": [80, 60, 100, 50],
+            "MinimumGenerationFrac": [0.5, 0.2, 0, 0],
+            "FuelCost$/GJ": [2, 10, 0, 0],
+            "ThermalEfficiencyFrac": [0.4, 0.3, 0, 0],
+            "VOM$/MWh": [1, 3, 0, 0],
+            "RoundTripEfficiencyFrac": [0, 0, 0, 0],
+            "StorageHrs": [0, 0, 0, 2],
+            "MinimumUpTimeHrs": [2, 1, 0, 0],
+            "MinimumDownTimeHrs": [2, 1, 0, 0],
+            "RampRate_pctCapphr": [0.6, 1, 1, 1],
+        }).set_index("Unit")
+
+        self.data = {
+            "demand": demand,
+            "units": unit_data,
+            "variable_traces": variable_traces,
+            "initial_state": None,
+            "ValueOfLostLoad$/MWh": 1000,
+            "IntervalDurationHrs": 1
+        }
+
+    def solve(self, model_backend, reduce, settings=None, **data):
+        constraint_index = ca.make_constraint_index()
+        constraint_index["ToInclude"] = True
+        data = dict(self.data, constraint_index=constraint_index, **data)
+        sets = load_data.create_sets(data)
+
+        problem = {
+            "settings": dict(settings or {}, ModelBackend=model_backend),
+            "data": data,
+            "sets": sets,
+            "var": pyuc.create_variables(sets),
+            "problem": pp.LpProblem("MY_PROB", pp.LpMinimize)
+        }
+
+        ca.build_constraints(problem)
+        problem["problem"] = of.make_objective_function(problem)
+
+        with mock.patch("builtins.print"):
+            if reduce:
+                rd.reduce_problem(problem)
+
+            problem["problem"] = pyuc.solve_problem(problem)
+
+        return problem
+
+    def test_reduction_keeps_the_optimum(self):
+        # The storage unit has no round trip efficiency, so it is equivalent to having no storage
+        units = self.data["units"].drop(index="B1")
+        expected = self.solve("Pulp", False, units=units)["problem"].objective.value()
+
+        for model_backend in ["Pulp", "Matrix"]:
+            with self.subTest(model_backend=model_backend):
+                problem = self.solve(model_backend, True)
+
+                self.assertEqual(problem["problem"].status, 1)
+                self.assertAlmostEqual(problem["problem"].objective.value(), expected)
+                self.assertGreater(problem["reduction"]["rows_removed"], 0)
+
+    def test_zero_efficiency_storage_solves_without_reduction(self):
+        units = self.data["units"].drop(index="B1")
+        expected = self.solve("Pulp", False, units=units)["problem"].objective.value()
+
+        for model_backend in ["Pulp", "Matrix"]:
+            with self.subTest(model_backend=model_backend):
+                problem = self.solve(model_backend, False)
+
+                self.assertEqual(problem["problem"].status, 1)
+                self.assertAlmostEqual(problem["problem"].objective.value(), expected)
+
+    def test_forced_columns_are_fixed(self):
+        problem = self.solve("Matrix", True)
+        rows = problem["reduction"]["rows"]
+
+        # The wind unit's power in interval 1, and the storage unit's charge, are fixed to zero
+        self.assertEqual(problem["var"]["power_generated"].var[(1, "W1")].upBound, 0)
+        self.assertTrue(all(v.upBound == 0 for v in problem["var"]["power_charged"].var.values()))
+        self.assertEqual(rows.loc["Power<=Capacity", "Singleton"], 12)
+        self.assertEqual(problem["matrix_model"].num_rows,
+                         problem["reduction"]["rows_before"] - problem["reduction"]["rows_removed"])
+
+    def test_single_variable_bounds_keep_the_optimum(self):
+        units = self.data["units"].assign(RoundTripEfficiencyFrac=[0, 0, 0, 0.8])
+        expected = self.solve("Pulp", False, units=units)["problem"].objective.value()
+        settings = {"SingleVariableBounds": True}
+
+        for model_backend in ["Pulp", "Matrix"]:
+            with self.subTest(model_backend=model_backend):
+                problem = self.solve(model_backend, False, settings, units=units)
+
+                self.assertEqual(problem["problem"].status, 1)
+                self.assertAlmostEqual(problem["problem"].objective.value(), expected)
+                self.assertEqual(set(problem["column_bounds"].keys()), set(ca.bound_families))
+
+    def test_reduce_setting(self):
+        problem = {"settings": {"Reduce": False}}
+        rd.apply_reduction_setting(problem)
+        self.assertNotIn("reduction", problem)
+
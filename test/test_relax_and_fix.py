@@ -0,0 +1,60 @@
+import unittest
+
+import mock
+import pulp as pp
+from pyuc import relax_and_fix as rf
+from pyuc import relax_and_repair as rr
+from test import two_unit_problem as tup
+
+
+class testRelaxAndFix(unittest.TestCase):
+    def setUp(self):
+        self.data = tup.make_data(
+            [100, 250, 180, 90, 200, 260, 150, 80],
+            minimum_up_time_hrs=(3, 1),
+            minimum_down_time_hrs=(2, 2)
+        )
+
+    def solve(self, settings, model_backend="Pulp"):
+        return tup.solve(
+            tup.make_problem(self.data, dict(settings, ModelBackend=model_backend))
+        )
+
+    def test_schedule_is_integral_and_bounded_by_mip(self):
+        mip_objective = self.solve({"SolveMode": "MIP"})["problem"].objective.value()
+        settings = {
+            "SolveMode": "RelaxAndFix",
+            "RelaxAndFixWindowIntervals": 3,
+            "RelaxAndFixStepIntervals": 2
+        }
+
+        for model_backend in ["Pulp", "Matrix"]:
+            with self.subTest(model_backend=model_backend):
+                problem = self.solve(settings, model_backend)
+
+                self.assertEqual(problem["problem"].status, 1)
+                self.assertGreaterEqual(problem["problem"].objective.value(), mip_objective - 1e-6)
+                self.assertEqual(problem["relax_and_fix"]["windows"], 4)
+
+                for name in rr.commitment_variables:
+                    values = rr.commitment_array(problem, name)
+                    self.assertTrue((values == values.round()).all(), name)
+
+                    for v in problem["var"][name].var.values():
+                        self.assertEqual(v.cat, pp.LpInteger)
+                        self.assertIsNone(v.upBound)
+
+    def test_single_window_is_the_mip(self):
+        mip_objective = self.solve({"SolveMode": "MIP"})["problem"].objective.value()
+        problem = self.solve({"SolveMode": "RelaxAndFix", "RelaxAndFixWindowIntervals": 8})
+
+        self.assertAlmostEqual(problem["problem"].objective.value(), mip_objective)
+        self.assertEqual(problem["relax_and_fix"]["windows"], 1)
+
+    @mock.patch("builtins.print")
+    def test_invalid_window(self, print_mock):
+        for settings in [{"RelaxAndFixWindowIntervals": 0},
+                         {"RelaxAndFixWindowIntervals": 2, "RelaxAndFixStepIntervals": 3}]:
+            with self.subTest(settings=settings):
+                with self.assertRaises(ValueError):
+                    rf.relax_and_fix_windows({"settings": settings})
@@ -0,0 +1,82 @@
+import unittest
+
+import mock
+import numpy as np
+import pandas as pd
+import pulp as pp
+from pyuc import pyuc
+from pyuc import relax_and_repair as rr
+from test import two_unit_problem as tup
+
+
+class testRelaxAndRepair(unittest.TestCase):
+    def setUp(self):
+        initial_state = pd.DataFrame(
+            [[1, 0, 1]],
+            columns=pd.MultiIndex.from_tuples([
+                ("num_committed", -1), ("num_starting_up", -1), ("num_shutting_down", -1)
+            ]),
+            index=["U1"]
+        )
+
+        self.data = tup.make_data(
+            [100, 250, 180, 90, 200, 260],
+            minimum_up_time_hrs=(3, 1),
+            minimum_down_time_hrs=(2, 2),
+            initial_state=initial_state
+        )
+
+    def make_problem(self, solve_mode, model_backend="Pulp"):
+        return tup.make_problem(
+            self.data, {"SolveMode": solve_mode, "ModelBackend": model_backend}
+        )
+
+    def solve(self, solve_mode, model_backend="Pulp"):
+        return tup.solve(self.make_problem(solve_mode, model_backend))
+
+    def test_repaired_schedule_is_bounded_by_mip_and_lp(self):
+        mip_objective = self.solve("MIP")["problem"].objective.value()
+
+        for model_backend in ["Pulp", "Matrix"]:
+            with self.subTest(model_backend=model_backend):
+                problem = self.solve("RelaxAndRepair", model_backend)
+                result = problem["relax_and_repair"]
+
+                self.assertEqual(problem["problem"].status, 1)
+                self.assertLessEqual(result["lp_bound"], mip_objective + 1e-6)
+                self.assertGreaterEqual(result["objective"], mip_objective - 1e-6)
+                self.assertGreaterEqual(result["gap"], 0)
+
+                num_committed = rr.commitment_array(problem, "num_committed")
+                np.testing.assert_array_equal(num_committed, np.round(num_committed))
+
+    def test_variables_are_restored(self):
+        problem = self.solve("RelaxAndRepair", "Matrix")
+
+        for v in problem["var"]["num_committed"].var.values():
+            self.assertEqual((v.cat, v.lowBound, v.upBound), (pp.LpInteger, 0, None))
+
+        self.assertTrue(problem["matrix_model"].column_integer.any())
+
+    def test_repair_respects_up_and_down_times(self):
+        problem = self.make_problem("RelaxAndRepair")
+        relaxed = np.array([[2, 0.4], [0.2, 2.6], [0, 0.2], [1.6, 2.8], [0.2, 3], [0.6, 3]])
+
+        for k, i in enumerate(problem["sets"]["intervals"]):
+            for m, u in enumerate(problem["sets"]["units_commit"]):
+                problem["var"]["num_committed"].var[(i, u)].varValue = relaxed[k, m]
+
+        result = rr.repair_commitment(problem)
+
+        # U1 can't restart in interval 0 after its initial shut down, and stays up for 3
+        # intervals after starting in interval 3.  U2 stays down for 2 intervals after
+        # shutting down in interval 2
+        expected = np.array([[1, 0], [0, 3], [0, 0], [2, 0], [2, 3], [2, 3]])
+        np.testing.assert_array_equal(result["num_committed"], expected)
+        np.testing.assert_array_equal(result["num_starting_up"][:, 0], [0, 0, 0, 2, 0, 0])
+        np.testing.assert_array_equal(result["num_shutting_down"][:, 1], [0, 0, 3, 0, 0, 0])
+
+    @mock.patch("builtins.print")
+    def test_unknown_solve_mode(self, print_mock):
+        with self.assertRaises(ValueError):
+            pyuc.solve_problem({"settings": {"SolveMode": "Unknown"}})
@@ -179,6 +179,27 @@ class ValidateSettings(unittest.TestCase):
         expected = {"reserves": "reserve_setting"}
         self.assertEqual(result, expected)
 
+    def test_solver_options(self):
+        settings = {"SolverThreads": 8, "SolverRelativeGap": 0.01, "SolverTimeLimitSecs": 60}
+        result = setup_problem.validate_settings(settings)
+        expected = {"reserves": None, "SolverThreads": 8, "SolverRelativeGap": 0.01,
+                    "SolverTimeLimitSecs": 60.0}
+        self.assertEqual(result, expected)
+
+    @mock.patch("builtins.print")
+    def test_invalid_solver_options(self, print_mock):
+        for settings in [{"SolverThreads": 2.5}, {"SolverThreads": 0},
+                         {"SolverRelativeGap": 2.0}, {"SolverPresolve": "yes"},
+                         {"SolverCuts": "Extreme"}]:
+            with self.subTest(settings=settings):
+                with self.assertRaises(ValueError):
+                    setup_problem.validate_settings(settings)
+
+    def test_get_solver_options(self):
+        problem = {"settings": {"SolverThreads": 8, "SolverCuts": None, "Solver": "CBC"}}
+        result = setup_problem.get_solver_options(problem)
+        self.assertEqual(result, {"SolverThreads": 8})
+
 
 class InitialiseProblem(unittest.TestCase):
     def test_initialise_problem_with_str(self):
@@ -214,8 +235,10 @@ class Paths(unittest.TestCase):
             "demand": os.path.join("input_data_path", "demand.csv"),
             "reserve_requirement": os.path.join("input_data_path", "reserve_requirement.csv"),
             "constraint_list": os.path.join("input_data_path", "constraint_list.csv"),
+            "portfolio": os.path.join("input_data_path", "portfolio.csv"),
             "outputs": os.path.join("output_data_path", "MY_PROB"),
             "results": os.path.join("output_data_path", "MY_PROB", "results"),
+            "checkpoints": os.path.join("output_data_path", "MY_PROB_checkpoints"),
         }
 
         self.assertEqual(result, expected)
@@ -304,8 +327,10 @@ class SetUpProblem(unittest.TestCase):
                 "demand": os.path.join(self.input_data_path, "demand.csv"),
                 "reserve_requirement": os.path.join(self.input_data_path, "reserve_requirement.csv"),
                 "constraint_list": os.path.join(self.input_data_path, "constraint_list.csv"),
+                "portfolio": os.path.join(self.input_data_path, "portfolio.csv"),
                 "outputs": os.path.join(self.output_data_path, self.name),
                 "results": os.path.join(self.output_data_path, self.name, "results"),
+                "checkpoints": os.path.join(self.output_data_path, "MY_NAME_checkpoints"),
             },
             "settings": {"P1": 101, "P2": "A_STRING", "P3": False, "reserves": None},
             "problem": mock.ANY,
@@ -0,0 +1,174 @@
+import importlib.util
+import os
+import shutil
+import sys
+import threading
+import time
+import unittest
+
+import mock
+import pulp as pp
+from pyuc import matrix_model as mm
+from pyuc import solvers
+from pyuc import warm_start as ws
+from test import two_unit_problem as tup
+
+has_highspy = importlib.util.find_spec("highspy") is not None
+
+
+class testSolvers(unittest.TestCase):
+    def setUp(self):
+        self.data = tup.make_data([100, 250, 180], num_units=(2, 2))
+
+    def solve(self, solver, model_backend="Pulp", warm_start=False, progress_callback=None,
+              **solver_options):
+        problem = tup.make_problem(
+            self.data,
+            dict(solver_options, Solver=solver, ModelBackend=model_backend),
+            progress_callback=progress_callback
+        )
+
+        if warm_start:
+            with mock.patch("builtins.print"):
+                ws.set_warm_start(problem, ws.warm_start_from_initial_state(problem))
+
+        return tup.solve(problem)
+
+    @unittest.skipUnless(has_highspy, "highspy is not installed")
+    def test_highs_matches_cbc(self):
+        cbc_problem = self.solve("CBC")
+
+        for model_backend in ["Pulp", "Matrix"]:
+            with self.subTest(model_backend=model_backend):
+                highs_problem = self.solve("HiGHS", model_backend)
+
+                self.assertEqual(highs_problem["problem"].status, 1)
+                self.assertGreaterEqual(highs_problem["problem"].solutionTime, 0)
+                self.assertAlmostEqual(
+                    highs_problem["problem"].objective.value(),
+                    cbc_problem["problem"].objective.value()
+                )
+
+    @unittest.skipUnless(has_highspy, "highspy is not installed")
+    def test_highs_writes_no_files(self):
+        with mock.patch("tempfile.TemporaryDirectory") as tmp_dir_mock:
+            self.solve("HiGHS")
+
+        tmp_dir_mock.assert_not_called()
+
+    def test_solver_options_are_applied(self):
+        options = {"SolverRelativeGap": 0.01, "SolverTimeLimitSecs": 60.0, "SolverCuts": "Root"}
+        solvers_to_test = ["CBC", "HiGHS"] if has_highspy else ["CBC"]
+
+        for solver in solvers_to_test:
+            for model_backend in ["Pulp", "Matrix"]:
+                with self.subTest(solver=solver, model_backend=model_backend):
+                    problem = self.solve(solver, model_backend, **options)
+
+                    self.assertEqual(problem["problem"].status, 1)
+                    self.assertEqual(problem["solver_options"], options)
+
+    @unittest.skipUnless(has_highspy, "highspy is not installed")
+    def test_highs_progress_events(self):
+        events = list()
+        problem = self.solve("HiGHS", progress_callback=events.append)
+
+        incumbents = [e for e in events if e["event"] == "incumbent"]
+        self.assertGreater(len(incumbents), 0)
+        self.assertAlmostEqual(incumbents[-1]["objective"], problem["problem"].objective.value())
+        self.assertEqual(events[-1]["event"], "solved")
+        self.assertEqual(events[-1]["status"], 1)
+
+    def test_warm_start(self):
+        cbc_problem = self.solve("CBC")
+        solvers_to_test = ["CBC", "HiGHS"] if has_highspy else ["CBC"]
+
+        for solver in solvers_to_test:
+            for model_backend in ["Pulp", "Matrix"]:
+                with self.subTest(solver=solver, model_backend=model_backend):
+                    problem = self.solve(solver, model_backend, warm_start=True)
+
+                    self.assertEqual(problem["problem"].status, 1)
+                    self.assertAlmostEqual(problem["problem"].objective.value(),
+                                           cbc_problem["problem"].objective.value())
+
+    def test_stop_event(self):
+        for model_backend in ["Pulp", "Matrix"]:
+            for is_set in [False, True]:
+                with self.subTest(model_backend=model_backend, is_set=is_set):
+                    stop_event = threading.Event()
+
+                    if is_set:
+                        stop_event.set()
+
+                    problem = tup.solve(tup.make_problem(
+                        self.data, {"Solver": "CBC", "ModelBackend": model_backend},
+                        stop_event=stop_event
+                    ))
+
+                    self.assertEqual(problem["problem"].status == 1, not is_set)
+
+    def test_stopped_cbc_is_terminated(self):
+        stop_event = threading.Event()
+        timer = threading.Timer(0.2, stop_event.set)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        start_time = time.time()
+        exit_code = solvers.run_cbc(
+            {"stop_event": stop_event}, [sys.executable, "-c", "import time; time.sleep(60)"]
+        )
+
+        self.assertNotEqual(exit_code, 0)
+        self.assertLess(time.time() - start_time, 10)
+
+    def test_write_cbc_start(self):
+        x = pp.LpVariable("x")
+        y = pp.LpVariable("y")
+        y.setInitialValue(3)
+        model = mm.MatrixModel({"v": mock.Mock(var={0: x, 1: y})})
+
+        tmp_dir = os.path.join("test", "TEMP", "solvers")
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, "model.mst")
+        solvers.write_cbc_start(path, model)
+
+        with open(path) as f:
+            result = f.read().splitlines()
+
+        self.assertEqual(result, ["Stopped on time - objective value 0", "1 C1 3 0"])
+
+    @mock.patch("builtins.print")
+    def test_cbc_arguments(self, print_mock):
+        options = {"SolverThreads": 8, "SolverPresolve": False, "SolverCuts": "Aggressive"}
+        result = solvers.cbc_arguments({}, options)
+        expected = ["threads 8", "presolve off", "cuts forceOn"]
+
+        self.assertEqual(result, expected)
+        print_mock.assert_called_once_with(
+            "CBC options: SolverThreads=8, SolverPresolve=False, SolverCuts=Aggressive"
+        )
+
+    @mock.patch("builtins.print")
+    def test_random_seed_arguments(self, print_mock):
+        options = {"SolverRandomSeed": 7}
+
+        self.assertEqual(solvers.cbc_arguments({}, options), ["randomCbcSeed 7"])
+        self.assertEqual(solvers.highs_option_values({}, options), {"random_seed": 7})
+
+    @mock.patch("builtins.print")
+    def test_highs_option_values(self, print_mock):
+        problem = dict()
+        options = {"SolverRelativeGap": 0.01, "SolverPresolve": True, "SolverCuts": "Off"}
+        result = solvers.highs_option_values(problem, options)
+
+        self.assertEqual(result, {"mip_rel_gap": 0.01, "presolve": "on"})
+        self.assertEqual(problem["solver_options"], {"SolverRelativeGap": 0.01,
+                                                     "SolverPresolve": True})
+        print_mock.assert_called_with("HiGHS options not applied: SolverCuts=Off")
+
+    @mock.patch("builtins.print")
+    def test_unknown_solver(self, print_mock):
+        with self.assertRaises(ValueError):
+            solvers.solve({"settings": {"Solver": "Unknown"}})
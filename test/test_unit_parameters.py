@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from pyuc import unit_parameters as up
+
+
+class testUnitParameterTable(unittest.TestCase):
+    def setUp(self):
+        self.unit_data = pd.DataFrame(data={
+            "Unit": ["U1", "U2", "S1"],
+            "Technology": ["Coal", "CCGT", "Storage"],
+            "NumUnits": [2, 1, 1],
+            "CapacityMW": [100, 80, 50],
+            "MinimumGenerationFrac": [0.6, 0.3, 0],
+            "RampRate_pctCapphr": [0.5, 0.4, 1],
+            "FuelCost$/GJ": [10, 20, 0],
+            "ThermalEfficiencyFrac": [0.5, 0.25, 0],
+            "RoundTripEfficiencyFrac": [0, 0, 0.8],
+            "StorageHrs": [0, 0, 4],
+        }).set_index("Unit")
+
+        self.table = up.UnitParameterTable(self.unit_data)
+
+    def test_units_and_positions(self):
+        self.assertEqual(self.table.units, ["U1", "U2", "S1"])
+        self.assertEqual(self.table.positions, {"U1": 0, "U2": 1, "S1": 2})
+
+    def test_numeric_columns_are_float_arrays(self):
+        result = self.table["CapacityMW"]
+        self.assertEqual(result.dtype, float)
+        self.assertTrue(result.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(result, [100, 80, 50])
+
+    def test_text_columns(self):
+        self.assertNotIn("Technology", self.table)
+        self.assertEqual(self.table.text("Technology", ["S1", "U1"]), ["Storage", "Coal"])
+
+    def test_get_aligns_to_units(self):
+        np.testing.assert_array_equal(self.table.get("NumUnits", ["S1", "U1"]), [1, 2])
+
+    def test_get_no_units(self):
+        self.assertEqual(len(self.table.get("NumUnits", [])), 0)
+
+    def test_value(self):
+        self.assertEqual(self.table.value("CapacityMW", "U2"), 80)
+
+    def test_derived_columns(self):
+        np.testing.assert_allclose(self.table["FuelCost$/MWh"], [3.6*10/0.5, 3.6*20/0.25, 0])
+        np.testing.assert_allclose(self.table["TotalCapacityMW"], [200, 80, 50])
+        np.testing.assert_allclose(self.table["MinimumGenerationMW"], [60, 24, 0])
+        np.testing.assert_allclose(self.table["OnlineRampMW"], [50, 32, 50])
+        np.testing.assert_allclose(self.table["StartUpRampMW"], [60, 32, 50])
+        np.testing.assert_allclose(self.table["ShutDownRampMW"], [60, 32, 50])
+        np.testing.assert_allclose(self.table["ChargeCapacityMW"], [0, 0, 40])
+        np.testing.assert_allclose(self.table["EnergyCapacityMWh"], [0, 0, 200])
+
+    def test_derived_columns_need_their_inputs(self):
+        table = up.UnitParameterTable(self.unit_data[["CapacityMW"]])
+        self.assertNotIn("TotalCapacityMW", table)
+
+
+class testUnitParametersFromData(unittest.TestCase):
+    def test_table_is_built_once(self):
+        data = {"units": pd.DataFrame(index=["U1"], data={"CapacityMW": [100]})}
+        result = up.unit_parameters(data)
+
+        self.assertIsInstance(result, up.UnitParameterTable)
+        self.assertIs(up.unit_parameters(data), result)
+
+    def test_table_is_rebuilt_for_new_unit_data(self):
+        data = {"units": pd.DataFrame(index=["U1"], data={"CapacityMW": [100]})}
+        up.unit_parameters(data)
+        data["units"] = pd.DataFrame(index=["U1"], data={"CapacityMW": [80]})
+
+        np.testing.assert_array_equal(up.unit_parameters(data)["CapacityMW"], [80])
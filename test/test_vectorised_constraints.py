@@ -0,0 +1,165 @@
+import unittest
+
+import mock
+import numpy as np
+import pandas as pd
+import pulp as pp
+from pyuc import constraint_adder as ca
+from pyuc import constraints as cnsts
+from pyuc import load_data, pyuc
+from pyuc import vectorised_constraints as vcnsts
+
+
+def normalise_condition(condition):
+    coefficients = {v.name: round(x, 9) for v, x in condition.items() if x != 0}
+    return coefficients, condition.sense, round(condition.constant, 9)
+
+
+class testMatchesReference(unittest.TestCase):
+    def setUp(self):
+        demand = pd.DataFrame(data={"Demand": [200, 300, 400, 350, 250, 150]})
+        reserve_requirement = pd.DataFrame(data={"raise": [45] * 6, "lower": [35] * 6})
+        variable_traces = pd.DataFrame(data={
+            "Wind": [0.2, 0.4, 0.1, 0.0, 0.9, 1.0],
+            "Solar": [0.0, 0.3, 0.8, 0.9, 0.4, 0.0]
+        })
+
+        unit_data = pd.DataFrame(data={
+            "Unit": ["U1", "U2", "W1", "S1", "B1"],
+            "Technology": ["Coal", "CCGT", "Wind", "Solar", "Storage"],
+            "NumUnits": [2, 3, 1, 2, 1],
+            "CapacityMW": [100, 50, 300, 100, 100],
+            "MinimumGenerationFrac": [0.5, 0.3, 0, 0, 0],
+            "FuelCost$/GJ": [2, 8, 0, 0, 0],
+            "ThermalEfficiencyFrac": [0.4, 0.5, 0, 0, 0],
+            "VOM$/MWh": [1, 2, 0, 0, 0],
+            "RoundTripEfficiencyFrac": [0, 0, 0, 0, 0.8],
+            "StorageHrs": [0, 0, 0, 0, 2],
+            "MinimumUpTimeHrs": [3, 1, 0, 0, 0],
+            "MinimumDownTimeHrs": [2, 4, 0, 0, 0],
+            "RampRate_pctCapphr": [0.3, 0.8, 1, 1, 1],
+        }).set_index("Unit")
+
+        initial_state = pd.DataFrame(
+            np.array([[1, 80, 0, 1, 1, 0, 0], [2, 60, 0, 0, 1, 1, 0], [0, 0, 50, 0, 0, 0, 0]]),
+            columns=pd.MultiIndex.from_tuples([
+                ("num_committed", -1),
+                ("power_generated", -1),
+                ("stored_energy", -1),
+                ("num_starting_up", -1),
+                ("num_starting_up", -2),
+                ("num_shutting_down", -1),
+                ("num_shutting_down", -3),
+            ]),
+            index=["U1", "U2", "B1"]
+        )
+
+        data = {
+            "demand": demand,
+            "reserve_requirement": reserve_requirement,
+            "variable_traces": variable_traces,
+            "units": unit_data,
+            "initial_state": initial_state,
+            "ValueOfLostLoad$/MWh": 1000,
+            "IntervalDurationHrs": 0.5
+        }
+
+        self.problem = {
+            "data": data,
+            "problem": pp.LpProblem(name="MY_PROB", sense=pp.LpMinimize),
+            "sets": load_data.create_sets(data, "RaiseAndLower"),
+            "paths": None
+        }
+
+        self.problem["var"] = pyuc.create_variables(self.problem["sets"])
+
+    def assertFamilyMatches(self, function_name):
+        reference = getattr(cnsts, function_name)(self.problem)
+        vectorised = getattr(vcnsts, function_name)(self.problem).to_dict()
+
+        self.assertEqual(list(vectorised.keys()), list(reference.keys()))
+
+        for label, condition in reference.items():
+            self.assertEqual(
+                normalise_condition(vectorised[label]), normalise_condition(condition), label
+            )
+
+    def test_all_families_match_reference(self):
+        function_names = \
+            set(f.__name__ for f in ca.make_constraint_index("Reference").Function)
+
+        for function_name in sorted(function_names):
+            with self.subTest(function_name=function_name):
+                self.assertFamilyMatches(function_name)
+
+    def test_reserve_requirement_matches_reference(self):
+        self.assertFamilyMatches("cnt_reserve_enabled_exceeds_reserve_requirement")
+
+    def test_sparse_reserve_domain_matches_reference(self):
+        sets = self.problem["sets"]
+        sets["units_reserve_x_reserves"] = \
+            pyuc.Set("units_reserve_x_reserves", [("U1", "raise"), ("B1", "lower")])
+        self.problem["var"] = pyuc.create_variables(sets)
+
+        for function_name in ["cnt_reserve_enabled_exceeds_reserve_requirement",
+                              "cnt_power_lt_committed_capacity",
+                              "cnt_power_gt_minimum_generation"]:
+            with self.subTest(function_name=function_name):
+                self.assertFamilyMatches(function_name)
+
+    def test_window_rhs_functions_match_blocks(self):
+        sets, data = self.problem["sets"], self.problem["data"]
+
+        for function_name, rhs_function in vcnsts.window_rhs_functions.items():
+            with self.subTest(function_name=function_name):
+                block = getattr(vcnsts, function_name)(self.problem)
+                np.testing.assert_allclose(rhs_function(sets, data), block.rhs)
+
+
+class testConstraintBlock(unittest.TestCase):
+    def setUp(self):
+        self.x, self.y = pp.LpVariable("x"), pp.LpVariable("y")
+        self.block = \
+            vcnsts.ConstraintBlock("my_block", ("i", "u"), [(0, "A"), (1, "B")], pp.LpConstraintLE)
+
+    def test_labels(self):
+        expected = ["my_block(i=0, u=A)", "my_block(i=1, u=B)"]
+        self.assertEqual(list(self.block.labels()), expected)
+
+    def test_repeated_variables_are_summed(self):
+        self.block.add_term([self.x, self.x], 2)
+        self.block.add_term([self.x, None], np.array([3, 4]))
+        self.block.add_rhs([5, 6])
+
+        result = [normalise_condition(c) for c in self.block.to_dict().values()]
+        expected = [({"x": 5}, pp.LpConstraintLE, -5), ({"x": 2}, pp.LpConstraintLE, -6)]
+
+        self.assertEqual(result, expected)
+
+    def test_expressions_are_added(self):
+        self.block.add_expressions([{self.x: -1, self.y: -1}, {}])
+        self.block.add_expressions([{self.y: 3}, {self.x: 2}])
+        self.block.add_term([self.x, self.x], 1)
+
+        result = [normalise_condition(c)[0] for c in self.block.to_dict().values()]
+        self.assertEqual(result, [{"y": 2}, {"x": 3}])
+
+    def test_zero_coefficients_are_dropped(self):
+        self.block.add_term([self.x, self.y], np.array([0, 1]))
+        result = [normalise_condition(c)[0] for c in self.block.to_dict().values()]
+        self.assertEqual(result, [{}, {"y": 1}])
+
+
+class testBuilderSelection(unittest.TestCase):
+    def test_reference_builder(self):
+        result = ca.make_constraint_index("Reference").loc["Supply==Demand", "Function"]
+        self.assertIs(result, cnsts.cnt_supply_eq_demand)
+
+    def test_vectorised_builder(self):
+        result = ca.make_constraint_index("Vectorised").loc["Supply==Demand", "Function"]
+        self.assertIs(result, vcnsts.cnt_supply_eq_demand)
+
+    @mock.patch("builtins.print")
+    def test_unknown_builder(self, print_mock):
+        with self.assertRaises(ValueError):
+            ca.make_constraint_index("Unknown")
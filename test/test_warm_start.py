@@ -0,0 +1,85 @@
+import os
+import shutil
+import unittest
+
+import mock
+import numpy as np
+import pandas as pd
+from pyuc import load_data, pyuc
+from pyuc import warm_start as ws
+
+
+class testWarmStart(unittest.TestCase):
+    def setUp(self):
+        unit_data = pd.DataFrame(data={
+            "Unit": ["U1", "U2", "W1"],
+            "Technology": ["Coal", "OCGT", "Wind"],
+            "NumUnits": [2, 3, 1],
+        }).set_index("Unit")
+
+        initial_state = pd.DataFrame(
+            [[2, 150]],
+            columns=pd.MultiIndex.from_tuples([("num_committed", -1), ("power_generated", -1)]),
+            index=["U1"]
+        )
+
+        data = {
+            "demand": pd.DataFrame(data={"Demand": [100, 250, 180]}),
+            "units": unit_data,
+            "variable_traces": None,
+            "initial_state": initial_state,
+        }
+
+        sets = load_data.create_sets(data)
+        self.problem = {"data": data, "sets": sets, "var": pyuc.create_variables(sets)}
+
+    def initial_values(self, name):
+        var = self.problem["var"][name]
+        return {k: v.varValue for k, v in var.var.items() if v.varValue is not None}
+
+    @mock.patch("builtins.print")
+    def test_warm_start_from_initial_state(self, print_mock):
+        values = ws.warm_start_from_initial_state(self.problem)
+        ws.set_warm_start(self.problem, values)
+
+        self.assertTrue(self.problem["warm_start"])
+        self.assertEqual(self.initial_values("num_committed"), {
+            (0, "U1"): 2, (1, "U1"): 2, (2, "U1"): 2, (0, "U2"): 0, (1, "U2"): 0, (2, "U2"): 0
+        })
+        self.assertEqual(set(self.initial_values("num_starting_up").values()), {0})
+        self.assertEqual(self.initial_values("power_generated"), {})
+
+    @mock.patch("builtins.print")
+    def test_set_warm_start_with_offset(self, print_mock):
+        values = {"num_committed": pd.DataFrame({"U1": [1, 2, 1.8, 0]}, index=[0, 1, 2, 3])}
+        ws.set_warm_start(self.problem, values, interval_offset=1)
+
+        expected = {(0, "U1"): 2, (1, "U1"): 2, (2, "U1"): 0}
+        self.assertEqual(self.initial_values("num_committed"), expected)
+        print_mock.assert_called_once_with("Warm start: 3 values seeded for num_committed")
+
+    @mock.patch("builtins.print")
+    def test_load_warm_start(self, print_mock):
+        results_path = os.path.join("test", "TEMP", "warm_start")
+        os.makedirs(results_path, exist_ok=True)
+        self.addCleanup(shutil.rmtree, results_path)
+
+        num_committed = pd.DataFrame({"U1": [2, 1, 1], "U2": [0, 3, 3]})
+        num_committed.index.name = "intervals"
+        num_committed.to_csv(
+            os.path.join(results_path, self.problem["var"]["num_committed"].filename)
+        )
+
+        values = ws.load_warm_start(self.problem, results_path)
+
+        self.assertEqual(list(values.keys()), ["num_committed"])
+        np.testing.assert_array_equal(values["num_committed"].to_numpy(), num_committed)
+
+    @mock.patch("builtins.print")
+    def test_missing_results_directory(self, print_mock):
+        with self.assertRaises(ValueError):
+            ws.load_warm_start(self.problem, os.path.join("test", "TEMP", "no_such_directory"))
+
+    def test_no_warm_start_setting(self):
+        ws.apply_warm_start_setting(self.problem)
+        self.assertNotIn("warm_start", self.problem)
@@ -0,0 +1,91 @@
+"""
+A small problem with a Coal and an OCGT unit, built in memory, shared by the tests of the solve
+modes, solvers and model backends.
+"""
+
+import mock
+import pandas as pd
+import pulp as pp
+from pyuc import constraint_adder as ca
+from pyuc import load_data
+from pyuc import objective_function as of
+from pyuc import pyuc
+
+
+def make_data(demand, num_units=(2, 3), minimum_up_time_hrs=(2, 1),
+              minimum_down_time_hrs=(2, 1), initial_state=None):
+    """
+    Return the data dictionary of the problem.
+
+    :param demand list: demand of each interval
+    :param num_units tuple: number of Coal and OCGT units
+    :param minimum_up_time_hrs tuple: minimum up time of the Coal and OCGT units
+    :param minimum_down_time_hrs tuple: minimum down time of the Coal and OCGT units
+    :param initial_state DataFrame: initial state, or None
+    """
+
+    unit_data = pd.DataFrame(data={
+        "Unit": ["U1", "U2"],
+        "Technology": ["Coal", "OCGT"],
+        "NumUnits": list(num_units),
+        "CapacityMW": [80, 60],
+        "MinimumGenerationFrac": [0.5, 0.2],
+        "FuelCost$/GJ": [2, 10],
+        "ThermalEfficiencyFrac": [0.4, 0.3],
+        "VOM$/MWh": [1, 3],
+        "RoundTripEfficiencyFrac": [0, 0],
+        "StorageHrs": [0, 0],
+        "MinimumUpTimeHrs": list(minimum_up_time_hrs),
+        "MinimumDownTimeHrs": list(minimum_down_time_hrs),
+        "RampRate_pctCapphr": [0.6, 1],
+    }).set_index("Unit")
+
+    return {
+        "demand": pd.DataFrame(data={"Demand": demand}),
+        "units": unit_data,
+        "variable_traces": None,
+        "initial_state": initial_state,
+        "ValueOfLostLoad$/MWh": 1000,
+        "IntervalDurationHrs": 1
+    }
+
+
+def make_problem(data, settings, build=True, **problem_items):
+    """
+    Return the problem of the data with every constraint included, with its constraints and
+    objective function built unless build is False.
+
+    :param data dict: data dictionary, from make_data
+    :param settings dict: settings dictionary
+    :param build bool: whether to build the constraints and objective function
+    :param problem_items: other items of the problem dictionary, e.g. a progress_callback
+    """
+
+    constraint_index = ca.make_constraint_index()
+    constraint_index["ToInclude"] = True
+    data = dict(data, constraint_index=constraint_index)
+    sets = load_data.create_sets(data)
+
+    problem = dict(
+        problem_items,
+        settings=settings,
+        data=data,
+        sets=sets,
+        var=pyuc.create_variables(sets),
+        problem=pp.LpProblem("MY_PROB", pp.LpMinimize)
+    )
+
+    if build:
+        ca.build_constraints(problem)
+        problem["problem"] = of.make_objective_function(problem)
+
+    return problem
+
+
+def solve(problem):
+    """Solve a built problem, returning it. """
+
+    with mock.patch("builtins.print"):
+        problem["problem"] = pyuc.solve_problem(problem)
+
+    return problem